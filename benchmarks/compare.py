@@ -0,0 +1,388 @@
+"""
+Comparison of benchmark results against a stored baseline.
+
+Reads the JSON documents written by the benchmark suites (stages, load,
+startup, ...) for a baseline and a current run, matches results by suite
+and name, and reports the relative change of each metric with a
+confidence interval:
+
+- timings (mean_ns, stdev_ns, iterations) and repeated memory sizes
+  (mean_bytes, stdev_bytes, samples): Welch's t interval on the
+  difference of the means, relative to the baseline mean
+- error rates (errors, requests): interval on the difference of the two
+  proportions, in percentage points
+- single values without a spread (alloc_peak_bytes): relative change
+  only, and changes under 1 KiB are never flagged
+
+A change is a regression when the whole interval lies above --threshold
+(or, for error rates, above zero), so the slowdown is both statistically
+significant and large enough to matter; an improvement when it lies
+below -threshold. Samples of one run share the machine's state, so their
+spread understates the run-to-run variation: compare runs made on the
+same machine, and keep the threshold above the noise seen between two
+runs of the same commit. Everything runs offline from the JSON files.
+
+Usage:
+    python -m benchmarks.compare --baseline baseline/ --current stages.json load.json
+                                 [--threshold 0.05] [--confidence 0.99] [--all] [--output report.json]
+
+Paths may be files or directories of JSON files. The exit status is 1
+when a regression is found.
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, ".")
+
+from benchmarks.harness import format_ns  # noqa: E402
+
+# (mean field, standard deviation field, sample count field, unit)
+MEAN_METRICS = (
+    ("mean_ns", "stdev_ns", "iterations", "ns"),
+    ("mean_bytes", "stdev_bytes", "samples", "bytes"),
+)
+
+# (value field, unit, smallest absolute change flagged) of metrics measured once, without a spread
+VALUE_METRICS = (
+    ("alloc_peak_bytes", "bytes", 1024),
+)
+
+# Environment fields that make two runs incomparable when they differ
+_ENVIRONMENT_KEYS = ("python", "implementation", "platform", "machine", "cpu_count")
+
+Key = Tuple[str, str]
+
+
+def _regularized_incomplete_beta(x: float, a: float, b: float) -> float:
+    """I_x(a, b), evaluated with Lentz's continued fraction."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _regularized_incomplete_beta(1.0 - x, b, a)
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)) / a
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return front * fraction
+
+
+def t_quantile(probability: float, df: float) -> float:
+    """Quantile of Student's t distribution (probability in (0.5, 1)), by bisection on its CDF."""
+    if math.isinf(df) or df > 1e6:
+        return statistics.NormalDist().inv_cdf(probability)
+    low, high = 0.0, 1e4
+    for _ in range(200):
+        middle = (low + high) / 2
+        cdf = 1.0 - 0.5 * _regularized_incomplete_beta(df / (df + middle * middle), df / 2, 0.5)
+        if cdf < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def welch_interval(
+    baseline: Tuple[float, float, int],
+    current: Tuple[float, float, int],
+    confidence: float
+) -> Tuple[float, float, float]:
+    """Confidence interval of the difference of two means (Welch).
+
+    Args:
+        baseline: (mean, standard deviation, sample count) of the baseline
+        current: (mean, standard deviation, sample count) of the current run
+        confidence: Confidence level, e.g. 0.99
+
+    Returns:
+        Tuple of (difference, interval low, interval high), current minus baseline
+    """
+    (mean_1, stdev_1, n_1), (mean_2, stdev_2, n_2) = baseline, current
+    difference = mean_2 - mean_1
+    variance_1, variance_2 = stdev_1 ** 2 / n_1, stdev_2 ** 2 / n_2
+    standard_error = math.sqrt(variance_1 + variance_2)
+    if standard_error == 0:
+        return difference, difference, difference
+    df = (variance_1 + variance_2) ** 2 / (
+        variance_1 ** 2 / (n_1 - 1) + variance_2 ** 2 / (n_2 - 1)
+    )
+    margin = t_quantile(1 - (1 - confidence) / 2, df) * standard_error
+    return difference, difference - margin, difference + margin
+
+
+def proportion_interval(
+    baseline: Tuple[int, int],
+    current: Tuple[int, int],
+    confidence: float
+) -> Tuple[float, float, float]:
+    """Confidence interval of the difference of two proportions (Wald).
+
+    Args:
+        baseline: (events, trials) of the baseline
+        current: (events, trials) of the current run
+        confidence: Confidence level
+
+    Returns:
+        Tuple of (difference, interval low, interval high), current minus baseline
+    """
+    p_1, p_2 = baseline[0] / baseline[1], current[0] / current[1]
+    difference = p_2 - p_1
+    standard_error = math.sqrt(p_1 * (1 - p_1) / baseline[1] + p_2 * (1 - p_2) / current[1])
+    margin = statistics.NormalDist().inv_cdf(1 - (1 - confidence) / 2) * standard_error
+    return difference, difference - margin, difference + margin
+
+
+def load_documents(paths: Iterable[str]) -> List[Dict[str, Any]]:
+    """Load result documents from files and directories of JSON files."""
+    documents = []
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            with open(file, "r", encoding="utf-8") as handle:
+                document = json.load(handle)
+            if isinstance(document, dict) and "suite" in document and "results" in document:
+                documents.append(document)
+    return documents
+
+
+def index_results(documents: Iterable[Dict[str, Any]]) -> Dict[Key, Dict[str, Any]]:
+    """Index results by (suite, name); a later document replaces an earlier one's result."""
+    return {
+        (document["suite"], result["name"]): result
+        for document in documents
+        for result in document["results"]
+    }
+
+
+def environment_differences(baseline: Sequence[Dict[str, Any]], current: Sequence[Dict[str, Any]]) -> List[str]:
+    """Environment fields that differ between the baseline and current runs of a suite."""
+    baseline_environments = {document["suite"]: document.get("environment", {}) for document in baseline}
+    differences = []
+    for document in current:
+        before = baseline_environments.get(document["suite"])
+        if before is None:
+            continue
+        after = document.get("environment", {})
+        for key in _ENVIRONMENT_KEYS:
+            if before.get(key) != after.get(key):
+                differences.append(f"{document['suite']}: {key} {before.get(key)} -> {after.get(key)}")
+    return differences
+
+
+def _verdict(low: Optional[float], high: Optional[float], threshold: float) -> str:
+    if low is not None and low > threshold:
+        return "regression"
+    if high is not None and high < -threshold:
+        return "improvement"
+    return "unchanged"
+
+
+def compare_result(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    confidence: float
+) -> List[Dict[str, Any]]:
+    """Compare every metric two results share.
+
+    Returns:
+        One comparison per metric, with relative change (or percentage
+        points for error rates), its interval and a verdict
+    """
+    comparisons = []
+    for mean_key, stdev_key, count_key, unit in MEAN_METRICS:
+        if baseline.get(mean_key) is None or current.get(mean_key) is None:
+            continue
+        base_mean = baseline[mean_key]
+        n_1, n_2 = baseline.get(count_key) or 0, current.get(count_key) or 0
+        if n_1 > 1 and n_2 > 1 and base_mean:
+            difference, low, high = welch_interval(
+                (base_mean, baseline.get(stdev_key) or 0, n_1),
+                (current[mean_key], current.get(stdev_key) or 0, n_2),
+                confidence
+            )
+            change, low, high = difference / base_mean, low / base_mean, high / base_mean
+        else:
+            change = (current[mean_key] - base_mean) / base_mean if base_mean else 0.0
+            low = high = change
+        comparisons.append({
+            "metric": mean_key, "unit": unit,
+            "baseline": base_mean, "current": current[mean_key],
+            "change": change, "ci_low": low, "ci_high": high,
+            "verdict": _verdict(low, high, threshold),
+        })
+
+    for value_key, unit, min_change in VALUE_METRICS:
+        if baseline.get(value_key) is None or current.get(value_key) is None:
+            continue
+        base_value = baseline[value_key]
+        change = (current[value_key] - base_value) / base_value if base_value else 0.0
+        significant = abs(current[value_key] - base_value) >= min_change
+        comparisons.append({
+            "metric": value_key, "unit": unit,
+            "baseline": base_value, "current": current[value_key],
+            "change": change, "ci_low": None, "ci_high": None,
+            "verdict": _verdict(change, change, threshold) if significant else "unchanged",
+        })
+
+    if baseline.get("requests") and current.get("requests") and "errors" in baseline and "errors" in current:
+        difference, low, high = proportion_interval(
+            (baseline["errors"], baseline["requests"]),
+            (current["errors"], current["requests"]),
+            confidence
+        )
+        comparisons.append({
+            "metric": "error_rate", "unit": "rate",
+            "baseline": baseline["errors"] / baseline["requests"],
+            "current": current["errors"] / current["requests"],
+            "change": difference, "ci_low": low, "ci_high": high,
+            "verdict": _verdict(low, high, 0.0),
+        })
+    return comparisons
+
+
+def compare(
+    baseline: Sequence[Dict[str, Any]],
+    current: Sequence[Dict[str, Any]],
+    threshold: float = 0.05,
+    confidence: float = 0.99
+) -> Dict[str, Any]:
+    """Compare a current run against a baseline.
+
+    Args:
+        baseline: Result documents of the baseline run
+        current: Result documents of the current run
+        threshold: Smallest relative change reported as a regression or improvement
+        confidence: Confidence level of the intervals
+
+    Returns:
+        Report with the comparisons, the results only one side has and
+        the environment differences
+    """
+    baseline_results = index_results(baseline)
+    current_results = index_results(current)
+    comparisons = []
+    for key in sorted(baseline_results.keys() & current_results.keys()):
+        for comparison in compare_result(baseline_results[key], current_results[key], threshold, confidence):
+            comparisons.append({"suite": key[0], "name": key[1], **comparison})
+
+    verdicts = [comparison["verdict"] for comparison in comparisons]
+    return {
+        "threshold": threshold,
+        "confidence": confidence,
+        "baseline_commits": sorted({str(document.get("environment", {}).get("git_commit")) for document in baseline}),
+        "current_commits": sorted({str(document.get("environment", {}).get("git_commit")) for document in current}),
+        "environment_differences": environment_differences(baseline, current),
+        "regressions": verdicts.count("regression"),
+        "improvements": verdicts.count("improvement"),
+        "comparisons": comparisons,
+        "only_in_baseline": [f"{suite}/{name}" for suite, name in sorted(baseline_results.keys() - current_results.keys())],
+        "only_in_current": [f"{suite}/{name}" for suite, name in sorted(current_results.keys() - baseline_results.keys())],
+    }
+
+
+def _format_value(value: float, unit: str) -> str:
+    if unit == "ns":
+        return format_ns(value)
+    if unit == "bytes":
+        return f"{value / 1024:.1f} KiB" if abs(value) < 2 ** 20 else f"{value / 2 ** 20:.2f} MiB"
+    return f"{value:.2%}"
+
+
+def _format_change(comparison: Dict[str, Any]) -> str:
+    if comparison["unit"] == "rate":
+        points = [100 * comparison[key] for key in ("change", "ci_low", "ci_high")]
+        return f"{points[0]:+.2f} pp [{points[1]:+.2f}, {points[2]:+.2f}]"
+    change = f"{comparison['change']:+.1%}"
+    if comparison["ci_low"] is None or comparison["ci_low"] == comparison["ci_high"]:
+        return change
+    return f"{change} [{comparison['ci_low']:+.1%}, {comparison['ci_high']:+.1%}]"
+
+
+def print_report(report: Dict[str, Any], show_all: bool = False) -> None:
+    """Print the regressions and improvements (every comparison with show_all)."""
+    for difference in report["environment_differences"]:
+        print(f"warning: environments differ ({difference})", file=sys.stderr)
+
+    rows = [
+        comparison for comparison in report["comparisons"]
+        if show_all or comparison["verdict"] != "unchanged"
+    ]
+    if rows:
+        width = min(max(len(f"{row['suite']}/{row['name']}") for row in rows), 72) + 2
+        print(f"{'benchmark':<{width}}{'metric':<18}{'baseline':>12}{'current':>12}  "
+              f"{'change [' + format(report['confidence'], '.0%') + ' CI]':<38}verdict")
+        for row in rows:
+            name = f"{row['suite']}/{row['name']}"
+            print(
+                f"{name[:width - 2]:<{width}}{row['metric']:<18}"
+                f"{_format_value(row['baseline'], row['unit']):>12}{_format_value(row['current'], row['unit']):>12}  "
+                f"{_format_change(row):<38}{row['verdict']}"
+            )
+
+    print(
+        f"{len(report['comparisons'])} metrics compared ({', '.join(report['baseline_commits'])} -> "
+        f"{', '.join(report['current_commits'])}): {report['regressions']} regressions, "
+        f"{report['improvements']} improvements beyond {report['threshold']:.0%}"
+    )
+    if report["only_in_baseline"]:
+        print(f"{len(report['only_in_baseline'])} baseline results missing from the current run")
+    if report["only_in_current"]:
+        print(f"{len(report['only_in_current'])} new results without a baseline")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("--baseline", nargs="+", required=True, help="Baseline result files or directories")
+    parser.add_argument("--current", nargs="+", required=True, help="Current result files or directories")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="Smallest relative change flagged (default 0.05 = 5%%)")
+    parser.add_argument("--confidence", type=float, default=0.99, help="Confidence level of the intervals")
+    parser.add_argument("--all", action="store_true", help="Also print unchanged metrics")
+    parser.add_argument("--output", help="Write the report as JSON to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+    if not 0.5 < args.confidence < 1:
+        parser.error("--confidence must be between 0.5 and 1")
+
+    missing = [path for path in args.baseline + args.current if not Path(path).exists()]
+    if missing:
+        parser.error(f"no such file or directory: {', '.join(missing)}")
+
+    baseline = load_documents(args.baseline)
+    current = load_documents(args.current)
+    if not baseline or not current:
+        parser.error("no benchmark results found in the baseline or current paths")
+
+    report = compare(baseline, current, args.threshold, args.confidence)
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print_report(report, args.all)
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
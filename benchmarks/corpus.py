@@ -0,0 +1,106 @@
+"""
+Fixed input corpus of the validator benchmarks.
+
+Three groups of resources, each named '<group>:<name>':
+- ig: the example instances of the PH-Core IG (resources/implementation_guides/ph_core),
+  without its conformance resources (profiles, CodeSystems, ValueSets, ...)
+- valid: resources/examples/valid
+- generated: large inputs that are the same on every run: transaction
+  Bundles of N entries from the synthetic workload generator (see
+  benchmarks.workload, seed 0, all conformant), an IG Patient with its
+  identifiers and names repeated N times, and a Questionnaire whose items
+  nest deeply
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+sys.path.insert(0, ".")
+
+from benchmarks.traversal import nested_questionnaire  # noqa: E402
+from benchmarks.workload import WorkloadGenerator, load_terminology  # noqa: E402
+from src.constants.fhir_constants import PROJECT_ROOT  # noqa: E402
+
+IG_EXAMPLES_PATH = PROJECT_ROOT / "resources" / "implementation_guides" / "ph_core"
+VALID_EXAMPLES_PATH = PROJECT_ROOT / "resources" / "examples" / "valid"
+
+GROUPS = ("ig", "valid", "generated")
+
+# IG resources that define the guide rather than exemplify it
+_CONFORMANCE_RESOURCE_TYPES = frozenset([
+    "StructureDefinition", "CodeSystem", "ValueSet", "NamingSystem", "ImplementationGuide",
+])
+
+Corpus = List[Tuple[str, Dict[str, Any]]]
+
+
+def _load(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def ig_examples() -> Corpus:
+    """Load the example instances of the PH-Core IG."""
+    corpus = []
+    for path in sorted(IG_EXAMPLES_PATH.glob("*.json")):
+        resource = _load(path)
+        if isinstance(resource, dict) and resource.get("resourceType") \
+                and resource["resourceType"] not in _CONFORMANCE_RESOURCE_TYPES:
+            corpus.append((f"ig:{path.stem}", resource))
+    return corpus
+
+
+def valid_examples() -> Corpus:
+    """Load resources/examples/valid (named by their path below it)."""
+    return [
+        (f"valid:{path.relative_to(VALID_EXAMPLES_PATH).with_suffix('').as_posix()}", _load(path))
+        for path in sorted(VALID_EXAMPLES_PATH.rglob("*.json"))
+    ]
+
+
+def patient_with_repeats(patient: Dict[str, Any], repeats: int) -> Dict[str, Any]:
+    """Copy a Patient with its identifiers and names repeated `repeats` times."""
+    large = copy.deepcopy(patient)
+    for key in ("identifier", "name", "telecom", "address"):
+        if isinstance(patient.get(key), list) and patient[key]:
+            large[key] = [copy.deepcopy(patient[key][i % len(patient[key])]) for i in range(repeats)]
+    return large
+
+
+def generated(bundle_sizes: Iterable[int] = (100, 1000), repeats: int = 500, depth: int = 200) -> Corpus:
+    """Build the large generated inputs."""
+    terminology = load_terminology()
+    corpus = [
+        (f"generated:transaction-bundle-{size}", WorkloadGenerator(terminology).transaction_bundle(size))
+        for size in bundle_sizes
+    ]
+    patient = next(resource for _, resource in ig_examples() if resource["resourceType"] == "Patient")
+    corpus.append((f"generated:patient-repeats-{repeats}", patient_with_repeats(patient, repeats)))
+    corpus.append((f"generated:questionnaire-depth-{depth}", nested_questionnaire(depth)))
+    return corpus
+
+
+def load_corpus(groups: Iterable[str] = GROUPS, bundle_sizes: Iterable[int] = (100, 1000)) -> Corpus:
+    """Load the corpus.
+
+    Args:
+        groups: Groups to include ('ig', 'valid', 'generated')
+        bundle_sizes: Entry counts of the generated transaction Bundles
+
+    Returns:
+        List of (name, resource) in a stable order
+    """
+    corpus: Corpus = []
+    for group in groups:
+        if group == "ig":
+            corpus.extend(ig_examples())
+        elif group == "valid":
+            corpus.extend(valid_examples())
+        elif group == "generated":
+            corpus.extend(generated(bundle_sizes))
+        else:
+            raise ValueError(f"Unknown corpus group: {group}")
+    return corpus
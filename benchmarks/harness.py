@@ -0,0 +1,228 @@
+"""
+Measurement helpers shared by the benchmark suites.
+
+measure() times a callable repeatedly and summarizes the per-call wall
+times (ops/sec, mean, standard deviation, percentiles), and
+measure_allocations() reports the memory a call allocates, traced with
+tracemalloc in a separate pass so tracing does not inflate the timings.
+Suites write their results with write_results() as one JSON document:
+
+    {
+      "suite": "stages",
+      "created_at": "...",
+      "environment": {"python": "3.11.7", "git_commit": "...", ...},
+      "config": {...},
+      "results": [{"name": "json_schema/ig:Patient-example-patient", "ops_per_sec": ..., ...}]
+    }
+
+Every timed result carries its sample count, mean and standard deviation
+(iterations, mean_ns, stdev_ns; samples, mean_bytes, stdev_bytes for
+memory), so two runs can be compared statistically (see benchmarks.compare).
+"""
+
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Percentile of ascending samples, linearly interpolated (fraction in [0, 1])."""
+    if not sorted_samples:
+        return math.nan
+    position = (len(sorted_samples) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    weight = position - lower
+    return sorted_samples[lower] * (1 - weight) + sorted_samples[upper] * weight
+
+
+def summarize(samples_ns: Sequence[int], percentiles: Sequence[float] = (0.5, 0.95, 0.99)) -> Dict[str, Any]:
+    """Summarize per-operation wall times.
+
+    Args:
+        samples_ns: Duration of each operation in nanoseconds
+        percentiles: Percentiles reported as 'p50_ns', 'p99_ns', 'p999_ns', ...
+
+    Returns:
+        Dictionary with iterations, ops_per_sec, mean_ns, stdev_ns, min_ns,
+        max_ns and the requested percentiles (None when there are no samples)
+    """
+    ordered = sorted(samples_ns)
+    mean = statistics.fmean(ordered) if ordered else None
+    summary: Dict[str, Any] = {
+        "iterations": len(ordered),
+        "ops_per_sec": round(1e9 / mean, 3) if mean else None,
+        "mean_ns": round(mean) if mean is not None else None,
+        "stdev_ns": round(statistics.stdev(ordered)) if len(ordered) > 1 else 0,
+        "min_ns": ordered[0] if ordered else None,
+        "max_ns": ordered[-1] if ordered else None,
+    }
+    for fraction in percentiles:
+        summary[f"p{percentile_label(fraction)}_ns"] = round(percentile(ordered, fraction)) if ordered else None
+    return summary
+
+
+def summarize_bytes(samples: Sequence[int]) -> Dict[str, Any]:
+    """Summarize memory sizes measured once per run.
+
+    Returns:
+        Dictionary with samples, mean_bytes, stdev_bytes, min_bytes and max_bytes
+    """
+    return {
+        "samples": len(samples),
+        "mean_bytes": round(statistics.fmean(samples)) if samples else None,
+        "stdev_bytes": round(statistics.stdev(samples)) if len(samples) > 1 else 0,
+        "min_bytes": min(samples) if samples else None,
+        "max_bytes": max(samples) if samples else None,
+    }
+
+
+def percentile_label(fraction: float) -> str:
+    """Label of a percentile: 0.5 -> '50', 0.99 -> '99', 0.999 -> '999'."""
+    return f"{fraction * 100:g}".replace(".", "")
+
+
+def measure(
+    function: Callable[[], Any],
+    min_time: float = 0.05,
+    min_iterations: int = 20,
+    max_iterations: int = 10000,
+    warmup: int = 3
+) -> List[int]:
+    """Time repeated calls of a function.
+
+    Calls are repeated until both min_time seconds and min_iterations calls
+    have passed, or max_iterations is reached. The garbage collector is run
+    before timing starts so collections left over from setup are not
+    charged to the function.
+
+    Args:
+        function: Operation to time (called without arguments)
+        min_time: Minimum total timed duration in seconds
+        min_iterations: Minimum number of timed calls
+        max_iterations: Maximum number of timed calls
+        warmup: Untimed calls made first (cache population, lazy loading)
+
+    Returns:
+        Duration of each timed call in nanoseconds
+    """
+    for _ in range(warmup):
+        function()
+    gc.collect()
+
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(min_time * 1e9)
+    while len(samples) < max_iterations:
+        start = clock()
+        function()
+        end = clock()
+        samples.append(end - start)
+        if end >= deadline and len(samples) >= min_iterations:
+            break
+    return samples
+
+
+def measure_allocations(function: Callable[[], Any], repeat: int = 3) -> Dict[str, int]:
+    """Measure the memory a call allocates.
+
+    Args:
+        function: Operation to trace (called without arguments)
+        repeat: Traced calls; the largest values are reported
+
+    Returns:
+        Dictionary with 'alloc_peak_bytes' (most memory in use above the
+        starting point during a call) and 'alloc_retained_bytes' (memory
+        still allocated after the call, e.g. cache growth)
+    """
+    peak = retained = 0
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            function()
+            after, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+            retained = max(retained, after - before)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {"alloc_peak_bytes": peak, "alloc_retained_bytes": retained}
+
+
+def git_commit() -> Optional[str]:
+    """Current git commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and interpreter a benchmark ran on."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+    }
+
+
+def write_results(path: Optional[str], suite: str, config: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write a suite's results as JSON.
+
+    Args:
+        path: Output file, '-' for standard output, None to skip writing
+        suite: Suite name, e.g. 'stages' or 'load'
+        config: Options the suite ran with
+        results: One dictionary per benchmark, each with a unique 'name'
+
+    Returns:
+        The results document
+    """
+    document = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "config": config,
+        "results": results,
+    }
+    if path == "-":
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif path is not None:
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    return document
+
+
+def format_ns(value: Optional[float]) -> str:
+    """Format a duration in nanoseconds with a readable unit."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "-"
+    if value >= 1e9:
+        return f"{value / 1e9:.2f} s"
+    if value >= 1e6:
+        return f"{value / 1e6:.2f} ms"
+    if value >= 1e3:
+        return f"{value / 1e3:.1f} us"
+    return f"{value:.0f} ns"
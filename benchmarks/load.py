@@ -0,0 +1,445 @@
+"""
+Load test of the HTTP API with a configurable request mix.
+
+Drives main:app with a closed loop of concurrent clients, each sending its
+next request as soon as the previous one is answered, and reports
+throughput, p50/p95/p99/p99.9 latency and the error rate per request kind:
+
+- single: POST /api/v1/validate with one resource
+- ph-core: POST /api/v1/validate/ph-core with one resource
+- batch: POST /api/v1/validate/batch with --batch-size resources
+- ig: GET of a PH-Core StructureDefinition, ValueSet or CodeSystem
+- search: GET /CodeSystem/{id}/$lookup concept search by prefix
+
+Resources come from the synthetic workload generator (benchmarks.workload),
+so --invalid-ratio controls how many validations fail. Every request is
+built and serialized before the clock starts.
+
+Two transports are available. 'asgi' (the default) calls the application
+in this process through its full middleware stack, without sockets or
+HTTP parsing, which isolates the cost of the API layer. 'socket' sends
+HTTP/1.1 over one keep-alive connection per client, either to --url or to
+a uvicorn server started on a free local port in this process.
+
+A response is an error when the connection fails or its status is not
+one the endpoint returns for a handled request (e.g. 400 for an invalid
+resource is expected, 413 or 500 are errors).
+
+Usage:
+    python -m benchmarks.load [--mix single=4,ph-core=3,batch=1,ig=1,search=1]
+                              [--requests 2000] [--concurrency 16] [--transport asgi|socket]
+                              [--url http://127.0.0.1:8000] [--output load.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlencode, urlsplit
+
+sys.path.insert(0, ".")
+
+from benchmarks.harness import format_ns, percentile_label, summarize, write_results  # noqa: E402
+from benchmarks.workload import IG_PATH, WorkloadGenerator, load_terminology  # noqa: E402
+
+KINDS = ("single", "ph-core", "batch", "ig", "search")
+
+DEFAULT_MIX = "single=4,ph-core=3,batch=1,ig=1,search=1"
+
+LOAD_PERCENTILES = (0.5, 0.95, 0.99, 0.999)
+
+# Statuses each kind of request returns when the server handled it
+EXPECTED_STATUS = {
+    "single": frozenset([200, 400, 422]),
+    "ph-core": frozenset([200, 400, 422]),
+    "batch": frozenset([200, 207, 400]),
+    "ig": frozenset([200]),
+    "search": frozenset([200]),
+}
+
+# (kind, method, target, body)
+Request = Tuple[str, str, str, Optional[bytes]]
+
+# (kind, status or None for a failed connection, latency in nanoseconds)
+Record = Tuple[str, Optional[int], int]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse a request mix such as 'single=4,ph-core=3,ig=1' into kind weights."""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind '{kind}' (expected one of {', '.join(KINDS)})")
+        mix[kind] = float(weight) if weight else 1.0
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError(f"Request mix has no positive weight: {text}")
+    return mix
+
+
+def _body(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _ig_targets() -> List[str]:
+    """Paths of the PH-Core definitions the IG endpoints serve."""
+    targets = []
+    for resource_type in ("StructureDefinition", "ValueSet", "CodeSystem"):
+        for path in sorted(IG_PATH.glob(f"{resource_type}-*.json")):
+            targets.append(f"/{resource_type}/{path.stem.split('-', 1)[1]}")
+    return targets
+
+
+def _search_targets() -> List[str]:
+    """Concept lookups by one- to three-letter display prefixes of the IG CodeSystems."""
+    targets = []
+    for path in sorted(IG_PATH.glob("CodeSystem-*.json")):
+        with open(path, "r", encoding="utf-8") as file:
+            code_system = json.load(file)
+        for concept in code_system.get("concept", []):
+            display = concept.get("display") or concept.get("code", "")
+            for length in (1, 2, 3):
+                targets.append(f"/CodeSystem/{code_system['id']}/$lookup?{urlencode({'prefix': display[:length]})}")
+    return sorted(set(targets))
+
+
+def build_requests(
+    mix: Dict[str, float],
+    count: int,
+    patients: int = 200,
+    invalid_ratio: float = 0.1,
+    batch_size: int = 10,
+    seed: int = 0
+) -> List[Request]:
+    """Build and serialize a request sequence.
+
+    Args:
+        mix: Weight of each request kind
+        count: Number of requests
+        patients: Patients in the workload the validation requests draw from
+        invalid_ratio: Share of workload resources with a deliberate defect
+        batch_size: Resources per batch request
+        seed: Random seed of the workload and of the request order
+
+    Returns:
+        Requests in sending order
+    """
+    rng = random.Random(seed)
+    generator = WorkloadGenerator(load_terminology(), seed, invalid_ratio)
+    resources = list(generator.resources(patients))
+    single_bodies = [_body({"resource": resource}) for resource in resources]
+    ig_targets = _ig_targets()
+    search_targets = _search_targets()
+
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    requests: List[Request] = []
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind in ("single", "ph-core"):
+            path = "/api/v1/validate" if kind == "single" else "/api/v1/validate/ph-core"
+            requests.append((kind, "POST", path, rng.choice(single_bodies)))
+        elif kind == "batch":
+            batch = [{"resource": resource} for resource in rng.sample(resources, min(batch_size, len(resources)))]
+            requests.append((kind, "POST", "/api/v1/validate/batch", _body(batch)))
+        elif kind == "ig":
+            requests.append((kind, "GET", rng.choice(ig_targets), None))
+        else:
+            requests.append((kind, "GET", rng.choice(search_targets), None))
+    return requests
+
+
+class ASGIClient:
+    """Calls an ASGI application directly, as a server would for one connection."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def request(self, method: str, target: str, body: Optional[bytes]) -> int:
+        """Send a request and read the whole response.
+
+        Returns:
+            Response status code
+        """
+        url = urlsplit(target)
+        headers = [(b"host", b"loadtest")]
+        if body is not None:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(url.path),
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        body_sent = False
+        response_complete = asyncio.Event()
+        status = 0
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body or b"", "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete.set()
+
+        await self.app(scope, receive, send)
+        response_complete.set()
+        return status
+
+    async def close(self) -> None:
+        pass
+
+
+class HTTPClient:
+    """Minimal HTTP/1.1 client over one keep-alive connection."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, target: str, body: Optional[bytes]) -> int:
+        """Send a request and read the whole response, reconnecting if the server closed the connection.
+
+        Returns:
+            Response status code
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self._writer.write(head.encode("latin-1") + b"\r\n" + (body or b""))
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self._reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+
+class LocalServer:
+    """uvicorn serving an application on a free local port, in a background thread."""
+
+    def __init__(self, app: Any):
+        # Import here so the asgi transport does not need uvicorn
+        import uvicorn
+
+        # uvicorn binds the port itself: connections accepted on a socket passed
+        # in with sockets=[...] stall ~40 ms per response on delayed ACKs
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off"
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "LocalServer":
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("Local server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+async def _drive(clients: Sequence[Any], requests: Sequence[Request]) -> List[Record]:
+    """Send the requests from every client concurrently, each client one at a time."""
+    records: List[Record] = []
+    pending: Iterator[Request] = iter(requests)
+    clock = time.perf_counter_ns
+
+    async def worker(client: Any) -> None:
+        for kind, method, target, body in pending:
+            start = clock()
+            try:
+                status: Optional[int] = await client.request(method, target, body)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                status = None
+                await client.close()
+            records.append((kind, status, clock() - start))
+
+    await asyncio.gather(*(worker(client) for client in clients))
+    return records
+
+
+async def run_load(
+    clients: Sequence[Any],
+    requests: Sequence[Request],
+    warmup: Sequence[Request] = ()
+) -> Tuple[List[Record], int]:
+    """Run the warmup requests, then the measured ones.
+
+    Returns:
+        Tuple of (one record per measured request, wall time in nanoseconds)
+    """
+    await _drive(clients, warmup)
+    start = time.perf_counter_ns()
+    records = await _drive(clients, requests)
+    wall_ns = time.perf_counter_ns() - start
+    for client in clients:
+        await client.close()
+    return records, wall_ns
+
+
+def summarize_load(records: Sequence[Record], wall_ns: int) -> List[Dict[str, Any]]:
+    """Summarize the records per request kind and overall ('all').
+
+    Throughput is requests per second of the whole run's wall time, so the
+    per-kind throughputs add up to the overall one.
+    """
+    groups: Dict[str, List[Record]] = {"all": list(records)}
+    for record in records:
+        groups.setdefault(record[0], []).append(record)
+
+    results = []
+    for kind in ["all"] + [kind for kind in KINDS if kind in groups]:
+        group = groups[kind]
+        statuses = Counter("failed" if status is None else str(status) for _, status, _ in group)
+        errors = sum(
+            1 for record_kind, status, _ in group
+            if status is None or status not in EXPECTED_STATUS[record_kind]
+        )
+        latencies = [latency for _, status, latency in group if status is not None]
+        results.append({
+            "name": kind,
+            "kind": kind,
+            "requests": len(group),
+            "throughput_rps": round(len(group) / (wall_ns / 1e9), 3) if wall_ns else None,
+            "errors": errors,
+            "error_rate": round(errors / len(group), 6) if group else 0.0,
+            "status_codes": dict(sorted(statuses.items())),
+            **summarize(latencies, LOAD_PERCENTILES),
+        })
+    return results
+
+
+def print_results(results: Sequence[Dict[str, Any]], wall_ns: int) -> None:
+    """Print one row per request kind."""
+    labels = [f"p{percentile_label(fraction)}" for fraction in LOAD_PERCENTILES]
+    print(f"{'kind':<10}{'requests':>9}{'req/s':>10}" + "".join(f"{label:>11}" for label in labels)
+          + f"{'errors':>9}", file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['kind']:<10}{result['requests']:>9}{result['throughput_rps']:>10.1f}"
+            + "".join(f"{format_ns(result[f'{label}_ns']):>11}" for label in labels)
+            + f"{result['error_rate']:>8.1%} ",
+            file=sys.stderr
+        )
+    print(f"Wall time {format_ns(wall_ns)}", file=sys.stderr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the API with a mix of requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request kinds and weights (default {DEFAULT_MIX})")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--transport", choices=("asgi", "socket"), default="asgi",
+                        help="Call the app in process (asgi) or over HTTP (socket)")
+    parser.add_argument("--url", help="Server to load over HTTP (socket transport; default: start one locally)")
+    parser.add_argument("--patients", type=int, default=200, help="Patients in the generated workload")
+    parser.add_argument("--invalid-ratio", type=float, default=0.1,
+                        help="Share of generated resources with a deliberate defect")
+    parser.add_argument("--batch-size", type=int, default=10, help="Resources per batch request")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--log-level", default="WARNING", help="Server log level during the run")
+    parser.add_argument("--output", help="Write the results as JSON to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+    if args.url and args.transport != "socket":
+        parser.error("--url requires --transport socket")
+
+    mix = parse_mix(args.mix)
+    requests = build_requests(mix, args.warmup + args.requests, args.patients,
+                              args.invalid_ratio, args.batch_size, args.seed)
+    warmup, measured = requests[:args.warmup], requests[args.warmup:]
+
+    # Import here so building the workload does not wait for the server's startup
+    from main import app
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    if args.transport == "asgi":
+        clients = [ASGIClient(app) for _ in range(args.concurrency)]
+        records, wall_ns = asyncio.run(run_load(clients, measured, warmup))
+    elif args.url:
+        url = urlsplit(args.url)
+        clients = [HTTPClient(url.hostname, url.port or 80) for _ in range(args.concurrency)]
+        records, wall_ns = asyncio.run(run_load(clients, measured, warmup))
+    else:
+        with LocalServer(app) as server:
+            clients = [HTTPClient("127.0.0.1", server.port) for _ in range(args.concurrency)]
+            records, wall_ns = asyncio.run(run_load(clients, measured, warmup))
+
+    results = summarize_load(records, wall_ns)
+    print_results(results, wall_ns)
+    write_results(args.output, "load", {
+        "mix": mix,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "transport": args.transport,
+        "url": args.url,
+        "patients": args.patients,
+        "invalid_ratio": args.invalid_ratio,
+        "batch_size": args.batch_size,
+        "seed": args.seed,
+        "wall_time_ns": wall_ns,
+    }, results)
+
+
+if __name__ == "__main__":
+    main()
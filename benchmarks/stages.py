@@ -0,0 +1,154 @@
+"""
+Benchmark of each FHIRValidator and PHCoreValidator stage in isolation.
+
+Every stage that validate_resource() and validate_ph_core_resource() time
+with StageTimer (resource_type, bundle_entries, json_schema,
+required_fields, coding_systems, ph_core.profile_selection,
+ph_core.profiles, ph_core.identifiers, ph_core.terminology,
+ph_core.address) is called directly on each resource of the corpus (see
+benchmarks.corpus), with the same inputs validate_resource() gives it, as
+are the complete validate_resource (standard and PH-Core) and
+validate_ph_core_resource calls. Each case reports ops/sec, p50/p99 latency
+and the memory a call allocates, and the run can be written as JSON.
+
+Usage:
+    python -m benchmarks.stages [--groups ig valid generated] [--stage json_schema ...]
+                                [--input Patient] [--min-time 0.05] [--output stages.json]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, ".")
+
+from benchmarks.corpus import GROUPS, load_corpus  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    format_ns, measure, measure_allocations, summarize, write_results
+)
+from src.utils.bundle_validator import bundle_validator  # noqa: E402
+from src.utils.fhir_validator import fhir_validator  # noqa: E402
+from src.utils.ph_core_validator import ph_core_validator  # noqa: E402
+from src.utils.profile_registry import profile_registry  # noqa: E402
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def stage_cases(resource: Dict[str, Any]) -> List[Case]:
+    """Build the (stage name, call) cases of one resource.
+
+    Stages get the inputs validate_resource() passes them: Bundle-level
+    stages see the Bundle without its entry resources, and the PH-Core
+    stages the profiles selected for the resource (or the default PH-Core
+    profile of its type). Stages that would not run for the resource are
+    left out.
+    """
+    resource_type = resource.get("resourceType")
+    structure = resource
+    cases: List[Case] = [("resource_type", lambda: fhir_validator._validate_resource_type(resource))]
+    if resource_type == "Bundle" and bundle_validator.has_entry_resources(resource):
+        structure = bundle_validator.without_entry_resources(resource)
+        cases.append(("bundle_entries", lambda: bundle_validator.validate_entries(resource)))
+    cases.extend([
+        ("json_schema", lambda: fhir_validator._validate_json_schema(structure)),
+        ("required_fields", lambda: fhir_validator._validate_required_fields(structure)),
+        ("coding_systems", lambda: fhir_validator._validate_coding_systems(structure)),
+        ("validate_resource", lambda: fhir_validator.validate_resource(
+            resource, use_ph_core=False, strict_ph_core=False
+        )),
+    ])
+
+    profiles, _ = ph_core_validator.select_profiles(resource)
+    if not profiles and ph_core_validator.get_profile_url(resource_type):
+        default_profile = profile_registry.get_compiled_profile(ph_core_validator.get_profile_url(resource_type))
+        profiles = [default_profile] if default_profile else []
+    cases.append(("ph_core.profile_selection", lambda: ph_core_validator.select_profiles(resource)))
+    if profiles:
+        cases.extend([
+            ("ph_core.profiles", lambda: ph_core_validator.validate_profiles(resource, profiles)),
+            ("ph_core.identifiers", lambda: ph_core_validator._validate_identifier_constraints(resource)),
+            ("ph_core.terminology", lambda: ph_core_validator._validate_terminology_bindings(resource, profiles[0])),
+            ("ph_core.address", lambda: ph_core_validator._validate_address_profile(resource)),
+        ])
+    cases.extend([
+        ("validate_ph_core_resource", lambda: ph_core_validator.validate_ph_core_resource(resource)),
+        ("validate_resource.ph_core", lambda: fhir_validator.validate_resource(resource)),
+    ])
+    return cases
+
+
+def run(
+    groups: List[str],
+    bundle_sizes: List[int],
+    stages: Optional[List[str]],
+    input_filter: Optional[str],
+    min_time: float,
+    max_iterations: int,
+    alloc_repeat: int
+) -> List[Dict[str, Any]]:
+    """Run every selected case and print one row per case.
+
+    Returns:
+        One result dictionary per case
+    """
+    results = []
+    print(f"{'case':<64}{'iters':>7}{'ops/sec':>11}{'p50':>11}{'p99':>11}{'alloc peak':>12}", file=sys.stderr)
+    for input_name, resource in load_corpus(groups, bundle_sizes):
+        if input_filter and input_filter not in input_name:
+            continue
+        input_bytes = len(json.dumps(resource, separators=(",", ":")).encode())
+        for stage, call in stage_cases(resource):
+            if stages and stage not in stages:
+                continue
+            summary = summarize(measure(call, min_time=min_time, max_iterations=max_iterations))
+            allocations = measure_allocations(call, alloc_repeat) if alloc_repeat else {}
+            result = {
+                "name": f"{stage}/{input_name}",
+                "stage": stage,
+                "input": input_name,
+                "input_bytes": input_bytes,
+                **summary,
+                **allocations,
+            }
+            results.append(result)
+            peak = allocations.get("alloc_peak_bytes")
+            print(
+                f"{result['name'][:63]:<64}{summary['iterations']:>7}{summary['ops_per_sec']:>11.1f}"
+                f"{format_ns(summary['p50_ns']):>11}{format_ns(summary['p99_ns']):>11}"
+                f"{'-' if peak is None else f'{peak / 1024:.0f} KiB':>12}",
+                file=sys.stderr
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark each validation stage on a fixed corpus")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS),
+                        help="Corpus groups to run")
+    parser.add_argument("--bundle-sizes", type=int, nargs="+", default=[100, 1000],
+                        help="Entry counts of the generated transaction Bundles")
+    parser.add_argument("--stage", nargs="+", help="Only run these stages")
+    parser.add_argument("--input", help="Only run inputs whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum timed seconds per case")
+    parser.add_argument("--max-iterations", type=int, default=10000, help="Maximum timed calls per case")
+    parser.add_argument("--alloc-repeat", type=int, default=3,
+                        help="Calls traced for allocations per case (0 to skip)")
+    parser.add_argument("--output", help="Write the results as JSON to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args.groups, args.bundle_sizes, args.stage, args.input,
+                  args.min_time, args.max_iterations, args.alloc_repeat)
+    write_results(args.output, "stages", {
+        "groups": args.groups,
+        "bundle_sizes": args.bundle_sizes,
+        "stages": args.stage,
+        "input": args.input,
+        "min_time": args.min_time,
+        "max_iterations": args.max_iterations,
+        "alloc_repeat": args.alloc_repeat,
+    }, results)
+
+
+if __name__ == "__main__":
+    main()
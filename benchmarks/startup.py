@@ -0,0 +1,136 @@
+"""
+Benchmark of server startup time and memory.
+
+Each run starts a fresh interpreter that imports main (loading every FHIR
+base and PH-Core definition, building the indexes and compiling the
+profiles), sends the first PH-Core validation request through the ASGI
+application, and measures the process's resident memory and the deep
+size of every structure the admin memory report accounts for. Runs are
+repeated so startup and memory get a mean and spread like the other
+suites:
+
+- startup/import_main: time to import main
+- startup/first_request: first POST /api/v1/validate/ph-core, with lazy work
+- memory/rss_after_startup, memory/rss_after_first_request: process RSS
+- memory/accounted and memory/<structure>: MemoryReporter sizes
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--output startup.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+sys.path.insert(0, ".")
+
+from benchmarks.harness import format_ns, summarize, summarize_bytes, write_results  # noqa: E402
+from src.constants.fhir_constants import PROJECT_ROOT  # noqa: E402
+
+
+def probe() -> Dict[str, Any]:
+    """Start the server in this process and measure it (run in a fresh interpreter)."""
+    start = time.perf_counter_ns()
+    from main import app
+    import_ns = time.perf_counter_ns() - start
+
+    # Import here so their imports are not charged to main
+    import psutil
+
+    from benchmarks.load import ASGIClient
+    from benchmarks.workload import WorkloadGenerator, load_terminology
+    from src.utils.memory_report import memory_reporter
+
+    process = psutil.Process(os.getpid())
+    rss_after_startup = process.memory_info().rss
+    patient = WorkloadGenerator(load_terminology()).patient()
+    body = json.dumps({"resource": patient}).encode()
+
+    start = time.perf_counter_ns()
+    status = asyncio.run(ASGIClient(app).request("POST", "/api/v1/validate/ph-core", body))
+    first_request_ns = time.perf_counter_ns() - start
+
+    rss_after_first_request = process.memory_info().rss
+    report = memory_reporter.report()
+    return {
+        "import_ns": import_ns,
+        "first_request_ns": first_request_ns,
+        "first_request_status": status,
+        "rss_after_startup_bytes": rss_after_startup,
+        "rss_after_first_request_bytes": rss_after_first_request,
+        "accounted_bytes": report.accounted_bytes,
+        "structures": {usage.name: usage.size_bytes for usage in report.structures},
+    }
+
+
+def run_probe() -> Dict[str, Any]:
+    """Run probe() in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--probe"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout)
+
+
+def run(runs: int) -> List[Dict[str, Any]]:
+    """Run the probe `runs` times and summarize each measurement.
+
+    Returns:
+        One result dictionary per measurement
+    """
+    probes = []
+    for index in range(runs):
+        probes.append(run_probe())
+        print(
+            f"run {index + 1}/{runs}: import {format_ns(probes[-1]['import_ns'])}, "
+            f"first request {format_ns(probes[-1]['first_request_ns'])}, "
+            f"RSS {probes[-1]['rss_after_first_request_bytes'] / 2 ** 20:.1f} MiB",
+            file=sys.stderr
+        )
+
+    results = [
+        {"name": "startup/import_main", **summarize([probe["import_ns"] for probe in probes])},
+        {
+            "name": "startup/first_request",
+            "statuses": sorted({probe["first_request_status"] for probe in probes}),
+            **summarize([probe["first_request_ns"] for probe in probes]),
+        },
+    ]
+    for name in ("rss_after_startup", "rss_after_first_request", "accounted"):
+        results.append({
+            "name": f"memory/{name}",
+            **summarize_bytes([probe[f"{name}_bytes"] for probe in probes]),
+        })
+    for name in probes[0]["structures"]:
+        results.append({
+            "name": f"memory/{name}",
+            **summarize_bytes([probe["structures"].get(name, 0) for probe in probes]),
+        })
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark server startup time and memory")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters started")
+    parser.add_argument("--output", help="Write the results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        # The server logs to stderr; stdout carries only the measurements
+        json.dump(probe(), sys.stdout)
+        return
+
+    results = run(args.runs)
+    write_results(args.output, "startup", {"runs": args.runs}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark of the JSON traversal behind the coding and reference checks.
+
+Builds deeply nested Questionnaires (item.item...) and Bundles whose entries
+carry contained/extension chains, then times FHIRValidator.check_codings
+against the recursive implementation it replaced, and collect_references
+on each resource. Both walk with JSONWalker. The recursive implementation
+runs under the default recursion limit, so inputs nested past it are
+reported as failing.
+
+Usage:
+    python -m benchmarks.traversal [--depth 50 200 2000] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, ".")
+
+from src.lib.json_walker import JSONWalker  # noqa: E402
+from src.types.fhir_types import ValidationIssue, ValidationSeverity  # noqa: E402
+from src.ui.ig_endpoints import ph_core_ig_server  # noqa: E402
+from src.utils.bundle_validator import collect_references  # noqa: E402
+from src.utils.fhir_validator import fhir_validator  # noqa: E402
+
+
+def nested_questionnaire(depth: int, fan_out: int = 3) -> Dict[str, Any]:
+    """Build a Questionnaire whose items nest `depth` levels deep."""
+    def item(link_id: str) -> Dict[str, Any]:
+        return {
+            "linkId": link_id,
+            "type": "choice",
+            "answerOption": [
+                {"valueCoding": {"system": "http://snomed.info/sct", "code": str(373066001 + n)}}
+                for n in range(fan_out)
+            ],
+        }
+
+    root = item("1")
+    node = root
+    for level in range(1, depth):
+        siblings = [item(f"{level}.{n}") for n in range(fan_out)]
+        node["item"] = siblings
+        node = siblings[0]
+    return {"resourceType": "Questionnaire", "status": "active", "item": [root]}
+
+
+def nested_bundle(depth: int, entries: int = 20) -> Dict[str, Any]:
+    """Build a Bundle whose entries carry contained/extension chains `depth` levels deep."""
+    def resource(index: int) -> Dict[str, Any]:
+        patient: Dict[str, Any] = {"resourceType": "Patient", "id": f"p{index}"}
+        node = patient
+        for level in range(depth // 2):
+            child = {
+                "resourceType": "Observation",
+                "id": f"o{index}-{level}",
+                "subject": {"reference": f"Patient/p{index}"},
+                "code": {"coding": [{"system": "http://loinc.org", "code": "8867-4"}]},
+            }
+            extension = {"url": "http://example.org/ext", "valueReference": {"reference": f"#o{index}-{level}"}}
+            node["contained"] = [child]
+            node["extension"] = [extension]
+            node = child
+        return patient
+
+    return {
+        "resourceType": "Bundle",
+        "type": "collection",
+        "entry": [{"fullUrl": f"urn:uuid:{index}", "resource": resource(index)} for index in range(entries)],
+    }
+
+
+def recursive_check_codings(obj: Any, path: str, issues: List[ValidationIssue]) -> None:
+    """FHIRValidator.check_codings as it was before JSONWalker, for comparison."""
+    if isinstance(obj, dict):
+        if 'system' in obj and 'code' in obj:
+            system = obj.get('system')
+            code = obj.get('code')
+            if not isinstance(system, str) or not system:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="invalid-coding-system",
+                    details="Coding system must be a valid URI",
+                    location=f"{path}.system" if path else "system"
+                ))
+            if not isinstance(code, str) or not code:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="invalid-coding-code",
+                    details="Coding code must be a non-empty string",
+                    location=f"{path}.code" if path else "code"
+                ))
+            ph_core_ig_server.system_index.classify(system)
+        for key, value in obj.items():
+            recursive_check_codings(value, f"{path}.{key}" if path else key, issues)
+    elif isinstance(obj, list):
+        for i, item in enumerate(obj):
+            recursive_check_codings(item, f"{path}[{i}]" if path else f"[{i}]", issues)
+
+
+def count_nodes(value: Any) -> int:
+    """Count the objects and arrays of a value."""
+    return sum(1 for _ in JSONWalker(value))
+
+
+def median_ms(function: Callable[[], Any], repeat: int) -> Optional[float]:
+    """Median wall time of `repeat` calls in milliseconds (None on RecursionError)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        try:
+            function()
+        except RecursionError:
+            return None
+        timings.append((time.perf_counter_ns() - start) / 1e6)
+    return statistics.median(timings)
+
+
+def run(depths: List[int], repeat: int) -> None:
+    """Run the benchmark and print one row per input."""
+    print(f"{'input':<26}{'nodes':>9}{'recursive ms':>16}{'check_codings ms':>18}{'references ms':>15}")
+    for depth in depths:
+        for name, document in (
+            (f"Questionnaire depth={depth}", nested_questionnaire(depth)),
+            (f"Bundle depth={depth}", nested_bundle(depth)),
+        ):
+            recursive = median_ms(lambda: recursive_check_codings(document, "", []), repeat)
+            codings = median_ms(lambda: fhir_validator.check_codings(document, "", []), repeat)
+            resources = [entry["resource"] for entry in document.get("entry", [])] or [document]
+            references = median_ms(lambda: [collect_references(resource) for resource in resources], repeat)
+            print(
+                f"{name:<26}{count_nodes(document):>9}"
+                f"{'RecursionError' if recursive is None else f'{recursive:.2f}':>16}"
+                f"{codings:>18.2f}{references:>15.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON traversal of nested resources")
+    parser.add_argument("--depth", type=int, nargs="+", default=[50, 200, 2000],
+                        help="Nesting depths to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement (median reported)")
+    args = parser.parse_args()
+    run(args.depth, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+Synthetic PH-Core workload generator for benchmarks and load tests.
+
+Builds any number of Patients (PhilHealth and PhilSys identifiers,
+indigenous-people and indigenous-group extensions, PH-Core addresses),
+with Encounters and vital-sign Observations referring to them, so the
+server can be benchmarked and capacity-planned without real patient data.
+Codes come from the PH-Core IG bundled in
+resources/implementation_guides/ph_core: indigenous groups from its
+CodeSystem, provinces, cities and barangays from the PSGC ValueSets, and
+identifier systems and value masks from its Identifier profiles.
+
+A configurable share of the resources carries one deliberate defect each
+(a malformed PhilHealth ID, an extension value of the wrong type, a
+missing required element, ...), so a workload exercises failing
+validations as well as passing ones. The same seed always produces the
+same workload.
+
+Resources are written as JSON (one file per resource), NDJSON (one
+resource per line) or transaction Bundles of N entries whose references
+use the entries' urn:uuid fullUrls.
+
+Usage:
+    python -m benchmarks.workload --patients 1000 --format ndjson --output workload.ndjson
+    python -m benchmarks.workload --patients 500 --format bundle --bundle-size 100 \
+                                  --invalid-ratio 0.1 --output workload/
+"""
+
+import argparse
+import json
+import random
+import sys
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, ".")
+
+from src.constants.fhir_constants import PROJECT_ROOT  # noqa: E402
+
+IG_PATH = PROJECT_ROOT / "resources" / "implementation_guides" / "ph_core"
+
+FORMATS = ("json", "ndjson", "bundle")
+
+# Coding = (system, code, display)
+Coding = Tuple[str, str, str]
+
+_V3_ACT_CODE = "http://terminology.hl7.org/CodeSystem/v3-ActCode"
+_LOINC = "http://loinc.org"
+_UCUM = "http://unitsofmeasure.org"
+
+_GIVEN_NAMES = (
+    "Juan", "Jose", "Maria", "Ana", "Mark", "Angelo", "Kristine", "Rosalie", "Ramon", "Jerome",
+    "Liza", "Mylene", "Rodel", "Jericho", "Princess", "Daisy", "Arnel", "Joy", "Carlo", "Bea",
+)
+_FAMILY_NAMES = (
+    "Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Ramos",
+    "Aquino", "Castillo", "Fernandez", "Navarro", "Tolentino", "Manalo", "Soriano", "Pascual",
+)
+_STREETS = ("Mabini Street", "Rizal Avenue", "Bonifacio Street", "Luna Street", "Quezon Boulevard")
+
+_ENCOUNTER_CLASSES = (
+    (_V3_ACT_CODE, "AMB", "ambulatory"),
+    (_V3_ACT_CODE, "EMER", "emergency"),
+    (_V3_ACT_CODE, "IMP", "inpatient encounter"),
+)
+
+# (code, display, unit, UCUM code, low, high)
+_VITAL_SIGNS = (
+    ("8867-4", "Heart rate", "beats/minute", "/min", 55, 110),
+    ("9279-1", "Respiratory rate", "breaths/minute", "/min", 12, 24),
+    ("8310-5", "Body temperature", "C", "Cel", 36, 39),
+    ("29463-7", "Body weight", "kg", "kg", 8, 110),
+    ("8302-2", "Body height", "cm", "cm", 60, 190),
+)
+
+# Defects a resource of each type can carry (see WorkloadGenerator._apply_defect)
+DEFECTS = {
+    "Patient": (
+        "philhealth-id-format", "indigenous-people-not-boolean", "invalid-gender",
+        "invalid-birth-date", "invalid-identifier-system",
+    ),
+    "Encounter": ("missing-status", "invalid-status", "missing-class"),
+    "Observation": ("missing-code", "missing-status", "invalid-value-quantity"),
+}
+
+# Start of the simulated calendar; fixed so a seed reproduces the same dates
+_EPOCH = date(2024, 1, 1)
+
+
+@dataclass(frozen=True)
+class PHCoreTerminology:
+    """Codes, systems and canonical URLs of the PH-Core IG used by the generator."""
+    profiles: Dict[str, str]
+    extensions: Dict[str, str]
+    indigenous_groups: Tuple[Coding, ...]
+    provinces: Tuple[Coding, ...]
+    cities: Tuple[Coding, ...]
+    barangays: Tuple[Coding, ...]
+    philhealth_system: str
+    philhealth_mask: str
+    philsys_system: str
+    philsys_mask: str
+
+
+def _load_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _value_set_codings(value_set: Dict[str, Any]) -> Tuple[Coding, ...]:
+    """Codings enumerated in a ValueSet's compose.include."""
+    return tuple(
+        (include["system"], concept["code"], concept.get("display", concept["code"]))
+        for include in value_set.get("compose", {}).get("include", [])
+        for concept in include.get("concept", [])
+    )
+
+
+def _identifier_rules(profile: Dict[str, Any]) -> Tuple[str, str]:
+    """Fixed system URI and value mask of an Identifier profile."""
+    system = mask = None
+    for element in profile.get("differential", {}).get("element", []):
+        if element.get("path") == "Identifier.system":
+            system = element.get("fixedUri")
+        elif element.get("path") == "Identifier.value":
+            mask = next((example["valueString"] for example in element.get("example", [])), None)
+    if not system or not mask:
+        raise ValueError(f"Identifier profile {profile.get('id')} has no fixed system or value mask")
+    return system, mask
+
+
+def load_terminology(ig_path: Path = IG_PATH) -> PHCoreTerminology:
+    """Load the generator's codes and URLs from the PH-Core IG.
+
+    Args:
+        ig_path: Directory of the IG's JSON resources
+
+    Returns:
+        PH-Core terminology
+    """
+    definitions = {
+        path.stem.split("-", 1)[1]: _load_json(path)
+        for path in ig_path.glob("StructureDefinition-*.json")
+    }
+    indigenous_groups = _load_json(ig_path / "CodeSystem-indigenous-groups.json")
+    philhealth_system, philhealth_mask = _identifier_rules(definitions["ph-core-philhealth-id"])
+    philsys_system, philsys_mask = _identifier_rules(definitions["ph-core-philsys-id"])
+    return PHCoreTerminology(
+        profiles={
+            resource_type: definitions[f"ph-core-{resource_type.lower()}"]["url"]
+            for resource_type in DEFECTS
+        },
+        extensions={
+            name: definitions[name]["url"]
+            for name in ("indigenous-people", "indigenous-group", "province", "city-municipality", "barangay")
+        },
+        indigenous_groups=tuple(
+            (indigenous_groups["url"], concept["code"], concept.get("display", concept["code"]))
+            for concept in indigenous_groups.get("concept", [])
+        ),
+        provinces=_value_set_codings(_load_json(ig_path / "ValueSet-provinces.json")),
+        cities=_value_set_codings(_load_json(ig_path / "ValueSet-cities.json")),
+        barangays=_value_set_codings(_load_json(ig_path / "ValueSet-barangays.json")),
+        philhealth_system=philhealth_system,
+        philhealth_mask=philhealth_mask,
+        philsys_system=philsys_system,
+        philsys_mask=philsys_mask,
+    )
+
+
+def _coding(coding: Coding) -> Dict[str, str]:
+    system, code, display = coding
+    return {"system": system, "code": code, "display": display}
+
+
+class WorkloadGenerator:
+    """Deterministic generator of synthetic PH-Core resources.
+
+    Resources are generated as patient records: a Patient followed by its
+    Encounters, each followed by its Observations. Every resource has a
+    unique id and urn:uuid fullUrl; references are relative ('Patient/<id>')
+    or, for Bundle entries, the referenced entry's fullUrl.
+    """
+
+    def __init__(
+        self,
+        terminology: PHCoreTerminology,
+        seed: int = 0,
+        invalid_ratio: float = 0.0,
+        encounters_per_patient: int = 1,
+        observations_per_encounter: int = 2
+    ):
+        """Initialize the generator.
+
+        Args:
+            terminology: PH-Core codes and URLs (see load_terminology)
+            seed: Random seed; the same seed produces the same resources
+            invalid_ratio: Share of resources (0 to 1) given one deliberate defect
+            encounters_per_patient: Encounters generated for each Patient
+            observations_per_encounter: Observations generated for each Encounter
+        """
+        if not 0.0 <= invalid_ratio <= 1.0:
+            raise ValueError(f"invalid_ratio must be between 0 and 1, got {invalid_ratio}")
+        self.terminology = terminology
+        self.invalid_ratio = invalid_ratio
+        self.encounters_per_patient = encounters_per_patient
+        self.observations_per_encounter = observations_per_encounter
+        self.defects: Counter = Counter()
+        self.generated: Counter = Counter()
+        self._random = random.Random(seed)
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def _digits(self, mask: str) -> str:
+        """Random value matching a PH-Core value mask ('n' is a digit)."""
+        return "".join(str(self._random.randrange(10)) if char == "n" else char for char in mask)
+
+    def _date(self, start: date, days: int) -> date:
+        return start + timedelta(days=self._random.randrange(days))
+
+    def _entry(self, resource: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Finish a resource: count it, apply a defect to its share of resources and give it a fullUrl."""
+        resource_type = resource["resourceType"]
+        self.generated[resource_type] += 1
+        if self.invalid_ratio and self._random.random() < self.invalid_ratio:
+            defect = self._random.choice(DEFECTS[resource_type])
+            self._apply_defect(resource, defect)
+            self.defects[defect] += 1
+        return f"urn:uuid:{self._uuid()}", resource
+
+    def patient(self) -> Dict[str, Any]:
+        """Generate a conformant PH-Core Patient."""
+        terminology = self.terminology
+        choice = self._random.choice
+        gender = choice(("male", "female"))
+        given = [choice(_GIVEN_NAMES), choice(_GIVEN_NAMES)]
+        family = choice(_FAMILY_NAMES)
+        birth_date = self._date(_EPOCH - timedelta(days=365 * 90), 365 * 90)
+
+        extensions: List[Dict[str, Any]] = []
+        indigenous = self._random.random() < 0.15
+        extensions.append({"url": terminology.extensions["indigenous-people"], "valueBoolean": indigenous})
+        if indigenous and terminology.indigenous_groups:
+            extensions.append({
+                "url": terminology.extensions["indigenous-group"],
+                "valueCodeableConcept": {"coding": [_coding(choice(terminology.indigenous_groups))]},
+            })
+
+        identifiers = [{"system": terminology.philhealth_system, "value": self._digits(terminology.philhealth_mask)}]
+        if self._random.random() < 0.5:
+            identifiers.append({"system": terminology.philsys_system, "value": self._digits(terminology.philsys_mask)})
+
+        address_extensions = []
+        for name, codings in (
+            ("province", terminology.provinces),
+            ("city-municipality", terminology.cities),
+            ("barangay", terminology.barangays),
+        ):
+            if codings:
+                address_extensions.append({"url": terminology.extensions[name], "valueCoding": _coding(choice(codings))})
+        city = next(
+            (extension["valueCoding"]["display"] for extension in address_extensions
+             if extension["url"] == terminology.extensions["city-municipality"]),
+            "Quezon City"
+        )
+
+        return {
+            "resourceType": "Patient",
+            "id": f"ph-patient-{self.generated['Patient'] + 1:07d}",
+            "meta": {"profile": [terminology.profiles["Patient"]]},
+            "text": {
+                "status": "generated",
+                "div": f"<div xmlns=\"http://www.w3.org/1999/xhtml\">{' '.join(given)} {family}, "
+                       f"{gender}, born {birth_date.isoformat()}</div>",
+            },
+            "extension": extensions,
+            "identifier": identifiers,
+            "active": True,
+            "name": [{"use": "official", "family": family, "given": given}],
+            "telecom": [{"system": "phone", "value": f"+639{self._digits('nnnnnnnnn')}", "use": "mobile"}],
+            "gender": gender,
+            "birthDate": birth_date.isoformat(),
+            "address": [{
+                "extension": address_extensions,
+                "use": "home",
+                "line": [f"{self._random.randrange(1, 999)} {choice(_STREETS)}"],
+                "city": city,
+                "postalCode": self._digits("nnnn"),
+                "country": "PH",
+            }],
+        }
+
+    def encounter(self, subject: str) -> Dict[str, Any]:
+        """Generate a finished PH-Core Encounter of a Patient."""
+        encounter_class = self._random.choice(_ENCOUNTER_CLASSES)
+        start = datetime.combine(self._date(_EPOCH, 365), datetime.min.time(), tzinfo=timezone.utc)
+        start += timedelta(minutes=self._random.randrange(8 * 60, 18 * 60))
+        end = start + timedelta(minutes=self._random.randrange(15, 240))
+        return {
+            "resourceType": "Encounter",
+            "id": f"ph-encounter-{self.generated['Encounter'] + 1:07d}",
+            "meta": {"profile": [self.terminology.profiles["Encounter"]]},
+            "status": "finished",
+            "class": _coding(encounter_class),
+            "subject": {"reference": subject},
+            "period": {"start": start.isoformat(), "end": end.isoformat()},
+        }
+
+    def observation(self, subject: str, encounter: str, effective: str) -> Dict[str, Any]:
+        """Generate a final vital-sign PH-Core Observation of an Encounter."""
+        code, display, unit, ucum, low, high = self._random.choice(_VITAL_SIGNS)
+        return {
+            "resourceType": "Observation",
+            "id": f"ph-observation-{self.generated['Observation'] + 1:07d}",
+            "meta": {"profile": [self.terminology.profiles["Observation"]]},
+            "status": "final",
+            "category": [{"coding": [{
+                "system": "http://terminology.hl7.org/CodeSystem/observation-category",
+                "code": "vital-signs",
+                "display": "Vital Signs",
+            }]}],
+            "code": {"coding": [{"system": _LOINC, "code": code, "display": display}], "text": display},
+            "subject": {"reference": subject},
+            "encounter": {"reference": encounter},
+            "effectiveDateTime": effective,
+            "valueQuantity": {
+                "value": round(self._random.uniform(low, high), 1),
+                "unit": unit,
+                "system": _UCUM,
+                "code": ucum,
+            },
+        }
+
+    def patient_record(self, bundle_references: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """Generate a Patient with its Encounters and Observations.
+
+        Args:
+            bundle_references: Refer to other resources of the record by
+                their urn:uuid fullUrl instead of 'Type/id'
+
+        Returns:
+            List of (fullUrl, resource), each resource after the ones it refers to
+        """
+        patient_url, patient = self._entry(self.patient())
+        record = [(patient_url, patient)]
+        subject = patient_url if bundle_references else f"Patient/{patient['id']}"
+        for _ in range(self.encounters_per_patient):
+            encounter_url, encounter = self._entry(self.encounter(subject))
+            record.append((encounter_url, encounter))
+            reference = encounter_url if bundle_references else f"Encounter/{encounter['id']}"
+            effective = encounter["period"]["start"]
+            for _ in range(self.observations_per_encounter):
+                record.append(self._entry(self.observation(subject, reference, effective)))
+        return record
+
+    def resources(self, patients: int) -> Iterator[Dict[str, Any]]:
+        """Generate the records of `patients` Patients as standalone resources."""
+        for _ in range(patients):
+            for _, resource in self.patient_record():
+                yield resource
+
+    def transaction_bundle(self, entries: int) -> Dict[str, Any]:
+        """Generate a transaction Bundle of exactly `entries` entries.
+
+        Patient records are added whole while they fit; the last one is cut
+        short, which keeps every reference resolvable because resources come
+        after the ones they refer to.
+        """
+        bundle_entries: List[Dict[str, Any]] = []
+        while len(bundle_entries) < entries:
+            for full_url, resource in self.patient_record(bundle_references=True)[:entries - len(bundle_entries)]:
+                bundle_entries.append({
+                    "fullUrl": full_url,
+                    "resource": resource,
+                    "request": {"method": "POST", "url": resource["resourceType"]},
+                })
+        return {"resourceType": "Bundle", "type": "transaction", "entry": bundle_entries}
+
+    def transaction_bundles(self, patients: int, entries: int) -> Iterator[Dict[str, Any]]:
+        """Generate transaction Bundles of `entries` entries until `patients` Patients are generated."""
+        while self.generated["Patient"] < patients:
+            yield self.transaction_bundle(entries)
+
+    def _apply_defect(self, resource: Dict[str, Any], defect: str) -> None:
+        """Break one rule the validator checks."""
+        if defect == "philhealth-id-format":
+            resource["identifier"][0]["value"] = self._digits("nnnn-nnnn")
+        elif defect == "indigenous-people-not-boolean":
+            resource["extension"][0] = {"url": self.terminology.extensions["indigenous-people"], "valueString": "yes"}
+        elif defect == "invalid-gender":
+            resource["gender"] = "M"
+        elif defect == "invalid-birth-date":
+            resource["birthDate"] = f"{resource['birthDate'][:4]}-13-32"
+        elif defect == "invalid-identifier-system":
+            resource["identifier"][0]["system"] = "PhilHealth ID"
+        elif defect == "missing-status":
+            del resource["status"]
+        elif defect == "invalid-status":
+            resource["status"] = "done"
+        elif defect == "missing-class":
+            del resource["class"]
+        elif defect == "missing-code":
+            del resource["code"]
+        elif defect == "invalid-value-quantity":
+            resource["valueQuantity"]["value"] = str(resource["valueQuantity"]["value"])
+        else:
+            raise ValueError(f"Unknown defect: {defect}")
+
+
+def write_json(resources: Iterable[Dict[str, Any]], directory: Path) -> int:
+    """Write each resource to '<directory>/<Type>-<id>.json'."""
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for resource in resources:
+        path = directory / f"{resource['resourceType']}-{resource['id']}.json"
+        path.write_text(json.dumps(resource, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        count += 1
+    return count
+
+
+def write_ndjson(resources: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write one resource per line to a file, or to standard output for '-'."""
+    output = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    count = 0
+    try:
+        for resource in resources:
+            output.write(json.dumps(resource, separators=(",", ":"), ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return count
+
+
+def write_bundles(bundles: Iterable[Dict[str, Any]], directory: Path) -> int:
+    """Write each Bundle to '<directory>/bundle-<n>.json'."""
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for count, bundle in enumerate(bundles, 1):
+        path = directory / f"bundle-{count:05d}.json"
+        path.write_text(json.dumps(bundle, separators=(",", ":"), ensure_ascii=False) + "\n", encoding="utf-8")
+    return count
+
+
+def generate(
+    output: str,
+    output_format: str,
+    patients: int,
+    bundle_size: int = 100,
+    seed: int = 0,
+    invalid_ratio: float = 0.0,
+    encounters_per_patient: int = 1,
+    observations_per_encounter: int = 2
+) -> WorkloadGenerator:
+    """Generate a workload and write it.
+
+    Args:
+        output: Directory ('json', 'bundle') or file ('ndjson', '-' for stdout)
+        output_format: 'json', 'ndjson' or 'bundle'
+        patients: Number of Patients (Bundles stop at the first one that reaches it)
+        bundle_size: Entries per transaction Bundle
+        seed: Random seed
+        invalid_ratio: Share of resources given one deliberate defect
+        encounters_per_patient: Encounters per Patient
+        observations_per_encounter: Observations per Encounter
+
+    Returns:
+        The generator, with its generated and defect counts
+    """
+    generator = WorkloadGenerator(
+        load_terminology(), seed, invalid_ratio, encounters_per_patient, observations_per_encounter
+    )
+    if output_format == "json":
+        write_json(generator.resources(patients), Path(output))
+    elif output_format == "ndjson":
+        write_ndjson(generator.resources(patients), output)
+    elif output_format == "bundle":
+        write_bundles(generator.transaction_bundles(patients, bundle_size), Path(output))
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return generator
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic PH-Core workload")
+    parser.add_argument("--patients", type=int, default=100, help="Number of Patients")
+    parser.add_argument("--encounters", type=int, default=1, help="Encounters per Patient")
+    parser.add_argument("--observations", type=int, default=2, help="Observations per Encounter")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="Output format")
+    parser.add_argument("--bundle-size", type=int, default=100, help="Entries per transaction Bundle")
+    parser.add_argument("--invalid-ratio", type=float, default=0.0,
+                        help="Share of resources (0 to 1) given one deliberate defect")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", required=True,
+                        help="Output directory (json, bundle) or file (ndjson, '-' for stdout)")
+    args = parser.parse_args(argv)
+
+    generator = generate(
+        args.output, args.format, args.patients, args.bundle_size, args.seed,
+        args.invalid_ratio, args.encounters, args.observations
+    )
+    generated = ", ".join(f"{count} {resource_type}" for resource_type, count in generator.generated.items())
+    defects = ", ".join(f"{count} {defect}" for defect, count in sorted(generator.defects.items())) or "none"
+    print(f"Generated {generated}; defects: {defects}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from fastapi.staticfiles import StaticFiles
 from src.ui.api_endpoints import router
 from src.ui.ig_endpoints import ig_router
 from src.ui.web_endpoints import web_router
+from src.ui.request_limits import RequestLimitsMiddleware
+from src.ui.request_tracing import TracingMiddleware
+from src.ui.metrics_endpoints import metrics_router, MetricsMiddleware
 from src.constants.fhir_constants import (
     SERVER_NAME, SERVER_VERSION, SERVER_DESCRIPTION, DEFAULT_HOST, DEFAULT_PORT
 )
@@ -82,6 +85,10 @@ app = FastAPI(
     servers=get_server_config()
 )
 
+# Reject oversized or deeply nested request bodies before they are parsed
+# (added before CORS so that its rejections carry CORS headers)
+app.add_middleware(RequestLimitsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -91,6 +98,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record each request as a trace span (exported only when TRACE_EXPORT_FILE is set)
+app.add_middleware(TracingMiddleware)
+
+# Record request latency (outermost, so rejected requests are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
@@ -100,6 +113,9 @@ app.include_router(ig_router)
 # Include web frontend routes
 app.include_router(web_router)
 
+# Include Prometheus metrics route (no prefix - scraped at /metrics)
+app.include_router(metrics_router)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -1,5 +1,6 @@
 """FHIR validation server constants."""
 
+import os
 from pathlib import Path
 
 # Server configuration
@@ -28,10 +29,68 @@ VERSION_INFO_FILE = RESOURCES_PATH / "version.info"
 # HTTP Status codes
 HTTP_200_OK = 200
 HTTP_400_BAD_REQUEST = 400
+HTTP_401_UNAUTHORIZED = 401
+HTTP_403_FORBIDDEN = 403
 HTTP_404_NOT_FOUND = 404
+HTTP_413_REQUEST_ENTITY_TOO_LARGE = 413
 HTTP_422_UNPROCESSABLE_ENTITY = 422
 HTTP_500_INTERNAL_SERVER_ERROR = 500
 
+# Terminology operation limits
+MAX_TRANSLATE_BATCH_SIZE = 10000
+DEFAULT_LOOKUP_COUNT = 10
+MAX_LOOKUP_COUNT = 100
+
+# PH-Core canonical URL base; some IG resources still use the pre-publication base
+PH_CORE_CANONICAL_BASE = "https://wah4pc-validation.echosphere.cfd/"
+PH_CORE_LEGACY_CANONICAL_BASE = "urn://example.com/ph-core/fhir/"
+
+# Profile validation
+MAX_COMPILED_PROFILES = 256
+
+# Bundle validation (entries are validated concurrently above the threshold)
+BUNDLE_VALIDATION_MAX_WORKERS = 4
+BUNDLE_PARALLEL_MIN_ENTRIES = 4
+
+# Delta validation (validated resources retained for JSON Patch re-validation,
+# bounded by count and by the total size of their JSON; larger resources get no token)
+MAX_VALIDATION_TOKENS = 1024
+MAX_VALIDATION_TOKEN_BYTES = int(os.getenv("MAX_VALIDATION_TOKEN_BYTES", 64 * 1024 * 1024))
+MAX_VALIDATION_TOKEN_RESOURCE_BYTES = int(os.getenv("MAX_VALIDATION_TOKEN_RESOURCE_BYTES", 1024 * 1024))
+
+# Partial validation (compiled element path rules retained)
+MAX_PARTIAL_PATH_RULES = 4096
+
+# Request limits (checked before a request body is parsed; overridable by environment)
+MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", 10 * 1024 * 1024))
+MAX_STREAM_BODY_BYTES = int(os.getenv("MAX_STREAM_BODY_BYTES", 512 * 1024 * 1024))
+MAX_JSON_DEPTH = int(os.getenv("MAX_JSON_DEPTH", 64))
+MAX_JSON_ARRAY_LENGTH = int(os.getenv("MAX_JSON_ARRAY_LENGTH", 100000))
+
+# Prometheus metrics (histogram bucket upper bounds in seconds)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Slow validation log (validations slower than the threshold are logged with a
+# structural fingerprint of the payload; overridable by environment)
+SLOW_VALIDATION_THRESHOLD_MS = float(os.getenv("SLOW_VALIDATION_THRESHOLD_MS", 1000))
+SLOW_VALIDATION_LOG_FILE = Path(os.getenv("SLOW_VALIDATION_LOG_FILE", PROJECT_ROOT / "logs" / "slow-validations.log"))
+SLOW_VALIDATION_LOG_MAX_BYTES = int(os.getenv("SLOW_VALIDATION_LOG_MAX_BYTES", 10 * 1024 * 1024))
+SLOW_VALIDATION_LOG_BACKUPS = int(os.getenv("SLOW_VALIDATION_LOG_BACKUPS", 5))
+SLOW_VALIDATION_MAX_ARRAY_PATHS = 20
+
+# Tracing (spans are exported as OTLP/JSON lines when TRACE_EXPORT_FILE is set)
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "fhir-validation-server")
+
+# Admin access (admin-only features are disabled unless ADMIN_API_KEY is set)
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+ADMIN_KEY_HEADER = "X-Admin-Key"
+
+# Validation profiling (modules the profile is attributed to, and report size)
+PROFILED_VALIDATOR_MODULES = ("src/utils/fhir_validator.py", "src/utils/ph_core_validator.py")
+PROFILE_MAX_HOTSPOTS = 25
+
 # Validation result statuses
 VALIDATION_SUCCESS = "success"
 VALIDATION_ERROR = "error"
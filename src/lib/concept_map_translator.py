@@ -0,0 +1,234 @@
+"""ConceptMap $translate engine over the bundled FHIR concept maps."""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.lib.resource_loader import resource_loader
+
+logger = logging.getLogger(__name__)
+
+# Index key: (source system, source code)
+TranslationKey = Tuple[str, str]
+
+# Equivalences that state the source code has no counterpart in the target
+NEGATIVE_EQUIVALENCES = frozenset(["unmatched", "disjoint"])
+
+# Equivalence of matches derived from ConceptMap.group.unmapped
+UNMAPPED_EQUIVALENCE = "inexact"
+
+
+def is_mapped(matches: List[Dict[str, Any]]) -> bool:
+    """Check if translation matches include a positive mapping.
+
+    A match whose equivalence is 'unmatched' or 'disjoint' records that the
+    code has no counterpart, so it does not make a translation succeed.
+    """
+    return any(match["equivalence"] not in NEGATIVE_EQUIVALENCES for match in matches)
+
+
+class ConceptMapTranslator:
+    """Translates codes using an index compiled from every ConceptMap group."""
+
+    def __init__(self):
+        """Initialize the translator."""
+        self._index: Dict[TranslationKey, List[Dict[str, Any]]] = {}
+        # Source system -> group.unmapped rules of the groups mapping from it
+        self._unmapped: Dict[str, List[Dict[str, Any]]] = {}
+        self._concept_map_urls: Dict[str, str] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _index_concept_map(self, concept_map: Dict[str, Any]) -> int:
+        """Add all group elements and unmapped rules of a ConceptMap to the index.
+
+        Args:
+            concept_map: ConceptMap resource
+
+        Returns:
+            Number of source concepts indexed
+        """
+        map_url = concept_map.get("url", "")
+        indexed = 0
+
+        for group in concept_map.get("group", []):
+            source_system = group.get("source", "")
+            target_system = group.get("target", "")
+            group_codes = set()
+
+            for element in group.get("element", []):
+                code = element.get("code")
+                if not code:
+                    continue
+
+                group_codes.add(code)
+                matches = self._index.setdefault((source_system, code), [])
+                for target in element.get("target", []):
+                    match = {
+                        "equivalence": target.get("equivalence", "equivalent"),
+                        "system": target_system or None,
+                        "code": target.get("code"),
+                        "display": target.get("display"),
+                        "source": map_url,
+                    }
+                    if target.get("comment"):
+                        match["comment"] = target["comment"]
+                    matches.append(match)
+                indexed += 1
+
+            unmapped = group.get("unmapped")
+            if isinstance(unmapped, dict) and unmapped.get("mode"):
+                self._unmapped.setdefault(source_system, []).append({
+                    "mode": unmapped["mode"],
+                    "code": unmapped.get("code"),
+                    "display": unmapped.get("display"),
+                    "url": unmapped.get("url"),
+                    "system": target_system or None,
+                    "source": map_url,
+                    "codes": frozenset(group_codes),
+                })
+
+        return indexed
+
+    def _load_index(self) -> None:
+        """Compile the translation index from the ConceptMap bundle."""
+        bundle = resource_loader.concept_maps
+        indexed = 0
+
+        for entry in bundle.get("entry", []):
+            concept_map = entry.get("resource", {})
+            if concept_map.get("resourceType") != "ConceptMap":
+                continue
+
+            if concept_map.get("url"):
+                self._concept_map_urls[concept_map["url"]] = concept_map.get("id", "")
+            indexed += self._index_concept_map(concept_map)
+
+        self._loaded = True
+        logger.info(
+            f"Compiled ConceptMap index: {len(self._concept_map_urls)} maps, "
+            f"{indexed} source concepts"
+        )
+
+    def ensure_loaded(self) -> None:
+        """Ensure the translation index is compiled (once, across threads)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._load_index()
+
+    def has_concept_map(self, concept_map_url: str) -> bool:
+        """Check if a ConceptMap with the given canonical URL is loaded."""
+        self.ensure_loaded()
+        return concept_map_url in self._concept_map_urls
+
+    def translate(
+        self,
+        system: str,
+        code: str,
+        target_system: Optional[str] = None,
+        concept_map_url: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Translate a single code.
+
+        Args:
+            system: Source code system URI
+            code: Source code
+            target_system: Optional target code system URI to restrict matches
+            concept_map_url: Optional ConceptMap canonical URL to restrict matches
+
+        Returns:
+            List of target matches (empty if the code is not mapped)
+        """
+        self.ensure_loaded()
+        return self._translate(system, code, target_system, concept_map_url, frozenset())
+
+    def _translate(
+        self,
+        system: str,
+        code: str,
+        target_system: Optional[str],
+        concept_map_url: Optional[str],
+        visited: frozenset
+    ) -> List[Dict[str, Any]]:
+        """Translate a single code, following 'other-map' unmapped rules once per map."""
+        matches = self._index.get((system, code), [])
+
+        if target_system:
+            matches = [m for m in matches if m["system"] == target_system]
+        if concept_map_url:
+            matches = [m for m in matches if m["source"] == concept_map_url]
+
+        for rule in self._unmapped.get(system, []):
+            if code in rule["codes"] or (concept_map_url and rule["source"] != concept_map_url):
+                continue
+            matches = matches + self._unmapped_matches(rule, system, code, target_system, visited)
+
+        return matches
+
+    def _unmapped_matches(
+        self,
+        rule: Dict[str, Any],
+        system: str,
+        code: str,
+        target_system: Optional[str],
+        visited: frozenset
+    ) -> List[Dict[str, Any]]:
+        """Apply a ConceptMap.group.unmapped rule to a code its group does not map."""
+        if rule["mode"] == "other-map":
+            if not rule["url"] or rule["url"] in visited:
+                return []
+            return self._translate(
+                system, code, target_system, rule["url"], visited | {rule["source"]}
+            )
+
+        if target_system and rule["system"] != target_system:
+            return []
+        if rule["mode"] == "provided":
+            target_code, display = code, None
+        elif rule["mode"] == "fixed" and rule["code"]:
+            target_code, display = rule["code"], rule["display"]
+        else:
+            return []
+        return [{
+            "equivalence": UNMAPPED_EQUIVALENCE,
+            "system": rule["system"],
+            "code": target_code,
+            "display": display,
+            "source": rule["source"],
+        }]
+
+    def translate_batch(
+        self,
+        system: str,
+        codes: List[str],
+        target_system: Optional[str] = None,
+        concept_map_url: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Translate a column of codes from the same source system.
+
+        Repeated codes are only looked up once.
+
+        Args:
+            system: Source code system URI
+            codes: Source codes, in input order
+            target_system: Optional target code system URI to restrict matches
+            concept_map_url: Optional ConceptMap canonical URL to restrict matches
+
+        Returns:
+            Target matches for each input code, in input order
+        """
+        resolved: Dict[str, List[Dict[str, Any]]] = {}
+        results = []
+
+        for code in codes:
+            if code not in resolved:
+                resolved[code] = self.translate(system, code, target_system, concept_map_url)
+            results.append(resolved[code])
+
+        return results
+
+
+# Global ConceptMap translator instance
+concept_map_translator = ConceptMapTranslator()
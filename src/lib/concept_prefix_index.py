@@ -0,0 +1,91 @@
+"""Sorted-prefix index for CodeSystem concept typeahead lookups."""
+
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+
+def normalize_search_text(text: str) -> str:
+    """Normalize text for case- and accent-insensitive prefix matching.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Casefolded text with combining marks removed (e.g. 'Piñas' -> 'pinas')
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+class ConceptPrefixIndex:
+    """Sorted-prefix index over the concepts of a single CodeSystem.
+
+    Every concept is indexed by its code, its display and each word start
+    within its display, so 'calo' matches 'City of Caloocan'. Lookups are a
+    binary search followed by a scan of the matching key range.
+    """
+
+    def __init__(self, concepts: List[Dict[str, Any]]):
+        """Build the index.
+
+        Args:
+            concepts: CodeSystem.concept list (nested concepts are included)
+        """
+        self._concepts: List[Dict[str, str]] = []
+        entries: List[Tuple[str, int]] = []
+
+        stack = list(reversed(concepts))
+        while stack:
+            concept = stack.pop()
+            if not isinstance(concept, dict):
+                continue
+            stack.extend(reversed(concept.get("concept", [])))
+
+            code = concept.get("code")
+            if not isinstance(code, str) or not code:
+                continue
+
+            display = concept.get("display") or ""
+            position = len(self._concepts)
+            self._concepts.append({"code": code, "display": display})
+
+            keys = {normalize_search_text(code)}
+            normalized_display = normalize_search_text(display)
+            for i, ch in enumerate(normalized_display):
+                if not ch.isspace() and (i == 0 or normalized_display[i - 1].isspace()):
+                    keys.add(normalized_display[i:])
+            entries.extend((key, position) for key in keys if key)
+
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._positions = [position for _, position in entries]
+
+    def __len__(self) -> int:
+        """Number of indexed concepts."""
+        return len(self._concepts)
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Find concepts whose code or display starts with a prefix.
+
+        Args:
+            prefix: Code or display prefix (case- and accent-insensitive)
+            limit: Maximum number of concepts to return
+
+        Returns:
+            Matching concepts ordered by matched key
+        """
+        normalized_prefix = normalize_search_text(prefix.strip())
+        results: List[Dict[str, str]] = []
+        seen = set()
+
+        for i in range(bisect_left(self._keys, normalized_prefix), len(self._keys)):
+            if len(results) >= limit or not self._keys[i].startswith(normalized_prefix):
+                break
+
+            position = self._positions[i]
+            if position not in seen:
+                seen.add(position)
+                results.append(self._concepts[position])
+
+        return results
@@ -0,0 +1,780 @@
+"""FHIRPath compiler for StructureDefinition invariants.
+
+Expressions are tokenized, parsed and compiled into Python closures once and
+cached by expression text. The supported subset covers the invariants used by
+the FHIR datatype profiles and the PH-Core profiles: path navigation (including
+choice elements), three-valued boolean logic, equality/comparison, membership,
+union, arithmetic and the common collection, string and conversion functions.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A compiled node: (focus collection, evaluation context) -> result collection
+Evaluator = Callable[[List[Any], "EvaluationContext"], List[Any]]
+
+UCUM_SYSTEM = "http://unitsofmeasure.org"
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*')
+  | (?P<date>@[0-9T][0-9:.+\-TZ]*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*|`[^`]*`)
+  | (?P<special>\$this|\$index|\$total)
+  | (?P<env>%[A-Za-z_][A-Za-z0-9_]*|%`[^`]*`|%'[^']*')
+  | (?P<op><=|>=|!=|!~|[=~<>|+\-*/&(),.\[\]{}])
+""", re.VERBOSE | re.DOTALL)
+
+_STRING_ESCAPES = {"'": "'", '"': '"', "`": "`", "\\": "\\", "/": "/",
+                   "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Binding powers of infix operators (FHIRPath operator precedence)
+_INFIX_POWER = {
+    "implies": 1,
+    "or": 2, "xor": 2,
+    "and": 3,
+    "in": 4, "contains": 4,
+    "=": 5, "~": 5, "!=": 5, "!~": 5,
+    "<": 6, ">": 6, "<=": 6, ">=": 6,
+    "|": 7,
+    "is": 8, "as": 8,
+    "+": 9, "-": 9, "&": 9,
+    "*": 10, "/": 10, "div": 10, "mod": 10,
+}
+_UNARY_POWER = 11
+
+_DATE_LIKE_RE = re.compile(r"^\d{4}(-\d{2}(-\d{2})?)?(T[\d:.]*)?([+\-]\d{2}:\d{2}|Z)?$")
+
+
+class FHIRPathError(Exception):
+    """Raised when a FHIRPath expression cannot be compiled or evaluated."""
+
+
+class EvaluationContext:
+    """Environment variables available to an expression (%resource, %ucum, ...)."""
+
+    __slots__ = ("variables",)
+
+    def __init__(self, resource: Any = None, root_resource: Any = None):
+        """Create a context for evaluating against a resource."""
+        root = root_resource if root_resource is not None else resource
+        self.variables: Dict[str, List[Any]] = {
+            "ucum": [UCUM_SYSTEM],
+            "resource": [resource] if resource is not None else [],
+            "rootResource": [root] if root is not None else [],
+        }
+
+
+class CompiledExpression:
+    """A FHIRPath expression compiled into closures."""
+
+    __slots__ = ("expression", "_evaluator", "_uses_context")
+
+    def __init__(self, expression: str, evaluator: Evaluator):
+        """Wrap a compiled evaluator."""
+        self.expression = expression
+        self._evaluator = evaluator
+        self._uses_context = "%context" in expression
+
+    def evaluate(self, focus: Any, context: Optional[EvaluationContext] = None) -> List[Any]:
+        """Evaluate the expression against a focus value.
+
+        Args:
+            focus: Element the expression is evaluated on
+            context: Environment variables (defaults to focus as %resource)
+
+        Returns:
+            Result collection
+
+        Raises:
+            FHIRPathError: If evaluation fails (e.g. a type error)
+        """
+        context = context or EvaluationContext(focus)
+        if self._uses_context:
+            context.variables["context"] = [focus]
+        try:
+            return self._evaluator([focus], context)
+        except FHIRPathError:
+            raise
+        except (TypeError, ValueError, re.error) as e:
+            raise FHIRPathError(f"Error evaluating '{self.expression}': {e}") from e
+
+    def is_satisfied(self, focus: Any, context: Optional[EvaluationContext] = None) -> bool:
+        """Evaluate an invariant; an empty result counts as satisfied."""
+        return _to_boolean(self.evaluate(focus, context)) is not False
+
+
+# ---------------------------------------------------------------------------
+# Collection helpers
+# ---------------------------------------------------------------------------
+
+def _to_boolean(collection: List[Any]) -> Optional[bool]:
+    """Singleton evaluation of a collection as a boolean (None when empty)."""
+    if not collection:
+        return None
+    if len(collection) > 1:
+        raise FHIRPathError("Expected a single value in boolean context")
+    value = collection[0]
+    return value if isinstance(value, bool) else True
+
+
+def _is_number(value: Any) -> bool:
+    """Check for an integer/decimal (bool is not a number in FHIRPath)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _navigate(collection: List[Any], name: str) -> List[Any]:
+    """Select a child element by name from every item, resolving choice elements."""
+    result = []
+    for item in collection:
+        if not isinstance(item, dict):
+            continue
+        if name in item:
+            value = item[name]
+            if isinstance(value, list):
+                result.extend(value)
+            elif value is not None:
+                result.append(value)
+            continue
+        if name[:1].isupper() and item.get("resourceType") == name:
+            result.append(item)
+            continue
+        # Choice elements: 'value' matches valueString, valueCodeableConcept, ...
+        for key, value in item.items():
+            if key.startswith(name) and key[len(name):len(name) + 1].isupper():
+                if isinstance(value, list):
+                    result.extend(value)
+                elif value is not None:
+                    result.append(value)
+    return result
+
+
+def _children(collection: List[Any]) -> List[Any]:
+    """All direct child values of every item."""
+    result = []
+    for item in collection:
+        if not isinstance(item, dict):
+            continue
+        for key, value in item.items():
+            if key == "resourceType":
+                continue
+            if isinstance(value, list):
+                result.extend(value)
+            else:
+                result.append(value)
+    return result
+
+
+def _items_equal(left: Any, right: Any) -> bool:
+    """Equality of two single items."""
+    if _is_number(left) and _is_number(right):
+        return left == right
+    if type(left) is not type(right):
+        return False
+    return left == right
+
+
+def _equals(left: List[Any], right: List[Any]) -> Optional[bool]:
+    """FHIRPath '=' (None when either side is empty)."""
+    if not left or not right:
+        return None
+    if len(left) != len(right):
+        return False
+    return all(_items_equal(a, b) for a, b in zip(left, right))
+
+
+def _equivalent(left: List[Any], right: List[Any]) -> bool:
+    """FHIRPath '~' (order-insensitive, case-insensitive strings)."""
+    if not left and not right:
+        return True
+    if len(left) != len(right):
+        return False
+
+    def normalize(value: Any) -> Any:
+        return " ".join(value.lower().split()) if isinstance(value, str) else value
+
+    remaining = [normalize(value) for value in right]
+    for value in left:
+        value = normalize(value)
+        for i, candidate in enumerate(remaining):
+            if _items_equal(value, candidate):
+                del remaining[i]
+                break
+        else:
+            return False
+    return True
+
+
+def _compare(left: List[Any], right: List[Any]) -> Optional[int]:
+    """Compare two singletons (-1/0/1), None when empty or not comparable."""
+    if not left or not right:
+        return None
+    if len(left) > 1 or len(right) > 1:
+        raise FHIRPathError("Comparison requires single values")
+    a, b = left[0], right[0]
+
+    if _is_number(a) and _is_number(b):
+        return (a > b) - (a < b)
+
+    if isinstance(a, str) and isinstance(b, str):
+        if _DATE_LIKE_RE.match(a) and _DATE_LIKE_RE.match(b) and len(a) != len(b):
+            # Partial dates: compare at the shared precision
+            n = min(len(a), len(b))
+            if a[:n] == b[:n]:
+                return None
+            a, b = a[:n], b[:n]
+        return (a > b) - (a < b)
+
+    if isinstance(a, dict) and isinstance(b, dict):
+        # Quantities are comparable when they share a unit
+        unit_a = a.get("code") or a.get("unit")
+        unit_b = b.get("code") or b.get("unit")
+        if unit_a == unit_b and _is_number(a.get("value")) and _is_number(b.get("value")):
+            return (a["value"] > b["value"]) - (a["value"] < b["value"])
+        return None
+
+    raise FHIRPathError(f"Cannot compare {type(a).__name__} with {type(b).__name__}")
+
+
+def _distinct(collection: List[Any]) -> List[Any]:
+    """Remove duplicate items, keeping order."""
+    result: List[Any] = []
+    for item in collection:
+        if not any(_items_equal(item, existing) for existing in result):
+            result.append(item)
+    return result
+
+
+def _singleton(collection: List[Any], function: str) -> Any:
+    """Get the single input item of a function (None when empty)."""
+    if not collection:
+        return None
+    if len(collection) > 1:
+        raise FHIRPathError(f"{function}() requires a single input value")
+    return collection[0]
+
+
+def _to_string(value: Any) -> Optional[str]:
+    """FHIRPath toString() of a primitive value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, str)):
+        return str(value)
+    return None
+
+
+def _to_integer(value: Any) -> Optional[int]:
+    """FHIRPath toInteger() of a primitive value."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and re.fullmatch(r"[+\-]?\d+", value):
+        return int(value)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+# (input, argument evaluators, enclosing focus, context) -> result
+FunctionImpl = Callable[[List[Any], List[Evaluator], List[Any], EvaluationContext], List[Any]]
+
+_REGEX_CACHE: Dict[str, "re.Pattern[str]"] = {}
+
+
+def _regex(pattern: str) -> "re.Pattern[str]":
+    """Compile a regex once per pattern."""
+    compiled = _REGEX_CACHE.get(pattern)
+    if compiled is None:
+        compiled = _REGEX_CACHE[pattern] = re.compile(pattern)
+    return compiled
+
+
+def _argument(args: List[Evaluator], index: int, focus: List[Any], ctx: EvaluationContext) -> List[Any]:
+    """Evaluate a non-iterative function argument against the enclosing focus."""
+    return args[index](focus, ctx) if index < len(args) else []
+
+
+def _string_function(function: Callable[[str, List[Any]], Any], name: str) -> FunctionImpl:
+    """Build a string function that takes literal-style arguments."""
+    def impl(collection: List[Any], args: List[Evaluator], focus: List[Any], ctx: EvaluationContext) -> List[Any]:
+        value = _singleton(collection, name)
+        if not isinstance(value, str):
+            return []
+        arguments = [_singleton(arg(focus, ctx), name) for arg in args]
+        if any(argument is None for argument in arguments):
+            return []
+        result = function(value, arguments)
+        return [] if result is None else [result]
+    return impl
+
+
+def _fn_exists(collection, args, focus, ctx):
+    if args:
+        return [any(_to_boolean(args[0]([item], ctx)) is True for item in collection)]
+    return [bool(collection)]
+
+
+def _fn_where(collection, args, focus, ctx):
+    return [item for item in collection if _to_boolean(args[0]([item], ctx)) is True]
+
+
+def _fn_select(collection, args, focus, ctx):
+    result = []
+    for item in collection:
+        result.extend(args[0]([item], ctx))
+    return result
+
+
+def _fn_all(collection, args, focus, ctx):
+    return [all(_to_boolean(args[0]([item], ctx)) is True for item in collection)]
+
+
+def _fn_not(collection, args, focus, ctx):
+    value = _to_boolean(collection)
+    return [] if value is None else [not value]
+
+
+def _fn_has_value(collection, args, focus, ctx):
+    return [len(collection) == 1 and not isinstance(collection[0], (dict, list))]
+
+
+def _fn_descendants(collection, args, focus, ctx):
+    result = []
+    pending = _children(collection)
+    while pending:
+        result.extend(pending)
+        pending = _children(pending)
+    return result
+
+
+def _fn_iif(collection, args, focus, ctx):
+    criterion = _to_boolean(args[0](focus, ctx))
+    if criterion is True:
+        return _argument(args, 1, focus, ctx)
+    return _argument(args, 2, focus, ctx)
+
+
+def _fn_substring(collection, args, focus, ctx):
+    value = _singleton(collection, "substring")
+    start = _singleton(_argument(args, 0, focus, ctx), "substring")
+    if not isinstance(value, str) or not isinstance(start, int) or start < 0 or start >= len(value):
+        return []
+    length = _singleton(_argument(args, 1, focus, ctx), "substring") if len(args) > 1 else None
+    return [value[start:] if length is None else value[start:start + length]]
+
+
+def _fn_extension(collection, args, focus, ctx):
+    url = _singleton(_argument(args, 0, focus, ctx), "extension")
+    return [ext for ext in _navigate(collection, "extension")
+            if isinstance(ext, dict) and ext.get("url") == url]
+
+
+def _fn_to_integer(collection, args, focus, ctx):
+    value = _to_integer(_singleton(collection, "toInteger"))
+    return [] if value is None else [value]
+
+
+def _fn_to_string(collection, args, focus, ctx):
+    value = _to_string(_singleton(collection, "toString"))
+    return [] if value is None else [value]
+
+
+def _fn_single(collection, args, focus, ctx):
+    return [_singleton(collection, "single")] if collection else []
+
+
+_FUNCTIONS: Dict[str, Tuple[FunctionImpl, int, int]] = {
+    # name: (implementation, min args, max args)
+    "empty": (lambda c, a, f, x: [not c], 0, 0),
+    "exists": (_fn_exists, 0, 1),
+    "count": (lambda c, a, f, x: [len(c)], 0, 0),
+    "not": (_fn_not, 0, 0),
+    "hasValue": (_fn_has_value, 0, 0),
+    "children": (lambda c, a, f, x: _children(c), 0, 0),
+    "descendants": (_fn_descendants, 0, 0),
+    "where": (_fn_where, 1, 1),
+    "select": (_fn_select, 1, 1),
+    "all": (_fn_all, 1, 1),
+    "allTrue": (lambda c, a, f, x: [all(item is True for item in c)], 0, 0),
+    "anyTrue": (lambda c, a, f, x: [any(item is True for item in c)], 0, 0),
+    "allFalse": (lambda c, a, f, x: [all(item is False for item in c)], 0, 0),
+    "anyFalse": (lambda c, a, f, x: [any(item is False for item in c)], 0, 0),
+    "isDistinct": (lambda c, a, f, x: [len(_distinct(c)) == len(c)], 0, 0),
+    "distinct": (lambda c, a, f, x: _distinct(c), 0, 0),
+    "first": (lambda c, a, f, x: c[:1], 0, 0),
+    "last": (lambda c, a, f, x: c[-1:], 0, 0),
+    "tail": (lambda c, a, f, x: c[1:], 0, 0),
+    "single": (_fn_single, 0, 0),
+    "combine": (lambda c, a, f, x: c + _argument(a, 0, f, x), 1, 1),
+    "union": (lambda c, a, f, x: _distinct(c + _argument(a, 0, f, x)), 1, 1),
+    "iif": (_fn_iif, 2, 3),
+    "trace": (lambda c, a, f, x: c, 1, 2),
+    "extension": (_fn_extension, 1, 1),
+    "toInteger": (_fn_to_integer, 0, 0),
+    "toString": (_fn_to_string, 0, 0),
+    "matches": (_string_function(lambda s, a: _regex(a[0]).search(s) is not None, "matches"), 1, 1),
+    "startsWith": (_string_function(lambda s, a: s.startswith(a[0]), "startsWith"), 1, 1),
+    "endsWith": (_string_function(lambda s, a: s.endswith(a[0]), "endsWith"), 1, 1),
+    "contains": (_string_function(lambda s, a: a[0] in s, "contains"), 1, 1),
+    "indexOf": (_string_function(lambda s, a: s.find(a[0]), "indexOf"), 1, 1),
+    "replace": (_string_function(lambda s, a: s.replace(a[0], a[1]), "replace"), 2, 2),
+    "length": (_string_function(lambda s, a: len(s), "length"), 0, 0),
+    "upper": (_string_function(lambda s, a: s.upper(), "upper"), 0, 0),
+    "lower": (_string_function(lambda s, a: s.lower(), "lower"), 0, 0),
+    "substring": (_fn_substring, 1, 2),
+    # Narrative XHTML content rules are not checked; the invariant always holds
+    "htmlChecks": (lambda c, a, f, x: [True], 0, 0),
+}
+
+
+# ---------------------------------------------------------------------------
+# Operators
+# ---------------------------------------------------------------------------
+
+def _boolean_operator(operator: str, left: Optional[bool], right: Optional[bool]) -> Optional[bool]:
+    """Three-valued logic for and/or/xor/implies."""
+    if operator == "and":
+        if left is False or right is False:
+            return False
+        return True if left is True and right is True else None
+    if operator == "or":
+        if left is True or right is True:
+            return True
+        return False if left is False and right is False else None
+    if operator == "xor":
+        return None if left is None or right is None else left != right
+    # implies
+    if left is False or right is True:
+        return True
+    return False if left is True and right is False else None
+
+
+def _arithmetic(operator: str, left: List[Any], right: List[Any]) -> List[Any]:
+    """Arithmetic and string concatenation operators."""
+    if operator == "&":
+        a = _singleton(left, "&")
+        b = _singleton(right, "&")
+        return [(a or "") + (b or "")]
+
+    a = _singleton(left, operator)
+    b = _singleton(right, operator)
+    if a is None or b is None:
+        return []
+    if operator == "+" and isinstance(a, str) and isinstance(b, str):
+        return [a + b]
+    if not (_is_number(a) and _is_number(b)):
+        raise FHIRPathError(f"Operator '{operator}' requires numbers")
+    if operator == "+":
+        return [a + b]
+    if operator == "-":
+        return [a - b]
+    if operator == "*":
+        return [a * b]
+    if b == 0:
+        return []
+    if operator == "/":
+        return [a / b]
+    if operator == "div":
+        return [int(a // b)]
+    return [a % b]
+
+
+def _binary(operator: str, left: Evaluator, right: Evaluator) -> Evaluator:
+    """Compile an infix operator."""
+    if operator in ("and", "or", "implies"):
+        # Short-circuit: 'false and x', 'true or x' and 'false implies x' ignore x
+        decisive = False if operator in ("and", "implies") else True
+        decided = [operator != "and"]
+
+        def evaluate(focus, ctx):
+            left_value = _to_boolean(left(focus, ctx))
+            if left_value is decisive:
+                return decided
+            result = _boolean_operator(operator, left_value, _to_boolean(right(focus, ctx)))
+            return [] if result is None else [result]
+    elif operator == "xor":
+        def evaluate(focus, ctx):
+            result = _boolean_operator(
+                operator, _to_boolean(left(focus, ctx)), _to_boolean(right(focus, ctx))
+            )
+            return [] if result is None else [result]
+    elif operator in ("=", "!="):
+        negate = operator == "!="
+
+        def evaluate(focus, ctx):
+            result = _equals(left(focus, ctx), right(focus, ctx))
+            return [] if result is None else [result != negate]
+    elif operator in ("~", "!~"):
+        negate = operator == "!~"
+
+        def evaluate(focus, ctx):
+            return [_equivalent(left(focus, ctx), right(focus, ctx)) != negate]
+    elif operator in ("<", ">", "<=", ">="):
+        test = {
+            "<": lambda c: c < 0, ">": lambda c: c > 0,
+            "<=": lambda c: c <= 0, ">=": lambda c: c >= 0,
+        }[operator]
+
+        def evaluate(focus, ctx):
+            result = _compare(left(focus, ctx), right(focus, ctx))
+            return [] if result is None else [test(result)]
+    elif operator in ("in", "contains"):
+        def evaluate(focus, ctx):
+            item, collection = left(focus, ctx), right(focus, ctx)
+            if operator == "contains":
+                item, collection = collection, item
+            if not item:
+                return []
+            value = _singleton(item, operator)
+            return [any(_items_equal(value, candidate) for candidate in collection)]
+    elif operator == "|":
+        def evaluate(focus, ctx):
+            return _distinct(left(focus, ctx) + right(focus, ctx))
+    else:
+        def evaluate(focus, ctx):
+            return _arithmetic(operator, left(focus, ctx), right(focus, ctx))
+    return evaluate
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Split an expression into (kind, text) tokens."""
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise FHIRPathError(f"Unexpected character at {position} in '{expression}'")
+        position = match.end()
+        kind = match.lastgroup
+        if kind != "ws":
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def _unescape(text: str) -> str:
+    """Decode a quoted FHIRPath string literal."""
+    body = text[1:-1]
+    return re.sub(
+        r"\\(u[0-9a-fA-F]{4}|.)",
+        lambda m: chr(int(m.group(1)[1:], 16)) if m.group(1)[0] == "u" and len(m.group(1)) == 5
+        else _STRING_ESCAPES.get(m.group(1), m.group(1)),
+        body
+    )
+
+
+def _identifier(text: str) -> str:
+    """Strip backtick delimiters from an identifier."""
+    return text[1:-1] if text.startswith("`") else text
+
+
+class _Parser:
+    """Pratt parser producing closures directly."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] is None:
+            raise FHIRPathError(f"Unexpected end of expression '{self.expression}'")
+        self.position += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        kind, value = self.next()
+        if value != text:
+            raise FHIRPathError(f"Expected '{text}' but found '{value}' in '{self.expression}'")
+
+    def parse(self) -> Evaluator:
+        evaluator = self.expression_(0)
+        if self.peek()[0] is not None:
+            raise FHIRPathError(f"Unexpected '{self.peek()[1]}' in '{self.expression}'")
+        return evaluator
+
+    def expression_(self, min_power: int) -> Evaluator:
+        left = self.prefix()
+        while True:
+            kind, value = self.peek()
+            power = _INFIX_POWER.get(value) if kind in ("op", "ident") else None
+            if power is None or power <= min_power:
+                return left
+            if value in ("is", "as"):
+                raise FHIRPathError(f"Type operator '{value}' is not supported")
+            self.next()
+            # 'implies' is right-associative, everything else left-associative
+            right = self.expression_(power - 1 if value == "implies" else power)
+            left = _binary(value, left, right)
+
+    def prefix(self) -> Evaluator:
+        kind, value = self.peek()
+        if kind == "op" and value in ("-", "+"):
+            self.next()
+            operand = self.expression_(_UNARY_POWER)
+            if value == "+":
+                return operand
+
+            def negate(focus, ctx):
+                item = _singleton(operand(focus, ctx), "-")
+                if item is None:
+                    return []
+                if not _is_number(item):
+                    raise FHIRPathError("Unary '-' requires a number")
+                return [-item]
+            return negate
+        return self.postfix(self.term())
+
+    def term(self) -> Evaluator:
+        kind, value = self.next()
+
+        if kind == "string":
+            literal = _unescape(value)
+            return lambda focus, ctx: [literal]
+        if kind == "number":
+            number = float(value) if "." in value else int(value)
+            return lambda focus, ctx: [number]
+        if kind == "date":
+            date = value[1:]
+            return lambda focus, ctx: [date]
+        if kind == "special":
+            if value == "$this":
+                return lambda focus, ctx: focus
+            raise FHIRPathError(f"'{value}' is not supported")
+        if kind == "env":
+            name = value[1:].strip("`'")
+            return lambda focus, ctx: ctx.variables.get(name, [])
+        if kind == "op" and value == "(":
+            inner = self.expression_(0)
+            self.expect(")")
+            return inner
+        if kind == "op" and value == "{":
+            self.expect("}")
+            return lambda focus, ctx: []
+        if kind == "ident":
+            if value in ("true", "false"):
+                literal = value == "true"
+                return lambda focus, ctx: [literal]
+            return self.invocation(None, _identifier(value))
+
+        raise FHIRPathError(f"Unexpected '{value}' in '{self.expression}'")
+
+    def postfix(self, left: Evaluator) -> Evaluator:
+        while True:
+            kind, value = self.peek()
+            if kind == "op" and value == ".":
+                self.next()
+                name_kind, name = self.next()
+                if name_kind != "ident":
+                    raise FHIRPathError(f"Expected a name after '.' in '{self.expression}'")
+                left = self.invocation(left, _identifier(name))
+            elif kind == "op" and value == "[":
+                self.next()
+                index = self.expression_(0)
+                self.expect("]")
+                left = self.indexer(left, index)
+            else:
+                return left
+
+    def invocation(self, source: Optional[Evaluator], name: str) -> Evaluator:
+        """Compile a member access or a function call on a source (or the focus)."""
+        if self.peek() != ("op", "("):
+            if source is None:
+                return lambda focus, ctx: _navigate(focus, name)
+            return lambda focus, ctx: _navigate(source(focus, ctx), name)
+
+        self.next()
+        args: List[Evaluator] = []
+        if self.peek() != ("op", ")"):
+            args.append(self.expression_(0))
+            while self.peek() == ("op", ","):
+                self.next()
+                args.append(self.expression_(0))
+        self.expect(")")
+
+        if name not in _FUNCTIONS:
+            raise FHIRPathError(f"Function '{name}()' is not supported")
+        impl, min_args, max_args = _FUNCTIONS[name]
+        if not min_args <= len(args) <= max_args:
+            raise FHIRPathError(f"Function '{name}()' takes {min_args}..{max_args} arguments")
+
+        if source is None:
+            return lambda focus, ctx: impl(focus, args, focus, ctx)
+        return lambda focus, ctx: impl(source(focus, ctx), args, focus, ctx)
+
+    @staticmethod
+    def indexer(source: Evaluator, index: Evaluator) -> Evaluator:
+        def evaluate(focus, ctx):
+            collection = source(focus, ctx)
+            position = _singleton(index(focus, ctx), "[]")
+            if not isinstance(position, int) or not 0 <= position < len(collection):
+                return []
+            return [collection[position]]
+        return evaluate
+
+
+class FHIRPathCompiler:
+    """Compiles FHIRPath expressions, caching them by expression text."""
+
+    def __init__(self):
+        """Initialize the compiler."""
+        self._cache: Dict[str, CompiledExpression] = {}
+        self._failed: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Number of cached compiled expressions."""
+        return len(self._cache)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Compile an expression (cached by text).
+
+        Args:
+            expression: FHIRPath expression
+
+        Returns:
+            The compiled expression
+
+        Raises:
+            FHIRPathError: If the expression uses unsupported syntax
+        """
+        compiled = self._cache.get(expression)
+        if compiled is not None:
+            return compiled
+        if expression in self._failed:
+            raise FHIRPathError(self._failed[expression])
+
+        try:
+            compiled = CompiledExpression(expression, _Parser(expression).parse())
+        except FHIRPathError as e:
+            self._failed[expression] = str(e)
+            logger.debug(f"FHIRPath expression not compiled: {e}")
+            raise
+
+        self._cache[expression] = compiled
+        return compiled
+
+    def try_compile(self, expression: str) -> Optional[CompiledExpression]:
+        """Compile an expression, returning None if it is not supported."""
+        try:
+            return self.compile(expression)
+        except FHIRPathError:
+            return None
+
+
+# Global FHIRPath compiler instance
+fhirpath_compiler = FHIRPathCompiler()
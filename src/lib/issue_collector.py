@@ -0,0 +1,139 @@
+"""Bounded collection of validation issues with aggregation of repeats.
+
+A malformed feed can produce the same issue for every item of a large
+array (e.g. 10,000 codings without a code). The collector here caps the
+number of issues kept and can fold identical issues that differ only in
+their array indexes into one issue with a count, so the response size,
+memory and CPU stay bounded.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.types.fhir_types import ValidationIssue, ValidationSeverity
+
+# Array indexes in issue locations: 'identifier[3].system' and schema-style 'identifier.3.system'
+_INDEX_RE = re.compile(r"\[\d+\]|(?<=\.)\d+(?=\.|$)")
+
+_SEVERITY_RANK = {
+    ValidationSeverity.INFORMATION: 0,
+    ValidationSeverity.WARNING: 1,
+    ValidationSeverity.ERROR: 2,
+    ValidationSeverity.FATAL: 3,
+}
+
+
+def wildcard_location(location: Optional[str]) -> Optional[str]:
+    """Replace the array indexes of a location with wildcards.
+
+    Args:
+        location: Issue location such as 'identifier[3].system'
+
+    Returns:
+        Location such as 'identifier[*].system' (None stays None)
+    """
+    if not location:
+        return location
+    return _INDEX_RE.sub(lambda match: "[*]" if match.group(0).startswith("[") else "*", location)
+
+
+def issue_limit_reached(issues: List[ValidationIssue]) -> bool:
+    """Check if an issue list is a collector that accepts no new issues.
+
+    Validation walkers call this to stop traversing once further issues
+    would be discarded anyway.
+    """
+    return isinstance(issues, IssueCollector) and issues.full
+
+
+class IssueCollector(list):
+    """A list of validation issues with an optional cap and aggregation.
+
+    With aggregate set, an issue with the same severity, code and details
+    as an earlier one at the same location up to array indexes is only
+    counted; finalize() reports it once at the wildcard location with the
+    count. With max_issues set, the collector stops accepting new issues
+    once it holds that many (counting aggregated issues once), and
+    finalize() appends an 'issues-truncated' issue. Without either option
+    it behaves like a plain list.
+    """
+
+    def __init__(self, max_issues: Optional[int] = None, aggregate: bool = False):
+        """Initialize an empty collector.
+
+        Args:
+            max_issues: Maximum number of issues kept (None for no limit)
+            aggregate: Whether to fold repeats across array indexes
+        """
+        super().__init__()
+        self.max_issues = max_issues
+        self.aggregate = aggregate
+        self.total = 0
+        self.dropped = 0
+        self._dropped_severity: Optional[ValidationSeverity] = None
+        self._counts: Dict[Tuple[str, str, str, Optional[str]], int] = {}
+        self._positions: Dict[Tuple[str, str, str, Optional[str]], int] = {}
+
+    @property
+    def full(self) -> bool:
+        """Whether the collector has reached max_issues."""
+        return self.max_issues is not None and len(self) >= self.max_issues
+
+    def append(self, issue: ValidationIssue) -> None:
+        """Add an issue, folding it into an earlier one or dropping it at the limit."""
+        self.total += 1
+        key = None
+        if self.aggregate:
+            key = (issue.severity.value, issue.code, issue.details, wildcard_location(issue.location))
+            if key in self._counts:
+                self._counts[key] += 1
+                return
+        if self.full:
+            self.dropped += 1
+            if self._dropped_severity is None or _SEVERITY_RANK[issue.severity] > _SEVERITY_RANK[self._dropped_severity]:
+                self._dropped_severity = issue.severity
+            return
+        if key is not None:
+            self._counts[key] = 1
+            self._positions[key] = len(self)
+        super().append(issue)
+
+    def extend(self, issues: Iterable[ValidationIssue]) -> None:
+        """Add several issues."""
+        for issue in issues:
+            self.append(issue)
+
+    def finalize(self) -> List[ValidationIssue]:
+        """Get the collected issues with counts and a truncation notice.
+
+        A truncated result only holds the issues found before the limit was
+        reached; the notice is an error if an error was dropped and a
+        warning otherwise, so a truncated result never reports success.
+
+        Returns:
+            List of validation issues
+        """
+        issues = list(self)
+        for key, count in self._counts.items():
+            if count > 1:
+                position = self._positions[key]
+                issue = issues[position]
+                location = key[3]
+                issues[position] = issue.model_copy(update={
+                    "location": location,
+                    "details": f"{issue.details} (×{count:,} at {location})" if location else f"{issue.details} (×{count:,})",
+                })
+
+        if self.full:
+            severity = ValidationSeverity.WARNING
+            if self._dropped_severity is not None and _SEVERITY_RANK[self._dropped_severity] > _SEVERITY_RANK[severity]:
+                severity = ValidationSeverity.ERROR
+            details = f"Validation stopped after {self.max_issues:,} issue(s); remaining checks were skipped"
+            if self.dropped:
+                details += f" and at least {self.dropped:,} further issue(s) were not reported"
+            issues.append(ValidationIssue(
+                severity=severity,
+                code="issues-truncated",
+                details=details
+            ))
+        return issues
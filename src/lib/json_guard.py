@@ -0,0 +1,76 @@
+"""Structural limits for untrusted JSON, checked before it is decoded.
+
+The standard ``json`` decoder and the recursive validation walkers have no
+bound on nesting depth or array length, so a hostile payload can exhaust
+the recursion limit or spend seconds being decoded and validated. The
+scanner here strips strings and scalars with bytes operations, walks only
+the remaining brackets and commas, and stops at the first violation, so
+it never recurses and costs a fraction of decoding the same payload.
+"""
+
+from typing import List, Optional
+
+# Every byte except the structural ones
+_NON_STRUCTURAL = bytes(byte for byte in range(256) if byte not in b"[]{},")
+
+_OPEN_ARRAY = ord("[")
+_OPEN_OBJECT = ord("{")
+_COMMA = ord(",")
+
+
+class JSONLimitError(ValueError):
+    """Raised when a JSON document exceeds a structural limit.
+
+    Attributes:
+        limit: Name of the exceeded limit ('bytes', 'depth' or 'array-length')
+    """
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+def check_json_limits(
+    data: bytes,
+    max_depth: Optional[int] = None,
+    max_array_length: Optional[int] = None
+) -> None:
+    """Check the nesting depth and array lengths of a JSON document.
+
+    Malformed JSON is not reported here; it is left to the decoder.
+
+    Args:
+        data: Raw JSON bytes
+        max_depth: Maximum nesting depth of arrays and objects (None for no limit)
+        max_array_length: Maximum number of items in any array (None for no limit)
+
+    Raises:
+        JSONLimitError: At the first array or object that exceeds a limit
+    """
+    # Strings and scalars are dropped at C speed; only brackets and commas are walked.
+    # Once escaped backslashes and quotes are gone, every other quote-delimited
+    # piece is the inside of a string.
+    if b"\\" in data:
+        data = data.replace(b"\\\\", b"").replace(b'\\"', b"")
+    structure = b"".join(data.split(b'"')[::2]).translate(None, _NON_STRUCTURAL)
+
+    # One entry per open container: the number of commas seen in an array, -1 for an object
+    stack: List[int] = []
+    for char in structure:
+        if char == _COMMA:
+            if stack and stack[-1] >= 0:
+                stack[-1] += 1
+                if max_array_length is not None and stack[-1] >= max_array_length:
+                    raise JSONLimitError(
+                        "array-length",
+                        f"JSON array has more than {max_array_length} items"
+                    )
+        elif char == _OPEN_ARRAY or char == _OPEN_OBJECT:
+            stack.append(0 if char == _OPEN_ARRAY else -1)
+            if max_depth is not None and len(stack) > max_depth:
+                raise JSONLimitError(
+                    "depth",
+                    f"JSON is nested more than {max_depth} levels deep"
+                )
+        elif stack:
+            stack.pop()
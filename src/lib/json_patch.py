@@ -0,0 +1,167 @@
+"""JSON Patch (RFC 6902) application with copy-on-write containers.
+
+Only the objects and arrays along each operation's path are copied, so the
+original document is left untouched and patching a large resource costs
+little more than the depth of the changed elements.
+"""
+
+import copy
+from typing import Any, List, Set, Tuple
+
+PATCH_OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JSONPatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied."""
+
+
+def parse_pointer(pointer: Any) -> List[str]:
+    """Split a JSON Pointer (RFC 6901) into unescaped reference tokens.
+
+    Args:
+        pointer: JSON Pointer such as '/name/0/family'
+
+    Returns:
+        Reference tokens ([] for the whole document)
+
+    Raises:
+        JSONPatchError: If the pointer is not a valid JSON Pointer
+    """
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JSONPatchError(f"Invalid JSON Pointer: {pointer!r}")
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container: List[Any], token: str, allow_end: bool) -> int:
+    """Resolve an array reference token to an index."""
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JSONPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JSONPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    """Get the value at a pointer."""
+    value = document
+    for token in tokens:
+        if isinstance(value, dict):
+            if token not in value:
+                raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+            value = value[token]
+        elif isinstance(value, list):
+            value = value[_array_index(value, token, allow_end=False)]
+        else:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return value
+
+
+def _copy_parent(document: Any, tokens: List[str]) -> Tuple[Any, Any]:
+    """Copy the containers from the root down to a pointer's parent.
+
+    Returns:
+        Tuple of (new root, copied parent container)
+    """
+    root = copy.copy(document)
+    parent = root
+    for token in tokens[:-1]:
+        if isinstance(parent, dict):
+            if token not in parent:
+                raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+            child = copy.copy(parent[token])
+            parent[token] = child
+        elif isinstance(parent, list):
+            index = _array_index(parent, token, allow_end=False)
+            child = copy.copy(parent[index])
+            parent[index] = child
+        else:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+        parent = child
+    if not isinstance(parent, (dict, list)):
+        raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return root, parent
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    """Add a value at a pointer (inserting into arrays)."""
+    if not tokens:
+        return value
+    root, parent = _copy_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    else:
+        parent.insert(_array_index(parent, tokens[-1], allow_end=True), value)
+    return root
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    """Remove the value at a pointer."""
+    if not tokens:
+        raise JSONPatchError("Cannot remove the whole document")
+    root, parent = _copy_parent(document, tokens)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+        del parent[tokens[-1]]
+    else:
+        del parent[_array_index(parent, tokens[-1], allow_end=False)]
+    return root
+
+
+def apply_patch(document: Any, operations: Any) -> Tuple[Any, Set[str]]:
+    """Apply a JSON Patch without modifying the original document.
+
+    Args:
+        document: JSON document (e.g. a FHIR resource)
+        operations: List of JSON Patch operations
+
+    Returns:
+        Tuple of (patched document, top-level keys touched by the patch).
+        An empty key ('') means the whole document was replaced.
+
+    Raises:
+        JSONPatchError: If the patch is malformed, a path does not exist or
+            a 'test' operation fails
+    """
+    if not isinstance(operations, list):
+        raise JSONPatchError("A JSON Patch must be an array of operations")
+
+    touched: Set[str] = set()
+    for number, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in PATCH_OPERATIONS:
+            raise JSONPatchError(f"Operation {number}: 'op' must be one of {', '.join(PATCH_OPERATIONS)}")
+        op = operation["op"]
+        tokens = parse_pointer(operation.get("path"))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JSONPatchError(f"Operation {number}: '{op}' requires a value")
+
+        if op == "test":
+            if _get(document, tokens) != operation["value"]:
+                raise JSONPatchError(f"Operation {number}: test failed at {operation['path']}")
+            continue
+
+        touched.add(tokens[0] if tokens else "")
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document = _remove(document, tokens)
+        elif op == "replace":
+            _get(document, tokens)
+            document = _add(_remove(document, tokens), tokens, copy.deepcopy(operation["value"])) \
+                if tokens else copy.deepcopy(operation["value"])
+        else:
+            source = parse_pointer(operation.get("from"))
+            value = _get(document, source)
+            if op == "move":
+                if tokens[:len(source)] == source and tokens != source:
+                    raise JSONPatchError(f"Operation {number}: cannot move a value into itself")
+                touched.add(source[0] if source else "")
+                document = _remove(document, source)
+            document = _add(document, tokens, copy.deepcopy(value) if op == "copy" else value)
+
+    return document, touched
@@ -0,0 +1,287 @@
+"""Incremental parsing of a top-level JSON object with one streamed array member.
+
+Large FHIR Bundles are mostly their ``entry`` array. The parser here is fed
+the request body chunk by chunk and hands back each top-level member and
+each element of the streamed array as soon as it is complete, so only one
+array element has to be held in memory at a time.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+from src.lib.json_guard import JSONLimitError, check_json_limits
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# A decode error this close to the end of the data may be a value cut off by
+# the chunk boundary (the longest token that fails part-way is '-Infinity');
+# one further back is malformed JSON no later data can fix
+_INCOMPLETE_MARGIN = 16
+
+# Characters that can continue a number
+_NUMBER_CHARACTERS = frozenset("0123456789.eE+-")
+
+# Parser states
+_OBJECT_START = "object-start"
+_FIRST_KEY = "first-key"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_AFTER_VALUE = "after-value"
+_ARRAY_START = "array-start"
+_FIRST_ITEM = "first-item"
+_ITEM = "item"
+_AFTER_ITEM = "after-item"
+_DONE = "done"
+
+
+class JSONStreamError(ValueError):
+    """Raised when the streamed document is not a valid JSON object."""
+
+
+class StreamingObjectParser:
+    """Push parser for a JSON object whose ``array_key`` member is streamed.
+
+    ``feed`` returns events of the form ``("member", key, value)`` for
+    ordinary top-level members and ``("item", index, value)`` for each
+    element of the streamed array. Values are decoded with the standard
+    ``json`` decoder; an incomplete value is re-decoded only once the data
+    held for it has doubled, so parsing stays linear in the input. Malformed
+    JSON is reported as soon as it is seen, not at the end of the input.
+    The structural limits of json_guard apply to the whole document, and are
+    checked on each member and element before it is returned.
+    """
+
+    def __init__(
+        self,
+        array_key: str = "entry",
+        max_value_size: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_array_length: Optional[int] = None
+    ):
+        """Initialize the parser.
+
+        Args:
+            array_key: Top-level member whose array elements are streamed
+            max_value_size: Maximum size in characters of a single member or
+                array element (None for no limit)
+            max_depth: Maximum nesting depth of the document (None for no limit)
+            max_array_length: Maximum number of items in any array, the
+                streamed one included (None for no limit)
+        """
+        self.array_key = array_key
+        self.max_value_size = max_value_size
+        self.max_depth = max_depth
+        self.max_array_length = max_array_length
+        self.bytes_read = 0
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pending: List[str] = []
+        self._pending_length = 0
+        self._pos = 0
+        self._state = _OBJECT_START
+        self._key = ""
+        self._item_index = 0
+        self._retry_at = 0
+        self._closed = False
+
+    @property
+    def buffered(self) -> int:
+        """Number of characters held for values that are not complete yet."""
+        return len(self._buffer) - self._pos + self._pending_length
+
+    def feed(self, data: bytes) -> List[Tuple[str, Any, Any]]:
+        """Feed the next chunk of the document.
+
+        Args:
+            data: Raw UTF-8 bytes
+
+        Returns:
+            Events completed by this chunk
+
+        Raises:
+            JSONStreamError: If the document is malformed
+            JSONLimitError: If a value exceeds max_value_size or a structural limit
+        """
+        self.bytes_read += len(data)
+        try:
+            text = self._text_decoder.decode(data)
+        except UnicodeDecodeError as e:
+            raise JSONStreamError(f"Invalid UTF-8 at byte {self.bytes_read}: {e.reason}")
+        self._pending.append(text)
+        self._pending_length += len(text)
+        over_limit = self.max_value_size is not None and self.buffered > self.max_value_size
+        if self.buffered < self._retry_at and not over_limit:
+            return []
+        self._join_pending()
+        events = self._parse()
+        if self.max_value_size is not None and self.buffered > self.max_value_size:
+            raise JSONLimitError(
+                "bytes", f"A single JSON value exceeds the limit of {self.max_value_size} bytes"
+            )
+        return events
+
+    def close(self) -> List[Tuple[str, Any, Any]]:
+        """Signal the end of the document.
+
+        Returns:
+            Events completed by the end of input
+
+        Raises:
+            JSONStreamError: If the document is incomplete or malformed
+        """
+        self._closed = True
+        try:
+            self._pending.append(self._text_decoder.decode(b"", final=True))
+        except UnicodeDecodeError as e:
+            raise JSONStreamError(f"Invalid UTF-8 at end of input: {e.reason}")
+        self._join_pending()
+        events = self._parse()
+        if self._state != _DONE:
+            raise JSONStreamError("Unexpected end of JSON input")
+        return events
+
+    def _join_pending(self) -> None:
+        """Append buffered chunks to the unconsumed part of the buffer."""
+        self._buffer = "".join([self._buffer[self._pos:]] + self._pending)
+        self._pending = []
+        self._pending_length = 0
+        self._pos = 0
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace; True if a non-whitespace character follows."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _expect(self, characters: str) -> str:
+        """Consume one of the given structural characters."""
+        char = self._buffer[self._pos]
+        if char not in characters:
+            raise JSONStreamError(
+                f"Expected one of {characters!r} but found {char!r} "
+                f"(stream offset ~{self.bytes_read - len(self._buffer) + self._pos})"
+            )
+        self._pos += 1
+        return char
+
+    def _decode_value(self, depth: Optional[int] = None) -> Tuple[bool, Any]:
+        """Decode the value at the current position if it is complete.
+
+        Args:
+            depth: Number of containers enclosing the value, to check it
+                against the structural limits (None to skip the check)
+
+        A value only counts as complete when another non-whitespace character
+        follows it (one that cannot continue a number, for a number), so a
+        value split across chunks is never cut short.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except RecursionError:
+            raise JSONStreamError(
+                f"JSON is nested too deeply (stream offset ~{self.bytes_read - len(self._buffer) + self._pos})"
+            )
+        except json.JSONDecodeError as e:
+            # An unterminated string always runs to the end of the data
+            incomplete = (e.msg.startswith("Unterminated string")
+                          or len(self._buffer) - e.pos <= _INCOMPLETE_MARGIN)
+            if self._closed or not incomplete:
+                raise JSONStreamError(
+                    f"Invalid JSON: {e.msg} (stream offset ~{self.bytes_read - len(self._buffer) + e.pos})"
+                )
+            self._retry_at = 2 * self.buffered
+            return False, None
+        if not self._closed and (
+            _WHITESPACE.match(self._buffer, end).end() >= len(self._buffer)
+            or (isinstance(value, (int, float)) and not isinstance(value, bool)
+                and self._buffer[end] in _NUMBER_CHARACTERS
+                and len(self._buffer) - end <= _INCOMPLETE_MARGIN)
+        ):
+            self._retry_at = self.buffered + 1
+            return False, None
+        if depth is not None and isinstance(value, (dict, list)):
+            self._check_limits(self._buffer[self._pos:end], depth)
+        self._pos = end
+        self._retry_at = 0
+        return True, value
+
+    def _check_limits(self, text: str, depth: int) -> None:
+        """Check a decoded container against the limits of the whole document."""
+        if self.max_depth is None and self.max_array_length is None:
+            return
+        try:
+            check_json_limits(
+                text.encode(),
+                None if self.max_depth is None else self.max_depth - depth,
+                self.max_array_length
+            )
+        except JSONLimitError as e:
+            if e.limit != "depth":
+                raise
+            raise JSONLimitError("depth", f"JSON is nested more than {self.max_depth} levels deep") from None
+
+    def _parse(self) -> List[Tuple[str, Any, Any]]:
+        """Consume as much of the buffer as possible."""
+        events: List[Tuple[str, Any, Any]] = []
+        while self._state != _DONE and self._skip_whitespace():
+            if self._state == _OBJECT_START:
+                self._expect("{")
+                self._state = _FIRST_KEY
+            elif self._state == _FIRST_KEY:
+                if self._buffer[self._pos] == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    self._state = _KEY
+            elif self._state == _KEY:
+                complete, key = self._decode_value()
+                if not complete:
+                    break
+                if not isinstance(key, str):
+                    raise JSONStreamError("Object keys must be strings")
+                self._key = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(":")
+                self._state = _ARRAY_START if self._key == self.array_key else _VALUE
+            elif self._state == _VALUE:
+                complete, value = self._decode_value(depth=1)
+                if not complete:
+                    break
+                events.append(("member", self._key, value))
+                self._state = _AFTER_VALUE
+            elif self._state == _AFTER_VALUE:
+                self._state = _KEY if self._expect(",}") == "," else _DONE
+            elif self._state == _ARRAY_START:
+                if self._buffer[self._pos] != "[":
+                    # Not an array: report it as an ordinary member
+                    self._state = _VALUE
+                    continue
+                self._pos += 1
+                self._state = _FIRST_ITEM
+            elif self._state == _FIRST_ITEM:
+                if self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                else:
+                    self._state = _ITEM
+            elif self._state == _ITEM:
+                if self.max_array_length is not None and self._item_index >= self.max_array_length:
+                    raise JSONLimitError(
+                        "array-length", f"JSON array has more than {self.max_array_length} items"
+                    )
+                complete, value = self._decode_value(depth=2)
+                if not complete:
+                    break
+                events.append(("item", self._item_index, value))
+                self._item_index += 1
+                self._state = _AFTER_ITEM
+            elif self._state == _AFTER_ITEM:
+                self._state = _ITEM if self._expect(",]") == "," else _AFTER_VALUE
+
+        if self._state == _DONE and self._closed and self._skip_whitespace():
+            raise JSONStreamError("Extra data after the JSON object")
+        return events
@@ -0,0 +1,162 @@
+"""Iterative depth-first traversal of decoded JSON values.
+
+Walking a resource by recursion costs a Python frame and a freshly
+formatted path string per value, and a deeply nested ``contained`` /
+``extension`` chain or Questionnaire ``item`` tree can exceed the
+interpreter's recursion limit. JSONWalker visits the same values in the
+same (document, pre-order) sequence from an explicit stack. It keeps one
+reusable segment slot per depth and formats a location only when a caller
+asks for one, reusing the prefix it shares with the previous location, so
+clean subtrees never pay for path formatting.
+"""
+
+from typing import Any, AbstractSet, Iterable, Iterator, List, Optional, Tuple, Union
+
+_CONTAINERS = (dict, list)
+
+# Preformatted array index segments for the common, short arrays
+_INDEX_SEGMENTS = tuple(f"[{i}]" for i in range(1024))
+
+# Path segment slots are allocated this many levels at a time
+_SEGMENT_BLOCK = 32
+
+Segment = Union[str, int]
+
+
+class JSONWalker:
+    """Pre-order traversal of the objects and arrays of a JSON value.
+
+    Iterating yields every dict and list below (and including) the root in
+    document order, and with ``scalars`` set every other value as well.
+    While a value is being visited, ``key`` is the object key or array index
+    it was reached by and ``path`` is its location, formatted like
+    validation issue locations ('name[0].given').
+
+    Example:
+        walker = JSONWalker(resource)
+        for node in walker:
+            if isinstance(node, dict) and 'system' in node:
+                location = walker.child_path('system')
+    """
+
+    __slots__ = ("root", "base_path", "skip_keys", "scalars", "depth",
+                 "_segments", "_unchanged", "_anchor", "_offsets")
+
+    def __init__(
+        self,
+        root: Any,
+        path: str = "",
+        skip_keys: AbstractSet[str] = frozenset(),
+        scalars: bool = False
+    ):
+        """Initialize the walker.
+
+        Args:
+            root: Decoded JSON value to traverse
+            path: Location of the root ('' for a resource root)
+            skip_keys: Object keys whose values are not visited
+            scalars: Whether to visit strings, numbers, booleans and nulls too
+        """
+        self.root = root
+        self.base_path = path
+        self.skip_keys = skip_keys
+        self.scalars = scalars
+        self.depth = 0
+        # _segments[d] is the key or index leading from depth d to d + 1,
+        # overwritten in place as the traversal moves between siblings
+        self._segments: List[Optional[Segment]] = [None] * _SEGMENT_BLOCK
+        # Last formatted location, the end offset of each of its depths, and
+        # how many leading segments are unchanged since it was formatted
+        self._anchor = path
+        self._offsets: List[int] = [len(path)]
+        self._unchanged = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        """Visit the values of the root value."""
+        segments = self._segments
+        skip_keys = self.skip_keys
+        visited = object if self.scalars else _CONTAINERS
+        stack: List[Tuple[Any, int, Optional[Segment]]] = (
+            [(self.root, 0, None)] if isinstance(self.root, visited) else []
+        )
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            value, depth, segment = pop()
+            if depth:
+                try:
+                    segments[depth - 1] = segment
+                except IndexError:
+                    # Grow the segment slots a block of levels at a time
+                    segments.extend([None] * _SEGMENT_BLOCK)
+                    segments[depth - 1] = segment
+                if depth <= self._unchanged:
+                    self._unchanged = depth - 1
+            self.depth = depth
+            yield value
+
+            depth += 1
+            if isinstance(value, dict):
+                for key, child in reversed(value.items()):
+                    if isinstance(child, visited) and (not skip_keys or key not in skip_keys):
+                        push((child, depth, key))
+            elif isinstance(value, list):
+                for index in range(len(value) - 1, -1, -1):
+                    child = value[index]
+                    if isinstance(child, visited):
+                        push((child, depth, index))
+
+    @property
+    def key(self) -> Optional[Segment]:
+        """Object key or array index of the value being visited (None for the root)."""
+        return self._segments[self.depth - 1] if self.depth else None
+
+    @property
+    def path(self) -> str:
+        """Location of the value being visited."""
+        depth = self.depth
+        offsets = self._offsets
+        # Reuse the part of the last location the traversal has not moved away from
+        common = min(self._unchanged, len(offsets) - 1, depth)
+        if common == depth == len(offsets) - 1:
+            return self._anchor
+        parts = [self._anchor[:offsets[common]]]
+        del offsets[common + 1:]
+        length = offsets[common]
+        for segment in self._segments[common:depth]:
+            if type(segment) is int:
+                part = _INDEX_SEGMENTS[segment] if segment < len(_INDEX_SEGMENTS) else f"[{segment}]"
+            else:
+                part = f".{segment}" if length else segment
+            parts.append(part)
+            length += len(part)
+            offsets.append(length)
+        self._anchor = "".join(parts)
+        self._unchanged = depth
+        return self._anchor
+
+    def child_path(self, key: Segment) -> str:
+        """Location of a member of the value being visited.
+
+        Args:
+            key: Object key or array index
+
+        Returns:
+            Location such as 'coding[0].system'
+        """
+        return _join(self.path, key)
+
+
+def format_path(segments: Iterable[Segment]) -> str:
+    """Format JSON path segments as a location ('name[0].given')."""
+    path = ""
+    for segment in segments:
+        path = _join(path, segment)
+    return path
+
+
+def _join(path: str, segment: Segment) -> str:
+    """Append a key or index to a location."""
+    if type(segment) is int:
+        return path + (_INDEX_SEGMENTS[segment] if segment < len(_INDEX_SEGMENTS) else f"[{segment}]")
+    return f"{path}.{segment}" if path else segment
@@ -0,0 +1,236 @@
+"""Minimal Prometheus metrics: counters, gauges and histograms with labels.
+
+Only what the server exports is implemented, rendered in the Prometheus
+text exposition format (version 0.0.4), so no client library is needed.
+Every metric is safe to update from the event loop and worker threads.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Content type of the text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set as '{name="value",...}' ('' without labels)."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class of a metric family with a fixed set of label names."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """Initialize the metric.
+
+        Args:
+            name: Metric name, e.g. 'fhir_validations_total'
+            documentation: HELP text
+            label_names: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _check_labels(self, values: Sequence[str]) -> LabelValues:
+        """Validate the number of label values."""
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(values)}")
+        return tuple(str(value) for value in values)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Get the samples as (name suffix, formatted labels, value)."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric family in the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {_format_value(value)}"
+            for suffix, labels, value in self.samples()
+        )
+        return lines
+
+
+class Counter(Metric):
+    """A monotonically increasing count per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase the count of a label set."""
+        key = self._check_labels(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.label_names, key), value) for key, value in items]
+
+
+class Gauge(Metric):
+    """A value per label set that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Set the value of a label set."""
+        key = self._check_labels(label_values)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increase (or with a negative amount, decrease) the value of a label set."""
+        key = self._check_labels(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", _format_labels(self.label_names, key), value) for key, value in items]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = ()):
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name (the _bucket, _sum and _count samples are derived)
+            documentation: HELP text
+            label_names: Names of the labels every sample carries
+            buckets: Ascending upper bounds (+Inf is added)
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observation for a label set."""
+        key = self._check_labels(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        samples = []
+        label_names = self.label_names + ("le",)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", _format_labels(label_names, key + (_format_value(bound),)), cumulative))
+            labels = _format_labels(self.label_names, key)
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge whose samples are read from the application at scrape time."""
+
+    def __init__(self, name: str, documentation: str, type_name: str,
+                 label_names: Sequence[str], callback: Callable[[], Dict[LabelValues, float]]):
+        """Initialize the metric.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            type_name: 'counter' or 'gauge'
+            label_names: Names of the labels every sample carries
+            callback: Returns the current value per label-value tuple
+        """
+        super().__init__(name, documentation, label_names)
+        self.type_name = type_name
+        self._callback = callback
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            ("", _format_labels(self.label_names, self._check_labels(key)), value)
+            for key, value in sorted(self._callback().items())
+        ]
+
+
+class MetricsRegistry:
+    """The metric families exported by the /metrics endpoint."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family.
+
+        Raises:
+            ValueError: If a metric with the same name is registered
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a registered metric family by name."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric family in the text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,98 @@
+"""Structural fingerprints of JSON payloads that carry no data values.
+
+A fingerprint describes the shape of a resource: its encoded size, nesting
+depth, container counts and the lengths of its arrays by element path,
+e.g. 'entry[*].resource.identifier'. Values (names, identifiers, dates,
+free text) never appear in it, so it can be logged for resources holding
+PHI. The only strings taken from the payload are object keys and
+resourceType values that look like FHIR element or type names.
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Keys and resource types outside this pattern are replaced, so a value
+# smuggled into a key cannot leak into the fingerprint
+_NAME_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9_-]{0,63}")
+_REDACTED_NAME = "<key>"
+
+
+def _safe_name(name: Any) -> str:
+    """Return a key or type name if it looks like a FHIR name, else a placeholder."""
+    if isinstance(name, str) and _NAME_PATTERN.fullmatch(name):
+        return name
+    return _REDACTED_NAME
+
+
+def fingerprint(value: Any, max_array_paths: int = 20) -> Dict[str, Any]:
+    """Describe the structure of a decoded JSON value.
+
+    Args:
+        value: Decoded JSON value, usually a resource
+        max_array_paths: Number of array paths reported (those with the most items)
+
+    Returns:
+        Dictionary with 'size_bytes' (compact JSON encoding), 'depth',
+        'objects', 'arrays', 'scalars', 'max_array_length', 'array_lengths'
+        (per element path: count, max_length, total_length), 'resource_types'
+        (count per resourceType at any level) and 'shape_hash' (hash of
+        the element paths, equal for payloads of the same shape)
+    """
+    objects = arrays = scalars = 0
+    max_depth = max_array_length = 0
+    array_paths: Dict[str, List[int]] = {}
+    element_paths = set()
+    resource_types: Dict[str, int] = {}
+
+    # Explicit stack of (value, element path with wildcard indexes, depth)
+    stack: List[Tuple[Any, str, int]] = [(value, "", 0)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node, path, depth = pop()
+        if depth > max_depth:
+            max_depth = depth
+        if isinstance(node, dict):
+            objects += 1
+            resource_type = node.get("resourceType")
+            if resource_type is not None:
+                name = _safe_name(resource_type)
+                resource_types[name] = resource_types.get(name, 0) + 1
+            for key, child in node.items():
+                child_path = f"{path}.{_safe_name(key)}" if path else _safe_name(key)
+                element_paths.add(child_path)
+                push((child, child_path, depth + 1))
+        elif isinstance(node, list):
+            arrays += 1
+            length = len(node)
+            if length > max_array_length:
+                max_array_length = length
+            stats = array_paths.get(path)
+            if stats is None:
+                stats = array_paths[path] = [0, 0, 0]
+            stats[0] += 1
+            stats[1] = max(stats[1], length)
+            stats[2] += length
+            child_path = f"{path}[*]"
+            for child in node:
+                push((child, child_path, depth + 1))
+        else:
+            scalars += 1
+
+    largest = sorted(array_paths.items(), key=lambda item: (-item[1][2], item[0]))[:max_array_paths]
+    return {
+        "size_bytes": len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()),
+        "depth": max_depth,
+        "objects": objects,
+        "arrays": arrays,
+        "scalars": scalars,
+        "max_array_length": max_array_length,
+        "array_lengths": {
+            path or "$": {"count": count, "max_length": longest, "total_length": total}
+            for path, (count, longest, total) in largest
+        },
+        "resource_types": resource_types,
+        "shape_hash": hashlib.sha256("\n".join(sorted(element_paths)).encode()).hexdigest()[:16],
+    }
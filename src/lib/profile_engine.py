@@ -0,0 +1,950 @@
+"""Snapshot-driven profile constraint engine for StructureDefinitions.
+
+A StructureDefinition is compiled once into a tree of ElementNodes (base
+snapshot + profile differential). Complex datatypes are expanded lazily from
+their own StructureDefinitions (e.g. profiles-types.json), so a resource is
+validated in a single traversal against cardinality, types, fixed/pattern
+values, slicing discriminators, binding strength and FHIRPath invariants.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from src.constants.fhir_constants import MAX_COMPILED_PROFILES
+from src.lib.fhirpath import CompiledExpression, EvaluationContext, FHIRPathError, fhirpath_compiler
+from src.types.fhir_types import ValidationIssue, ValidationSeverity
+
+logger = logging.getLogger(__name__)
+
+# Resolves a canonical URL to a StructureDefinition / ValueSet resource
+StructureDefinitionResolver = Callable[[str], Optional[Dict[str, Any]]]
+ValueSetResolver = Callable[[str], Optional[Dict[str, Any]]]
+
+FHIR_STRUCTURE_DEFINITION_BASE = "http://hl7.org/fhir/StructureDefinition/"
+
+# JSON representation of FHIR primitive types
+PRIMITIVE_JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "boolean": (bool,),
+    "integer": (int,),
+    "positiveInt": (int,),
+    "unsignedInt": (int,),
+    "decimal": (int, float),
+}
+STRING_PRIMITIVE_TYPES = frozenset([
+    "string", "code", "id", "markdown", "uri", "url", "canonical", "oid", "uuid",
+    "base64Binary", "date", "dateTime", "instant", "time", "xhtml",
+])
+FHIRPATH_SYSTEM_TYPES = {
+    "http://hl7.org/fhirpath/System.String": "string",
+    "http://hl7.org/fhirpath/System.Boolean": "boolean",
+    "http://hl7.org/fhirpath/System.Integer": "integer",
+    "http://hl7.org/fhirpath/System.Decimal": "decimal",
+    "http://hl7.org/fhirpath/System.Date": "date",
+    "http://hl7.org/fhirpath/System.DateTime": "dateTime",
+    "http://hl7.org/fhirpath/System.Time": "time",
+}
+# Types whose children are defined inline by the owning StructureDefinition
+INLINE_TYPES = frozenset(["Element", "BackboneElement", "Resource", "DomainResource"])
+
+
+def canonical_without_version(url: str) -> str:
+    """Strip a '|version' suffix from a canonical URL."""
+    return url.split("|", 1)[0]
+
+
+def is_primitive_type(type_code: Optional[str]) -> bool:
+    """Check if a type code is a FHIR primitive type."""
+    return type_code in PRIMITIVE_JSON_TYPES or type_code in STRING_PRIMITIVE_TYPES
+
+
+def element_in_scope(name: str, elements: Optional[AbstractSet[str]]) -> bool:
+    """Check if an element is covered by a set of top-level JSON keys.
+
+    A key covers the element of the same name, its primitive extension
+    ('_birthDate' covers 'birthDate') and a choice element it is a typed
+    form of ('deceasedBoolean' covers 'deceased').
+
+    Args:
+        name: Element name or JSON key
+        elements: JSON keys in scope, or None for every element
+
+    Returns:
+        True if the element is in scope
+    """
+    if elements is None or name in elements:
+        return True
+    name = name.lstrip("_")
+    for key in elements:
+        key = key.lstrip("_")
+        if key == name or (key.startswith(name) and key[len(name):len(name) + 1].isupper()):
+            return True
+    return False
+
+
+def get_path_values(obj: Any, path: Tuple[str, ...]) -> List[Any]:
+    """Collect all values at a dotted element path, flattening arrays.
+
+    Args:
+        obj: Resource or element to start from
+        path: Element names below obj
+
+    Returns:
+        Every value found at the path (empty if absent)
+    """
+    values = [obj]
+    for name in path:
+        next_values = []
+        for value in values:
+            if isinstance(value, dict) and name in value:
+                child = value[name]
+                if isinstance(child, list):
+                    next_values.extend(child)
+                else:
+                    next_values.append(child)
+        values = next_values
+    return values
+
+
+def matches_pattern(value: Any, pattern: Any) -> bool:
+    """Check a value against a pattern[x] (the value must contain the pattern).
+
+    Args:
+        value: Element value from the resource
+        pattern: Pattern value from the profile
+
+    Returns:
+        True if the value contains everything in the pattern
+    """
+    if isinstance(pattern, dict):
+        return isinstance(value, dict) and all(
+            key in value and matches_pattern(value[key], expected)
+            for key, expected in pattern.items()
+        )
+    if isinstance(pattern, list):
+        return isinstance(value, list) and all(
+            any(matches_pattern(item, expected) for item in value)
+            for expected in pattern
+        )
+    return value == pattern
+
+
+def _choice_type_code(suffix: str) -> str:
+    """Map a choice element suffix ('Boolean', 'CodeableConcept') to its type code."""
+    lowered = suffix[:1].lower() + suffix[1:]
+    return lowered if is_primitive_type(lowered) else suffix
+
+
+def _parse_max(max_value: Optional[str]) -> Optional[int]:
+    """Parse an ElementDefinition.max value (None means unbounded)."""
+    if max_value is None or max_value == "*":
+        return None
+    try:
+        return int(max_value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class Invariant:
+    """A compiled ElementDefinition.constraint."""
+    key: str
+    severity: str
+    human: str
+    expression: CompiledExpression
+
+
+class ElementNode:
+    """A compiled element in a profile's element-path tree."""
+
+    __slots__ = (
+        "name", "path", "is_choice", "min", "max", "types", "type_profiles",
+        "fixed", "fixed_is_canonical", "binding_strength", "binding_value_set", "allowed_systems",
+        "slicing_path", "slicing_rules", "slices", "slice_name", "slice_match",
+        "invariants", "children", "base", "_resolved_children", "_resolved_invariants",
+    )
+
+    def __init__(self, name: str, path: str):
+        """Create an unconstrained element node."""
+        self.name = name
+        self.path = path
+        self.is_choice = False
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.types: List[str] = []
+        self.type_profiles: Dict[str, Tuple[str, ...]] = {}
+        self.fixed: Optional[Tuple[str, Any]] = None
+        self.fixed_is_canonical = False
+        self.binding_strength: Optional[str] = None
+        self.binding_value_set: Optional[str] = None
+        self.allowed_systems: Optional[FrozenSet[str]] = None
+        self.slicing_path: Optional[Tuple[str, ...]] = None
+        self.slicing_rules = "open"
+        self.slices: Dict[str, "ElementNode"] = {}
+        self.slice_name: Optional[str] = None
+        self.slice_match: Any = None
+        self.invariants: Tuple[Invariant, ...] = ()
+        self.children: Dict[str, "ElementNode"] = {}
+        self.base: Optional["ElementNode"] = None
+        self._resolved_children: Dict[Optional[str], Dict[str, "ElementNode"]] = {}
+        self._resolved_invariants: Dict[Optional[str], Tuple[Invariant, ...]] = {}
+
+    def apply(self, element: Dict[str, Any]) -> None:
+        """Apply the constraints of an ElementDefinition to this node."""
+        if "min" in element:
+            self.min = element["min"]
+        if "max" in element:
+            self.max = _parse_max(element["max"])
+
+        if element.get("type"):
+            self.types = []
+            self.type_profiles = {}
+            for type_def in element["type"]:
+                code = type_def.get("code", "")
+                code = FHIRPATH_SYSTEM_TYPES.get(code, code)
+                self.types.append(code)
+                if type_def.get("profile"):
+                    self.type_profiles[code] = tuple(
+                        canonical_without_version(profile) for profile in type_def["profile"]
+                    )
+
+        for key, value in element.items():
+            if key.startswith("fixed"):
+                self.fixed = ("fixed", value)
+                self.fixed_is_canonical = key in ("fixedUri", "fixedUrl", "fixedCanonical")
+            elif key.startswith("pattern"):
+                self.fixed = ("pattern", value)
+
+        binding = element.get("binding")
+        if binding and binding.get("valueSet"):
+            self.binding_strength = binding.get("strength", "example")
+            self.binding_value_set = canonical_without_version(binding["valueSet"])
+
+        slicing = element.get("slicing")
+        if slicing:
+            discriminators = slicing.get("discriminator", [])
+            if discriminators and discriminators[0].get("type") in ("value", "pattern"):
+                self.slicing_path = tuple(discriminators[0].get("path", "").split("."))
+            self.slicing_rules = slicing.get("rules", "open")
+
+        if element.get("constraint"):
+            invariants = {invariant.key: invariant for invariant in self.invariants}
+            for constraint in element["constraint"]:
+                expression = constraint.get("expression")
+                compiled = fhirpath_compiler.try_compile(expression) if expression else None
+                if compiled is not None:
+                    invariants[constraint.get("key", "")] = Invariant(
+                        key=constraint.get("key", ""),
+                        severity=constraint.get("severity", "error"),
+                        human=constraint.get("human", expression),
+                        expression=compiled
+                    )
+            self.invariants = tuple(invariants.values())
+
+    def inherit(self, base: "ElementNode", is_slice: bool = False) -> None:
+        """Fill unset constraints from the element this node constrains."""
+        self.base = base
+        if not self.types:
+            self.types = base.types
+            self.type_profiles = base.type_profiles
+        if not self.invariants:
+            self.invariants = base.invariants
+        if self.binding_strength is None:
+            self.binding_strength = base.binding_strength
+            self.binding_value_set = base.binding_value_set
+            self.allowed_systems = base.allowed_systems
+        if is_slice:
+            if self.min is None:
+                self.min = 0
+            if self.max is None:
+                self.max = base.max
+            return
+        if self.min is None:
+            self.min = base.min
+        if self.max is None:
+            self.max = base.max
+        if self.fixed is None:
+            self.fixed = base.fixed
+            self.fixed_is_canonical = base.fixed_is_canonical
+        if self.slicing_path is None:
+            self.slicing_path = base.slicing_path
+            self.slicing_rules = base.slicing_rules
+
+    def conforms_to_fixed(self, value: Any) -> bool:
+        """Check a value against this node's fixed[x] or pattern[x]."""
+        kind, expected = self.fixed
+        if kind == "pattern":
+            return matches_pattern(value, expected)
+        return value == expected
+
+
+class CompiledProfile:
+    """A StructureDefinition compiled into an element-path tree."""
+
+    def __init__(self, engine: "ProfileConstraintEngine", url: str, profile_id: str,
+                 resource_type: str, root: ElementNode):
+        """Create a compiled profile."""
+        self.engine = engine
+        self.url = url
+        self.profile_id = profile_id
+        self.resource_type = resource_type
+        self.root = root
+
+    def is_binding_resolved(self, path: str) -> bool:
+        """Check if the binding on a top-level element has resolved code systems."""
+        node = self.root.children.get(path)
+        return bool(node and node.allowed_systems is not None)
+
+    def validate(self, resource: Dict[str, Any],
+                 elements: Optional[AbstractSet[str]] = None,
+                 max_issues: Optional[int] = None) -> List[ValidationIssue]:
+        """Validate a resource against the profile in one traversal.
+
+        Args:
+            resource: FHIR resource to validate
+            elements: Top-level JSON keys to check (None for all). Resource-level
+                invariants are always evaluated.
+            max_issues: Stop the traversal once this many issues were found
+                (None for no limit)
+
+        Returns:
+            List of validation issues
+        """
+        return self._evaluate(self.root, resource, "", None, EvaluationContext(resource), elements,
+                              max_issues=max_issues)
+
+    def validate_path(self, resource: Dict[str, Any],
+                      segments: Sequence[Tuple[str, Optional[int]]]) -> List[ValidationIssue]:
+        """Validate one element of a resource, and its descendants, against the profile.
+
+        Only the rules of the element itself apply: its cardinality (unless a
+        single item is selected), slicing, types, fixed values, bindings and
+        invariants, and those of everything below it.
+
+        Args:
+            resource: FHIR resource (or a fragment of one)
+            segments: JSON keys from the resource root, each with an optional
+                array index, e.g. [('address', 0), ('line', None)]
+
+        Returns:
+            List of validation issues
+        """
+        if not segments:
+            return self.validate(resource)
+        context = EvaluationContext(resource)
+        frames: List[Tuple[ElementNode, Any, str, Optional[str]]] = [(self.root, resource, "", None)]
+
+        for json_key, index in segments[:-1]:
+            next_frames = []
+            for node, value, path, type_code in frames:
+                if not isinstance(value, dict) or json_key not in value:
+                    continue
+                found = self._child_for_key(self.engine.effective_children(node, type_code), json_key)
+                if found is None:
+                    continue
+                child, item_type = found
+                raw = value[json_key]
+                items = raw if isinstance(raw, list) else [raw]
+                for i, item in enumerate(items):
+                    if index is not None and i != index:
+                        continue
+                    item_path = f"{path}.{json_key}" if path else json_key
+                    if isinstance(raw, list):
+                        item_path += f"[{i}]"
+                    target = (self._match_slice(child, item) if child.slices else None) or child
+                    item_code = item_type or (target.types[0] if len(target.types) == 1 else None)
+                    next_frames.append((target, item, item_path, item_code))
+            frames = next_frames
+
+        json_key, index = segments[-1]
+        issues: List[ValidationIssue] = []
+        for node, value, path, type_code in frames:
+            if isinstance(value, dict):
+                issues.extend(self._evaluate(
+                    node, value, path, type_code, context, frozenset([json_key]),
+                    item_index=index, start_invariants=False
+                ))
+        return issues
+
+    @staticmethod
+    def _child_for_key(children: Dict[str, ElementNode],
+                       json_key: str) -> Optional[Tuple[ElementNode, Optional[str]]]:
+        """Find the child element of a JSON key, with the type a choice key selects."""
+        child = children.get(json_key)
+        if child is not None and not child.is_choice:
+            return child, None
+        for name, child in children.items():
+            suffix = json_key[len(name):]
+            if child.is_choice and json_key.startswith(name) and suffix[:1].isupper():
+                return child, _choice_type_code(suffix)
+        return None
+
+    def _evaluate(self, start: ElementNode, value: Dict[str, Any], path: str,
+                  type_code: Optional[str], context: EvaluationContext,
+                  elements: Optional[AbstractSet[str]] = None, item_index: Optional[int] = None,
+                  start_invariants: bool = True, max_issues: Optional[int] = None) -> List[ValidationIssue]:
+        """Traverse a value and its descendants against an element node.
+
+        elements, item_index and start_invariants only apply to the start
+        node: they restrict its children to some JSON keys, their items to one
+        array index (skipping cardinality checks), and skip its own invariants.
+        The traversal stops once max_issues issues were found.
+        """
+        issues: List[ValidationIssue] = []
+        stack: List[Tuple[ElementNode, Dict[str, Any], str, Optional[str]]] = [
+            (start, value, path, type_code)
+        ]
+        start_value = value
+
+        while stack and (max_issues is None or len(issues) < max_issues):
+            node, value, path, type_code = stack.pop()
+            at_start = node is start and value is start_value
+            if start_invariants or not at_start:
+                self._check_invariants(
+                    self.engine.effective_invariants(node, type_code), value, path, context, issues
+                )
+            children = self.engine.effective_children(node, type_code)
+            scope = elements if at_start else None
+            only_index = item_index if at_start else None
+
+            for key, child in children.items():
+                if scope is not None and not element_in_scope(key, scope):
+                    continue
+                entries = self._collect_entries(value, key, child)
+                count = sum(len(raw) if isinstance(raw, list) else 1 for _, _, raw in entries)
+                location = f"{path}.{key}" if path else key
+                if child.is_choice:
+                    location += "[x]"
+
+                # Too few values then always leave a required slice short; report that instead
+                slices_cover_min = child.min and sum(s.min or 0 for s in child.slices.values()) >= child.min
+                if only_index is None and child.min and count < child.min and not slices_cover_min:
+                    issues.append(ValidationIssue(
+                        severity=ValidationSeverity.ERROR,
+                        code="ph-core-cardinality",
+                        details=f"{child.path} requires at least {child.min} value(s), found {count}",
+                        location=location
+                    ))
+                if only_index is None and child.max is not None and count > child.max:
+                    issues.append(ValidationIssue(
+                        severity=ValidationSeverity.ERROR,
+                        code="ph-core-cardinality",
+                        details=f"{child.path} allows at most {child.max} value(s), found {count}",
+                        location=location
+                    ))
+
+                slice_counts = {name: 0 for name in child.slices}
+                for json_key, item_type, raw in entries:
+                    items = raw if isinstance(raw, list) else [raw]
+                    for i, item in enumerate(items):
+                        if only_index is not None and i != only_index:
+                            continue
+                        item_path = f"{path}.{json_key}" if path else json_key
+                        if isinstance(raw, list):
+                            item_path += f"[{i}]"
+
+                        target = child
+                        if child.slices:
+                            matched = self._match_slice(child, item)
+                            if matched is not None:
+                                slice_counts[matched.slice_name] += 1
+                                target = matched
+                            elif child.slicing_rules == "closed":
+                                issues.append(ValidationIssue(
+                                    severity=ValidationSeverity.ERROR,
+                                    code="ph-core-unmatched-slice",
+                                    details=f"{child.path} is closed to values that match none of its slices",
+                                    location=item_path
+                                ))
+
+                        item_code = item_type or (target.types[0] if len(target.types) == 1 else None)
+                        if not self._check_item(target, item, item_code, item_path, issues):
+                            continue
+
+                        if not isinstance(item, dict) or is_primitive_type(item_code):
+                            self._check_invariants(target.invariants, item, item_path, context, issues)
+                            continue
+                        if len(target.type_profiles.get(item_code, ())) > 1:
+                            issues.extend(self._evaluate_any_profile(target, item, item_path, item_code, context))
+                            if target.children:
+                                stack.append((target, item, item_path, None))
+                        else:
+                            stack.append((target, item, item_path, item_code))
+
+                for slice_name, slice_node in child.slices.items():
+                    if only_index is not None:
+                        break
+                    self._check_slice_cardinality(
+                        child, slice_node, slice_counts[slice_name], location, issues
+                    )
+
+        return issues
+
+    def _evaluate_any_profile(self, node: ElementNode, item: Dict[str, Any], path: str,
+                              type_code: str, context: EvaluationContext) -> List[ValidationIssue]:
+        """Validate a value that must conform to one of several type profiles.
+
+        Returns:
+            Issues of the first conforming profile, or of the closest one if none conform
+        """
+        best: Optional[List[ValidationIssue]] = None
+        for profile_url in node.type_profiles[type_code]:
+            type_profile = self.engine.compile_url(profile_url)
+            if type_profile is None:
+                continue
+            profile_issues = self._evaluate(type_profile.root, item, path, None, context)
+            errors = sum(1 for issue in profile_issues if issue.severity == ValidationSeverity.ERROR)
+            if errors == 0:
+                return profile_issues
+            if best is None or errors < sum(1 for issue in best if issue.severity == ValidationSeverity.ERROR):
+                best = profile_issues
+        return best or []
+
+    def _check_invariants(self, invariants: Tuple[Invariant, ...], value: Any, path: str,
+                          context: EvaluationContext, issues: List[ValidationIssue]) -> None:
+        """Evaluate the FHIRPath invariants of an element on one value."""
+        for invariant in invariants:
+            try:
+                satisfied = invariant.expression.is_satisfied(value, context)
+            except FHIRPathError as e:
+                logger.debug(f"Invariant {invariant.key} not evaluated at {path}: {e}")
+                continue
+            if not satisfied:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING if invariant.severity == "warning" else ValidationSeverity.ERROR,
+                    code="ph-core-invariant",
+                    details=f"Constraint {invariant.key} failed: {invariant.human}",
+                    location=path or self.resource_type
+                ))
+
+    def _collect_entries(self, value: Dict[str, Any], key: str,
+                         child: ElementNode) -> List[Tuple[str, Optional[str], Any]]:
+        """Find the JSON values of a child element as (json key, type code, raw value)."""
+        if not child.is_choice:
+            return [(key, None, value[key])] if key in value else []
+
+        entries = []
+        for json_key, raw in value.items():
+            suffix = json_key[len(key):]
+            if json_key.startswith(key) and suffix[:1].isupper():
+                entries.append((json_key, _choice_type_code(suffix), raw))
+        return entries
+
+    def _match_slice(self, node: ElementNode, item: Any) -> Optional[ElementNode]:
+        """Find the slice an item belongs to using the slicing discriminator."""
+        if node.slicing_path is None:
+            return None
+        values = get_path_values(item, node.slicing_path)
+        for slice_node in node.slices.values():
+            if slice_node.slice_match is None:
+                continue
+            for value in values:
+                if isinstance(value, str) and node.slicing_path == ("url",):
+                    value = self.engine.normalize_canonical(value)
+                if matches_pattern(value, slice_node.slice_match):
+                    return slice_node
+        return None
+
+    def _check_item(self, node: ElementNode, item: Any, type_code: Optional[str],
+                    path: str, issues: List[ValidationIssue]) -> bool:
+        """Check type, fixed/pattern value and binding of one value.
+
+        Returns:
+            False if the value has the wrong type and should not be traversed
+        """
+        if node.types and type_code and type_code not in node.types:
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="ph-core-type-mismatch",
+                details=f"{node.path} does not allow type '{type_code}' (allowed: {', '.join(node.types)})",
+                location=path
+            ))
+            return False
+
+        if type_code in PRIMITIVE_JSON_TYPES:
+            valid_type = (isinstance(item, PRIMITIVE_JSON_TYPES[type_code])
+                          and (type_code == "boolean" or not isinstance(item, bool)))
+        elif type_code in STRING_PRIMITIVE_TYPES:
+            valid_type = isinstance(item, str)
+        elif type_code:
+            valid_type = isinstance(item, dict)
+        else:
+            valid_type = True
+
+        if not valid_type:
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="ph-core-type-mismatch",
+                details=f"{node.path} must be of type '{type_code}', got {type(item).__name__}",
+                location=path
+            ))
+            return False
+
+        if node.fixed_is_canonical and isinstance(item, str):
+            fixed_mismatch = (self.engine.normalize_canonical(item)
+                              != self.engine.normalize_canonical(node.fixed[1]))
+        else:
+            fixed_mismatch = node.fixed is not None and not node.conforms_to_fixed(item)
+        if fixed_mismatch:
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="ph-core-fixed-value-mismatch",
+                details=f"{node.path} must be {node.fixed[1]!r} ({node.fixed[0]}), got {item!r}",
+                location=path
+            ))
+
+        if node.allowed_systems is not None and node.binding_strength in ("required", "extensible"):
+            self._check_binding(node, item, type_code, path, issues)
+
+        return True
+
+    def _check_binding(self, node: ElementNode, item: Any, type_code: Optional[str],
+                       path: str, issues: List[ValidationIssue]) -> None:
+        """Check that codings use a code system included by the bound ValueSet."""
+        if type_code == "CodeableConcept" and isinstance(item, dict):
+            codings = [(f"{path}.coding[{i}]", c) for i, c in enumerate(item.get("coding", []))]
+        elif type_code == "Coding":
+            codings = [(path, item)]
+        else:
+            return
+
+        for coding_path, coding in codings:
+            system = coding.get("system") if isinstance(coding, dict) else None
+            if system and self.engine.normalize_canonical(system) not in node.allowed_systems:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.ERROR if node.binding_strength == "required" else ValidationSeverity.WARNING,
+                    code="invalid-terminology-binding",
+                    details=f"{node.path} has a {node.binding_strength} binding to {node.binding_value_set}; code system not included: {system}",
+                    location=f"{coding_path}.system"
+                ))
+
+    def _check_slice_cardinality(self, node: ElementNode, slice_node: ElementNode, count: int,
+                                 location: str, issues: List[ValidationIssue]) -> None:
+        """Check the cardinality of one slice."""
+        too_few = slice_node.min and count < slice_node.min
+        too_many = slice_node.max is not None and count > slice_node.max
+        if not (too_few or too_many):
+            return
+
+        slice_location = f"{location} ({slice_node.slice_name})"
+        if too_few and node.name == "extension":
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="missing-required-ph-core-extension",
+                details=f"PH-Core {self.resource_type} profile requires '{slice_node.slice_name}' extension: {slice_node.slice_match}",
+                location=slice_location
+            ))
+            return
+
+        max_text = "*" if slice_node.max is None else slice_node.max
+        issues.append(ValidationIssue(
+            severity=ValidationSeverity.ERROR,
+            code="ph-core-slice-cardinality",
+            details=f"{node.path} slice '{slice_node.slice_name}' requires {slice_node.min}..{max_text} value(s), found {count}",
+            location=slice_location
+        ))
+
+
+class ProfileConstraintEngine:
+    """Compiles StructureDefinitions into element-path trees.
+
+    Compiled profiles are kept in an LRU cache keyed by canonical URL, so
+    resources that claim several profiles only pay for compilation once.
+    """
+
+    def __init__(
+        self,
+        resolve_structure_definition: StructureDefinitionResolver,
+        resolve_value_set: Optional[ValueSetResolver] = None,
+        canonical_aliases: Optional[Dict[str, str]] = None,
+        max_compiled_profiles: int = MAX_COMPILED_PROFILES
+    ):
+        """Initialize the engine.
+
+        Args:
+            resolve_structure_definition: Resolves a canonical URL to a StructureDefinition
+            resolve_value_set: Resolves a canonical URL to a ValueSet (for bindings)
+            canonical_aliases: Alias prefix -> canonical prefix, applied when comparing
+                extension URLs and code systems
+            max_compiled_profiles: Capacity of the compiled-profile LRU cache
+        """
+        self._resolve_structure_definition = resolve_structure_definition
+        self._resolve_value_set = resolve_value_set
+        self._canonical_aliases = canonical_aliases or {}
+        self._max_compiled_profiles = max_compiled_profiles
+        self._compiled: "OrderedDict[str, Optional[CompiledProfile]]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_lock = threading.Lock()
+        # Guards the lazy per-node resolution of children and invariants
+        self._resolve_lock = threading.RLock()
+        self._merged_elements_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._allowed_systems_cache: Dict[str, Optional[FrozenSet[str]]] = {}
+
+    def normalize_canonical(self, url: str) -> str:
+        """Strip the version from a canonical URL and map aliased prefixes."""
+        url = canonical_without_version(url)
+        for alias, canonical in self._canonical_aliases.items():
+            if url.startswith(alias):
+                return canonical + url[len(alias):]
+        return url
+
+    def cache_info(self) -> Dict[str, int]:
+        """Get compiled-profile cache statistics."""
+        return {
+            "size": len(self._compiled),
+            "max_size": self._max_compiled_profiles,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+        }
+
+    def _cache_get(self, url: str) -> Tuple[bool, Optional[CompiledProfile]]:
+        """Look up a compiled profile, marking it as recently used."""
+        with self._cache_lock:
+            if url not in self._compiled:
+                self._cache_misses += 1
+                return False, None
+            self._cache_hits += 1
+            self._compiled.move_to_end(url)
+            return True, self._compiled[url]
+
+    def _cache_put(self, url: str, compiled: Optional[CompiledProfile]) -> None:
+        """Store a compiled profile, evicting the least recently used one."""
+        with self._cache_lock:
+            self._compiled[url] = compiled
+            self._compiled.move_to_end(url)
+            while len(self._compiled) > self._max_compiled_profiles:
+                self._compiled.popitem(last=False)
+
+    def compile(self, structure_definition: Dict[str, Any]) -> CompiledProfile:
+        """Compile a StructureDefinition (cached by canonical URL).
+
+        Args:
+            structure_definition: StructureDefinition resource
+
+        Returns:
+            The compiled profile
+        """
+        url = self.normalize_canonical(structure_definition.get("url", ""))
+        if url:
+            found, compiled = self._cache_get(url)
+            if compiled is not None:
+                return compiled
+        return self._compile_uncached(structure_definition, url)
+
+    def _compile_uncached(self, structure_definition: Dict[str, Any], url: str) -> CompiledProfile:
+        """Build the element-path tree of a StructureDefinition and cache it."""
+        resource_type = structure_definition.get("type", "")
+        elements = self._merged_elements(structure_definition, set())
+        root = self._build_tree(resource_type, elements)
+        compiled = CompiledProfile(
+            self, url, structure_definition.get("id", ""), resource_type, root
+        )
+        if url:
+            self._cache_put(url, compiled)
+        return compiled
+
+    def compile_url(self, url: str) -> Optional[CompiledProfile]:
+        """Compile the StructureDefinition with a canonical URL, if it can be resolved."""
+        url = self.normalize_canonical(url)
+        found, compiled = self._cache_get(url)
+        if found:
+            return compiled
+
+        structure_definition = self._resolve_structure_definition(url)
+        if not structure_definition:
+            self._cache_put(url, None)
+            return None
+        return self._compile_uncached(structure_definition, url)
+
+    def effective_children(self, node: ElementNode, type_code: Optional[str]) -> Dict[str, ElementNode]:
+        """Get a node's children, expanding its datatype's definition if needed.
+
+        Args:
+            node: Element node
+            type_code: Actual type of the value (for choice elements)
+
+        Returns:
+            Child nodes by JSON name
+        """
+        resolved = node._resolved_children.get(type_code)
+        if resolved is not None:
+            return resolved
+
+        # Resolution mutates shared nodes (inherit), so it runs under the engine
+        # lock and the result is only published once complete
+        with self._resolve_lock:
+            resolved = node._resolved_children.get(type_code)
+            if resolved is not None:
+                return resolved
+
+            # Layering: constrained element, then the type (profile), then own constraints
+            resolved = {}
+            if node.base is not None:
+                resolved.update(self.effective_children(node.base, type_code))
+
+            if type_code and type_code not in INLINE_TYPES and not is_primitive_type(type_code):
+                profiles = node.type_profiles.get(type_code, ())
+                # With several candidate profiles the caller picks one per value
+                profile_url = profiles[0] if len(profiles) == 1 else f"{FHIR_STRUCTURE_DEFINITION_BASE}{type_code}"
+                type_profile = self.compile_url(profile_url)
+                if type_profile is not None:
+                    resolved.update(type_profile.root.children)
+
+            for name, child in node.children.items():
+                replaced = resolved.get(name)
+                if replaced is not None and replaced is not child and child.base is None:
+                    child.inherit(replaced)
+                resolved[name] = child
+
+            node._resolved_children[type_code] = resolved
+            return resolved
+
+    def effective_invariants(self, node: ElementNode, type_code: Optional[str]) -> Tuple[Invariant, ...]:
+        """Get the invariants of an element plus those of its datatype (or type profile).
+
+        Args:
+            node: Element node
+            type_code: Actual type of the value
+
+        Returns:
+            Invariants, unique by key
+        """
+        resolved = node._resolved_invariants.get(type_code)
+        if resolved is not None:
+            return resolved
+
+        with self._resolve_lock:
+            resolved = node._resolved_invariants.get(type_code)
+            if resolved is not None:
+                return resolved
+
+            invariants = {invariant.key: invariant for invariant in node.invariants}
+            if type_code and type_code not in INLINE_TYPES and not is_primitive_type(type_code):
+                profiles = node.type_profiles.get(type_code, ())
+                profile_url = profiles[0] if len(profiles) == 1 else f"{FHIR_STRUCTURE_DEFINITION_BASE}{type_code}"
+                type_profile = self.compile_url(profile_url)
+                if type_profile is not None:
+                    for invariant in type_profile.root.invariants:
+                        invariants.setdefault(invariant.key, invariant)
+
+            resolved = tuple(invariants.values())
+            node._resolved_invariants[type_code] = resolved
+            return resolved
+
+    def _merged_elements(self, structure_definition: Dict[str, Any], seen: set) -> List[Dict[str, Any]]:
+        """Get the snapshot of a StructureDefinition, generating it from its base if needed."""
+        url = structure_definition.get("url", "")
+        if url and url in self._merged_elements_cache:
+            return self._merged_elements_cache[url]
+
+        snapshot = structure_definition.get("snapshot", {}).get("element")
+        if snapshot:
+            merged = snapshot
+        else:
+            base_elements: List[Dict[str, Any]] = []
+            base_url = structure_definition.get("baseDefinition")
+            if base_url and base_url not in seen:
+                seen.add(url)
+                base = self._resolve_structure_definition(canonical_without_version(base_url))
+                if base and base.get("type") == structure_definition.get("type"):
+                    base_elements = self._merged_elements(base, seen)
+
+            by_id: Dict[str, Dict[str, Any]] = {}
+            for element in base_elements:
+                by_id[element.get("id") or element.get("path", "")] = element
+            for element in structure_definition.get("differential", {}).get("element", []):
+                element_id = element.get("id") or element.get("path", "")
+                by_id[element_id] = {**by_id[element_id], **element} if element_id in by_id else element
+            merged = list(by_id.values())
+
+        if url:
+            self._merged_elements_cache[url] = merged
+        return merged
+
+    def _build_tree(self, resource_type: str, elements: List[Dict[str, Any]]) -> ElementNode:
+        """Build the element-path tree from snapshot elements."""
+        root = ElementNode(resource_type, resource_type)
+
+        for element in elements:
+            element_id = element.get("id") or element.get("path", "")
+            segments = element_id.split(".")
+            node = root
+            for segment in segments[1:]:
+                name, _, slice_name = segment.partition(":")
+                key = name[:-3] if name.endswith("[x]") else name
+                child = node.children.get(key)
+                if child is None:
+                    child = ElementNode(key, f"{node.path}.{name}")
+                    child.is_choice = name.endswith("[x]")
+                    node.children[key] = child
+                node = child
+
+                if slice_name:
+                    slice_node = node.slices.get(slice_name)
+                    if slice_node is None:
+                        slice_node = ElementNode(key, f"{node.path}:{slice_name}")
+                        slice_node.is_choice = node.is_choice
+                        slice_node.slice_name = slice_name
+                        node.slices[slice_name] = slice_node
+                    node = slice_node
+
+            node.apply(element)
+
+        self._link_tree(root)
+        return root
+
+    def _link_tree(self, root: ElementNode) -> None:
+        """Resolve slice inheritance, slice discriminator values and bindings."""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.binding_value_set and node.allowed_systems is None:
+                node.allowed_systems = self._allowed_systems(node.binding_value_set)
+
+            for slice_node in node.slices.values():
+                slice_node.inherit(node, is_slice=True)
+                slice_node.slice_match = self._slice_match(node, slice_node)
+                stack.append(slice_node)
+            stack.extend(node.children.values())
+
+    def _slice_match(self, node: ElementNode, slice_node: ElementNode) -> Any:
+        """Determine the discriminator value that selects a slice."""
+        if node.slicing_path is None:
+            return None
+
+        # Extension slices are discriminated by the extension profile URL
+        if node.slicing_path == ("url",) and "Extension" in slice_node.type_profiles:
+            return slice_node.type_profiles["Extension"][0]
+
+        target = slice_node
+        for name in node.slicing_path:
+            target = target.children.get(name)
+            if target is None:
+                return None
+        return target.fixed[1] if target.fixed else None
+
+    def _allowed_systems(self, value_set_url: str) -> Optional[FrozenSet[str]]:
+        """Resolve the code systems included by a ValueSet (cached)."""
+        if value_set_url in self._allowed_systems_cache:
+            return self._allowed_systems_cache[value_set_url]
+
+        systems: Optional[FrozenSet[str]] = None
+        value_set = self._resolve_value_set(value_set_url) if self._resolve_value_set else None
+        if value_set:
+            included = {
+                include.get("system")
+                for include in value_set.get("compose", {}).get("include", [])
+                if include.get("system")
+            }
+            included.update(
+                contains.get("system")
+                for contains in value_set.get("expansion", {}).get("contains", [])
+                if contains.get("system")
+            )
+            systems = frozenset(self.normalize_canonical(system) for system in included) or None
+
+        self._allowed_systems_cache[value_set_url] = systems
+        return systems
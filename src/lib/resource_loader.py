@@ -8,8 +8,10 @@ from functools import lru_cache
 
 from src.constants.fhir_constants import (
     RESOURCES_PATH, FHIR_SCHEMA_FILE, PROFILES_RESOURCES_FILE,
-    PROFILES_TYPES_FILE, VALUESETS_FILE, EXTENSION_DEFINITIONS_FILE
+    PROFILES_TYPES_FILE, VALUESETS_FILE, EXTENSION_DEFINITIONS_FILE,
+    CONCEPTMAPS_FILE
 )
+from src.lib.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,7 @@ class FHIRResourceLoader:
         self._profiles: Optional[Dict[str, Any]] = None
         self._value_sets: Optional[Dict[str, Any]] = None
         self._extensions: Optional[Dict[str, Any]] = None
+        self._concept_maps: Optional[Dict[str, Any]] = None
         self._loaded = False
     
     def _load_json_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
@@ -39,7 +42,8 @@ class FHIRResourceLoader:
                 logger.warning(f"FHIR resource file not found: {file_path}")
                 return None
                 
-            with open(file_path, 'r', encoding='utf-8') as file:
+            with tracer.span("resource_loader.load_file", {"file.name": file_path.name}), \
+                    open(file_path, 'r', encoding='utf-8') as file:
                 return json.load(file)
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in file {file_path}: {e}")
@@ -48,6 +52,7 @@ class FHIRResourceLoader:
             logger.error(f"Error loading file {file_path}: {e}")
             return None
     
+    @tracer.traced("resource_loader.load")
     def _load_resources(self) -> None:
         """Load all FHIR base resources."""
         logger.info("Loading FHIR base resources...")
@@ -59,12 +64,13 @@ class FHIRResourceLoader:
         profiles_resources = self._load_json_file(PROFILES_RESOURCES_FILE)
         profiles_types = self._load_json_file(PROFILES_TYPES_FILE)
         
-        # Combine profiles
+        # Combine profiles (keeping the entries of both bundles)
         self._profiles = {}
-        if profiles_resources:
-            self._profiles.update(profiles_resources)
-        if profiles_types:
-            self._profiles.update(profiles_types)
+        for bundle in (profiles_resources, profiles_types):
+            if bundle:
+                entries = self._profiles.get("entry", []) + bundle.get("entry", [])
+                self._profiles.update(bundle)
+                self._profiles["entry"] = entries
         
         # Load value sets
         self._value_sets = self._load_json_file(VALUESETS_FILE)
@@ -72,6 +78,9 @@ class FHIRResourceLoader:
         # Load extensions
         self._extensions = self._load_json_file(EXTENSION_DEFINITIONS_FILE)
         
+        # Load concept maps
+        self._concept_maps = self._load_json_file(CONCEPTMAPS_FILE)
+        
         self._loaded = True
         logger.info("FHIR base resources loaded successfully")
     
@@ -120,6 +129,16 @@ class FHIRResourceLoader:
         self.ensure_loaded()
         return self._extensions or {}
     
+    @property
+    def concept_maps(self) -> Dict[str, Any]:
+        """Get FHIR concept maps.
+        
+        Returns:
+            FHIR ConceptMap bundle
+        """
+        self.ensure_loaded()
+        return self._concept_maps or {}
+    
     def get_resource_profile(self, resource_type: str) -> Optional[Dict[str, Any]]:
         """Get profile definition for a specific resource type.
         
@@ -0,0 +1,113 @@
+"""Duplicate and identifier-collision detection across one validation submission."""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.lib.system_index import SystemIndex
+from src.types.fhir_types import ValidationIssue, ValidationSeverity
+
+# Elements that do not change what a resource says (server-assigned or version metadata)
+_HASH_EXCLUDED_ELEMENTS = ("id", "meta")
+
+
+def resource_fingerprint(resource: Dict[str, Any]) -> str:
+    """Hash a resource's content, ignoring its id and meta.
+
+    Args:
+        resource: FHIR resource
+
+    Returns:
+        Hex SHA-256 of the resource's canonical JSON form
+    """
+    content = {key: value for key, value in resource.items() if key not in _HASH_EXCLUDED_ELEMENTS}
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SubmissionIndex:
+    """Indexes the resources of one batch or Bundle as they are validated.
+
+    Every resource is hashed and its identifiers from known identifier
+    namespaces (PhilHealth ID, PhilSys ID, NHFR code, ...) are indexed by
+    system|value, so each new resource is checked against all earlier ones
+    in O(1). Identifier values are compared without the optional hyphens of
+    their value mask, and aliased system URIs of one NamingSystem are
+    treated as the same system.
+    """
+
+    def __init__(self, system_index: SystemIndex):
+        """Initialize an empty index.
+
+        Args:
+            system_index: Classifies identifier systems
+        """
+        self._system_index = system_index
+        self._fingerprints: Dict[Tuple[str, str], str] = {}
+        self._identifiers: Dict[Tuple[str, str, str], str] = {}
+
+    def __len__(self) -> int:
+        """Number of distinct resources indexed."""
+        return len(self._fingerprints)
+
+    def _identifier_key(self, identifier: Any) -> Optional[Tuple[str, str]]:
+        """Get the (system key, normalized value) of an identifier in a known namespace."""
+        if not isinstance(identifier, dict):
+            return None
+        value = identifier.get("value")
+        known_system = self._system_index.classify(identifier.get("system"))
+        if not known_system or known_system.kind != "identifier" or not isinstance(value, str) or not value:
+            return None
+        value = value.strip()
+        if known_system.value_mask:
+            value = value.replace("-", "")
+        return known_system.key, value
+
+    def add(self, resource: Dict[str, Any], label: str) -> List[ValidationIssue]:
+        """Index a resource and report what it duplicates or collides with.
+
+        Args:
+            resource: FHIR resource
+            label: How to refer to this resource in later issues (e.g. 'entry[3]')
+
+        Returns:
+            Issues for this resource, located relative to the resource
+        """
+        issues: List[ValidationIssue] = []
+        resource_type = resource.get("resourceType")
+        if not isinstance(resource_type, str):
+            return issues
+
+        fingerprint = (resource_type, resource_fingerprint(resource))
+        first = self._fingerprints.get(fingerprint)
+        if first is not None:
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.WARNING,
+                code="duplicate-resource",
+                details=f"{resource_type} has the same content as {first}"
+            ))
+            return issues
+        self._fingerprints[fingerprint] = label
+
+        identifiers = resource.get("identifier")
+        if not isinstance(identifiers, list):
+            return issues
+
+        for i, identifier in enumerate(identifiers):
+            key = self._identifier_key(identifier)
+            if key is None:
+                continue
+            first = self._identifiers.setdefault((resource_type, *key), label)
+            if first != label:
+                known_system = self._system_index.classify(identifier.get("system"))
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="identifier-collision",
+                    details=(
+                        f"{known_system.name} '{identifier.get('value')}' is also used by "
+                        f"{resource_type} {first}"
+                    ),
+                    location=f"identifier[{i}]"
+                ))
+
+        return issues
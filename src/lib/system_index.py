@@ -0,0 +1,133 @@
+"""Index of known identifier and coding systems from PH-Core NamingSystems and CodeSystems."""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Pattern
+
+# Identifier value masks in PH-Core profiles use 'n' for a digit (e.g. 'nn-nnnnnnnnn-n')
+_VALUE_MASK_RE = re.compile(r'^n+(-n+)*$')
+
+
+@dataclass(frozen=True)
+class KnownSystem:
+    """A classified system URI with its compiled rules."""
+    uri: str
+    kind: str  # "identifier" or "codesystem"
+    key: str
+    name: str
+    value_mask: Optional[str] = None
+    value_pattern: Optional[Pattern[str]] = None
+
+
+def compile_value_mask(mask: str) -> Optional[Pattern[str]]:
+    """Compile a PH-Core identifier value mask into a regex.
+
+    Hyphens in the mask are optional in the value, so 'nn-nnnnnnnnn-n'
+    accepts both '63-584789845-5' and '635847898455'.
+
+    Args:
+        mask: Value mask such as 'nnnn-nnnnnnn-n'
+
+    Returns:
+        Compiled pattern, or None if the text is a sample value rather than a mask
+    """
+    if not mask or not _VALUE_MASK_RE.match(mask):
+        return None
+    groups = [rf'\d{{{len(group)}}}' for group in mask.split('-')]
+    return re.compile('^' + '-?'.join(groups) + '$')
+
+
+class SystemIndex:
+    """O(1) classification of identifier and coding system URIs."""
+
+    def __init__(
+        self,
+        naming_systems: Iterable[Dict[str, Any]],
+        code_systems: Iterable[Dict[str, Any]],
+        structure_definitions: Iterable[Dict[str, Any]]
+    ):
+        """Build the index.
+
+        Args:
+            naming_systems: NamingSystem resources
+            code_systems: CodeSystem resources
+            structure_definitions: StructureDefinition resources; Identifier
+                profiles contribute their fixed system URI and value mask
+        """
+        self._systems: Dict[str, KnownSystem] = {}
+        self._index_naming_systems(list(naming_systems), list(structure_definitions))
+        self._index_code_systems(code_systems)
+
+    def _index_naming_systems(
+        self,
+        naming_systems: List[Dict[str, Any]],
+        structure_definitions: List[Dict[str, Any]]
+    ) -> None:
+        """Index NamingSystem unique IDs and the Identifier profiles that reference them."""
+        # Identifier profiles pin Identifier.system to '.../NamingSystem/<id>'
+        profile_rules: Dict[str, Dict[str, Optional[str]]] = {}
+        for profile in structure_definitions:
+            if profile.get("type") != "Identifier":
+                continue
+            fixed_uri = None
+            mask = None
+            for element in profile.get("differential", {}).get("element", []):
+                if element.get("path") == "Identifier.system":
+                    fixed_uri = element.get("fixedUri")
+                elif element.get("path") == "Identifier.value":
+                    for example in element.get("example", []):
+                        mask = mask or example.get("valueString")
+            if fixed_uri:
+                profile_rules[fixed_uri.rstrip("/").rsplit("/", 1)[-1]] = {"uri": fixed_uri, "mask": mask}
+
+        for naming_system in naming_systems:
+            ns_id = naming_system.get("id", "")
+            rules = profile_rules.get(ns_id, {})
+            mask = rules.get("mask")
+            pattern = compile_value_mask(mask) if mask else None
+
+            uris = [
+                unique_id.get("value") for unique_id in naming_system.get("uniqueId", [])
+                if unique_id.get("type") == "uri"
+            ]
+            uris.append(rules.get("uri"))
+
+            for uri in filter(None, uris):
+                self._systems[uri] = KnownSystem(
+                    uri=uri,
+                    kind=naming_system.get("kind", "identifier"),
+                    key=ns_id[:-3] if ns_id.endswith("-ns") else ns_id,
+                    name=naming_system.get("name", ns_id),
+                    value_mask=mask if pattern else None,
+                    value_pattern=pattern
+                )
+
+    def _index_code_systems(self, code_systems: Iterable[Dict[str, Any]]) -> None:
+        """Index CodeSystem canonical URLs."""
+        for code_system in code_systems:
+            url = code_system.get("url")
+            if not url:
+                continue
+            self._systems[url] = KnownSystem(
+                uri=url,
+                kind="codesystem",
+                key=code_system.get("id", ""),
+                name=code_system.get("title") or code_system.get("name", "")
+            )
+
+    def __len__(self) -> int:
+        """Number of indexed system URIs."""
+        return len(self._systems)
+
+    def classify(self, system: Any) -> Optional[KnownSystem]:
+        """Classify a system URI.
+
+        Args:
+            system: Identifier.system or Coding.system value
+
+        Returns:
+            The known system, or None if the URI is not indexed
+        """
+        if not isinstance(system, str):
+            return None
+        return self._systems.get(system)
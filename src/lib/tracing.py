@@ -0,0 +1,332 @@
+"""Lightweight tracing spans exported as OTLP JSON.
+
+Spans nest through a context variable, so they follow a request across
+await points, and callables bound with Tracer.bind() carry the current
+span into worker threads. A trace is exported when its local root span
+ends: all of its spans are appended to a file as one line holding an
+OTLP/JSON ExportTraceServiceRequest, the format the OpenTelemetry
+Collector's file exporter writes and its otlpjsonfile receiver reads.
+
+A request carrying a W3C traceparent header continues the caller's trace,
+so validator spans line up with the gateway's spans of the same request.
+Without an exporter the tracer is disabled and a span costs one attribute
+check.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from src.constants.fhir_constants import SERVER_VERSION, TRACE_EXPORT_FILE, TRACE_SERVICE_NAME
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+# OTLP status codes
+STATUS_CODE_ERROR = 2
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT_PATTERN = re.compile(r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+_UNTRACED = nullcontext()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Parse a W3C traceparent header.
+
+    Args:
+        header: Header value, e.g. '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+
+    Returns:
+        Tuple of (trace ID, parent span ID), or None if the header is
+        absent or malformed
+    """
+    if not header:
+        return None
+    match = _TRACEPARENT_PATTERN.fullmatch(header.strip().lower())
+    if match is None or match.group(1) == "ff":
+        return None
+    trace_id, span_id = match.group(2), match.group(3)
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+def _new_id(bits: int) -> str:
+    """Generate a random non-zero trace or span ID as lowercase hex."""
+    value = 0
+    while not value:
+        value = random.getrandbits(bits)
+    return f"{value:0{bits // 4}x}"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64-bit integers are encoded as strings in OTLP/JSON
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "kind",
+                 "start_time_ns", "end_time_ns", "attributes", "error", "local_root")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int,
+        attributes: Optional[Dict[str, Any]],
+        local_root: bool
+    ):
+        """Start the span.
+
+        Args:
+            name: Operation name, e.g. 'validate_resource' or 'json_schema'
+            trace_id: 32 hex digit trace ID
+            parent_span_id: 16 hex digit ID of the parent span (None for a trace root)
+            kind: OTLP span kind
+            attributes: Initial attributes
+            local_root: Whether the span has no parent in this process
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.error: Optional[str] = None
+        self.local_root = local_root
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute (str, bool, int or float)."""
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value that makes this span the parent of a remote span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Encode the span as an OTLP/JSON Span."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {} if self.error is None else {"code": STATUS_CODE_ERROR, "message": self.error},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class OTLPFileExporter:
+    """Appends traces to a file, one OTLP/JSON ExportTraceServiceRequest per line."""
+
+    def __init__(self, path: Path, service_name: str, service_version: str):
+        """Initialize the exporter.
+
+        Args:
+            path: Output file (created with its directory on first export)
+            service_name: service.name resource attribute
+            service_version: service.version resource attribute
+        """
+        self.path = Path(path)
+        self.resource = {"attributes": [
+            {"key": "service.name", "value": {"stringValue": service_name}},
+            {"key": "service.version", "value": {"stringValue": service_version}},
+        ]}
+        self.scope = {"name": __name__}
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        """Write the spans of one trace."""
+        request = {"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": self.scope, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+        line = json.dumps(request, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line)
+
+
+class Tracer:
+    """Creates spans and exports each trace once its local root span ends.
+
+    Example:
+        with tracer.span("json_schema", {"fhir.resource_type": "Patient"}):
+            ...
+
+        @tracer.traced("validate_resource")
+        def validate_resource(...): ...
+    """
+
+    def __init__(self, exporter: Optional[OTLPFileExporter] = None):
+        """Initialize the tracer.
+
+        Args:
+            exporter: Destination of finished traces (None disables tracing)
+        """
+        self.exporter = exporter
+        # Finished spans per trace ID, waiting for their local root span
+        self._pending: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans are recorded."""
+        return self.exporter is not None
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        """Get the innermost active span of the current context."""
+        return _current_span.get()
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        remote_parent: Optional[Tuple[str, str]] = None
+    ) -> ContextManager[Optional[Span]]:
+        """Record the enclosed block as a span.
+
+        Args:
+            name: Operation name
+            attributes: Initial span attributes
+            kind: OTLP span kind
+            remote_parent: (trace ID, span ID) of a remote parent, used when
+                there is no active span (see parse_traceparent)
+
+        Returns:
+            Context manager yielding the span (None when tracing is disabled)
+        """
+        if self.exporter is None:
+            return _UNTRACED
+        return self._record(name, attributes, kind, remote_parent)
+
+    def traced(
+        self,
+        name: str,
+        result_attributes: Optional[Callable[[Any], Dict[str, Any]]] = None
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorate a function so every call is recorded as a span.
+
+        Args:
+            name: Operation name
+            result_attributes: Returns span attributes describing the call's result
+
+        Returns:
+            Decorator
+        """
+        def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if self.exporter is None:
+                    return function(*args, **kwargs)
+                with self._record(name, None, SPAN_KIND_INTERNAL, None) as span:
+                    result = function(*args, **kwargs)
+                    if result_attributes is not None:
+                        span.attributes.update(result_attributes(result))
+                    return result
+            return wrapper
+        return decorator
+
+    def bind(self, function: Callable[..., Any]) -> Callable[..., Any]:
+        """Bind a callable to the current span, for running it on another thread.
+
+        Thread pools do not carry context variables into their workers, so
+        spans started by the callable would otherwise start new traces.
+
+        Args:
+            function: Callable to run in a worker thread
+
+        Returns:
+            Callable that runs `function` as a child of the current span
+        """
+        if self.exporter is None:
+            return function
+        context = contextvars.copy_context()
+
+        @functools.wraps(function)
+        def run_in_context(*args: Any, **kwargs: Any) -> Any:
+            # A context can only be entered by one thread at a time, so each call gets a copy
+            return context.copy().run(function, *args, **kwargs)
+        return run_in_context
+
+    @contextmanager
+    def _record(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]],
+        kind: int,
+        remote_parent: Optional[Tuple[str, str]]
+    ) -> Iterator[Span]:
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, kind, attributes, local_root=False)
+        elif remote_parent is not None:
+            span = Span(name, remote_parent[0], remote_parent[1], kind, attributes, local_root=True)
+        else:
+            span = Span(name, _new_id(128), None, kind, attributes, local_root=True)
+
+        start = time.perf_counter_ns()
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = span.start_time_ns + time.perf_counter_ns() - start
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        """Buffer a finished span, exporting its trace if it is the local root."""
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if not span.local_root:
+                return
+            del self._pending[span.trace_id]
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            # Tracing must never fail the traced operation
+            logger.error(f"Error exporting trace {span.trace_id}: {e}")
+
+
+# Global tracer instance
+tracer = Tracer(
+    OTLPFileExporter(Path(TRACE_EXPORT_FILE), TRACE_SERVICE_NAME, SERVER_VERSION) if TRACE_EXPORT_FILE else None
+)
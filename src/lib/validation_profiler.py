@@ -0,0 +1,120 @@
+"""On-demand profiling of a single validation."""
+
+import cProfile
+import logging
+import os
+import pstats
+import time
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from src.constants.fhir_constants import (
+    PROFILE_MAX_HOTSPOTS, PROFILED_VALIDATOR_MODULES, PROJECT_ROOT
+)
+from src.types.fhir_types import ProfileEntry, ValidationProfile
+
+logger = logging.getLogger(__name__)
+
+# pstats key: (file name, first line number, function name)
+FunctionKey = Tuple[str, int, str]
+
+
+class ValidationProfiler:
+    """Runs a validation under cProfile and summarizes where the time went.
+
+    The profiler is deterministic: every function call of the profiled
+    thread is recorded, which makes the profiled run noticeably slower than
+    an unprofiled one, so it is only used on request. Work handed to other
+    threads (e.g. concurrently validated Bundle entries) is not recorded.
+
+    The summary lists every function of the validator modules that ran,
+    by cumulative time, and the functions with the most own time anywhere
+    (schema validation, FHIRPath, etc.).
+    """
+
+    def __init__(
+        self,
+        validator_modules: Iterable[str] = PROFILED_VALIDATOR_MODULES,
+        max_hotspots: int = PROFILE_MAX_HOTSPOTS
+    ):
+        """Initialize the profiler.
+
+        Args:
+            validator_modules: Paths, relative to the project root, of the
+                modules whose functions are always reported
+            max_hotspots: Number of functions reported by own time
+        """
+        self.validator_modules = frozenset(
+            os.path.abspath(PROJECT_ROOT / module) for module in validator_modules
+        )
+        self.max_hotspots = max_hotspots
+        self._root = os.path.abspath(PROJECT_ROOT)
+
+    def profile(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, ValidationProfile]:
+        """Call a function under the profiler.
+
+        Args:
+            function: Function to profile, e.g. fhir_validator.validate_resource
+            *args: Positional arguments of the call
+            **kwargs: Keyword arguments of the call
+
+        Returns:
+            Tuple of the function's return value and the profile summary
+        """
+        profiler = cProfile.Profile()
+        start = time.perf_counter_ns()
+        profiler.enable()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            profiler.disable()
+        total_ns = time.perf_counter_ns() - start
+        return result, self.summarize(pstats.Stats(profiler).stats, total_ns)
+
+    def summarize(self, stats: Dict[FunctionKey, tuple], total_ns: int) -> ValidationProfile:
+        """Summarize raw pstats statistics.
+
+        Args:
+            stats: pstats.Stats.stats mapping of function key to
+                (primitive calls, calls, own time, cumulative time, callers)
+            total_ns: Wall time of the profiled call in nanoseconds
+
+        Returns:
+            Profile summary
+        """
+        entries = []
+        validator_entries = []
+        for key, (primitive_calls, calls, own_time, cumulative_time, _callers) in stats.items():
+            entry = ProfileEntry(
+                function=key[2],
+                location=self._location(key),
+                calls=calls,
+                primitive_calls=primitive_calls,
+                own_time_ms=round(own_time * 1000, 3),
+                cumulative_time_ms=round(cumulative_time * 1000, 3)
+            )
+            entries.append(entry)
+            if os.path.abspath(key[0]) in self.validator_modules:
+                validator_entries.append(entry)
+
+        validator_entries.sort(key=lambda entry: entry.cumulative_time_ms, reverse=True)
+        entries.sort(key=lambda entry: entry.own_time_ms, reverse=True)
+        return ValidationProfile(
+            total_time_ms=round(total_ns / 1e6, 3),
+            validator_functions=validator_entries,
+            hotspots=entries[:self.max_hotspots]
+        )
+
+    def _location(self, key: FunctionKey) -> str:
+        """Format 'file:line', with project files relative to the project root."""
+        filename, line, _name = key
+        if filename == "~":
+            # Built-in functions have no source file
+            return "~"
+        path = os.path.abspath(filename)
+        if path.startswith(self._root + os.sep):
+            path = os.path.relpath(path, self._root)
+        return f"{path}:{line}"
+
+
+# Global validation profiler instance
+validation_profiler = ValidationProfiler()
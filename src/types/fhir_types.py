@@ -58,6 +58,30 @@ class ValidationRequest(BaseModel):
     validate_value_sets: bool = Field(default=True)
     use_ph_core: bool = Field(default=True)
     strict_ph_core: bool = Field(default=True)
+    detect_duplicates: bool = Field(default=False)
+    issue_validation_token: bool = Field(default=False)
+    max_issues: Optional[int] = Field(default=None, ge=1)
+    aggregate_issues: bool = Field(default=False)
+    include_timings: bool = Field(default=False)
+    include_profile: bool = Field(default=False)
+
+
+class ProfileEntry(BaseModel):
+    """Profiler statistics of one function."""
+    function: str
+    location: str
+    calls: int
+    primitive_calls: int
+    own_time_ms: float
+    cumulative_time_ms: float
+
+
+class ValidationProfile(BaseModel):
+    """Deterministic profile of a single validation."""
+    profiler: str = "cProfile"
+    total_time_ms: float
+    validator_functions: List[ProfileEntry] = Field(default_factory=list)
+    hotspots: List[ProfileEntry] = Field(default_factory=list)
 
 
 class ValidationResponse(BaseModel):
@@ -65,6 +89,58 @@ class ValidationResponse(BaseModel):
     validation_result: ValidationResult
     processed_at: str
     processing_time_ms: int
+    validation_token: Optional[str] = None
+    stage_timings_ns: Optional[Dict[str, int]] = None
+    profile: Optional[ValidationProfile] = None
+
+
+class DeltaValidationRequest(BaseModel):
+    """Delta validation request: a JSON Patch against a previously validated resource."""
+    validation_token: str
+    patch: List[Dict[str, Any]]
+
+
+class PartialValidationRequest(BaseModel):
+    """Partial validation request: selected element paths of a resource fragment."""
+    resource: Dict[str, Any]
+    paths: List[str]
+    profile: Optional[str] = None
+    validate_code_systems: bool = Field(default=True)
+    use_ph_core: bool = Field(default=True)
+
+
+class TranslationMatch(BaseModel):
+    """Single ConceptMap $translate match."""
+    equivalence: str
+    system: Optional[str] = None
+    code: Optional[str] = None
+    display: Optional[str] = None
+    source: str
+    comment: Optional[str] = None
+
+
+class TranslationResult(BaseModel):
+    """ConceptMap $translate result for one source code."""
+    result: bool
+    system: str
+    code: str
+    matches: List[TranslationMatch] = Field(default_factory=list)
+    message: Optional[str] = None
+
+
+class BatchTranslationRequest(BaseModel):
+    """ConceptMap $translate request for a column of codes."""
+    system: str
+    codes: List[str]
+    target_system: Optional[str] = None
+    concept_map_url: Optional[str] = None
+
+
+class BatchTranslationResponse(BaseModel):
+    """ConceptMap $translate response for a column of codes."""
+    results: List[TranslationResult]
+    total: int
+    mapped: int
 
 
 class ServerInfo(BaseModel):
@@ -77,6 +153,25 @@ class ServerInfo(BaseModel):
     supported_operations: List[str]
 
 
+class MemoryUsage(BaseModel):
+    """Memory held by one loaded structure or cache."""
+    name: str
+    category: str
+    size_bytes: int
+    objects: int
+    entries: Optional[int] = None
+
+
+class MemoryReport(BaseModel):
+    """Deep memory usage of the server's loaded structures and caches."""
+    generated_at: str
+    process_rss_bytes: int
+    accounted_bytes: int
+    gc_tracked_objects: int
+    duration_ms: int
+    structures: List[MemoryUsage] = Field(default_factory=list)
+
+
 class HealthStatus(BaseModel):
     """Health check response model."""
     status: str
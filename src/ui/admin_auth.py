@@ -0,0 +1,39 @@
+"""Admin authentication of diagnostic features."""
+
+import logging
+import secrets
+
+from fastapi import HTTPException, Request
+
+from src.constants.fhir_constants import (
+    ADMIN_API_KEY, ADMIN_KEY_HEADER, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
+)
+
+logger = logging.getLogger(__name__)
+
+
+def require_admin(request: Request) -> None:
+    """Check that a request carries the admin API key.
+
+    The key is sent in the X-Admin-Key header and compared in constant time.
+    Admin features are disabled when the server has no ADMIN_API_KEY.
+
+    Args:
+        request: Incoming HTTP request
+
+    Raises:
+        HTTPException: 403 if admin access is disabled, 401 if the key is
+            missing or wrong
+    """
+    if not ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="Admin access is disabled (ADMIN_API_KEY is not configured)"
+        )
+    key = request.headers.get(ADMIN_KEY_HEADER)
+    if key is None or not secrets.compare_digest(key.encode(), ADMIN_API_KEY.encode()):
+        logger.warning(f"Rejected admin request to {request.url.path} from {request.client.host if request.client else 'unknown'}")
+        raise HTTPException(
+            status_code=HTTP_401_UNAUTHORIZED,
+            detail=f"Missing or invalid {ADMIN_KEY_HEADER} header"
+        )
@@ -3,22 +3,41 @@
 import time
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from src.types.fhir_types import (
-    ValidationRequest, ValidationResponse, ValidationResult,
-    ServerInfo, HealthStatus, FHIRResource, ValidationStatus
+    ValidationRequest, ValidationResponse, ValidationResult, ValidationProfile,
+    ServerInfo, HealthStatus, FHIRResource, ValidationStatus,
+    TranslationResult, TranslationMatch, BatchTranslationRequest,
+    BatchTranslationResponse, DeltaValidationRequest, PartialValidationRequest, MemoryReport
 )
 from src.utils.fhir_validator import fhir_validator
+from src.utils.bundle_validator import bundle_validator
+from src.utils.delta_validator import delta_validator
+from src.utils.partial_validator import partial_validator, PartialPathError
+from src.utils.validation_metrics import validation_metrics
+from src.utils.slow_validation_log import slow_validation_log
+from src.utils.memory_report import memory_reporter
+from src.lib.json_patch import JSONPatchError
+from src.lib.json_guard import JSONLimitError
+from src.lib.json_stream import JSONStreamError
 from src.lib.resource_loader import resource_loader
+from src.lib.stage_timer import StageTimer
+from src.lib.tracing import tracer
+from src.lib.validation_profiler import validation_profiler
+from src.lib.concept_map_translator import concept_map_translator, is_mapped
 from src.ui.web_endpoints import FHIRResourceBrowser
+from src.ui.admin_auth import require_admin
 from src.constants.fhir_constants import (
     SERVER_NAME, SERVER_VERSION, SERVER_DESCRIPTION,
     HTTP_400_BAD_REQUEST, HTTP_422_UNPROCESSABLE_ENTITY,
-    HTTP_500_INTERNAL_SERVER_ERROR, CONTENT_TYPE_FHIR_JSON
+    HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR, CONTENT_TYPE_FHIR_JSON,
+    MAX_TRANSLATE_BATCH_SIZE, MAX_STREAM_BODY_BYTES, HTTP_413_REQUEST_ENTITY_TOO_LARGE
 )
 
 logger = logging.getLogger(__name__)
@@ -34,6 +53,7 @@ router = APIRouter()
     tags=["Standard FHIR Validation"]
 )
 async def validate_fhir_resource(
+    http_request: Request,
     request: ValidationRequest = Body(
         ...,
         examples={
@@ -67,6 +87,8 @@ async def validate_fhir_resource(
     """Validate a FHIR resource.
     
     Args:
+        http_request: HTTP request (checked for the admin key when a
+            profile is requested)
         request: Validation request containing the resource and options
         
     Returns:
@@ -79,46 +101,53 @@ async def validate_fhir_resource(
     Raises:
         HTTPException: If validation fails due to server error
     """
-    start_time = time.time()
+    if request.include_profile:
+        require_admin(http_request)
+    
+    start_time = time.perf_counter_ns()
+    timer = StageTimer()
     
     try:
         # Validate the resource (STANDARD FHIR ONLY - no PH-Core)
-        validation_result = fhir_validator.validate_resource(
+        validation_result, profile = _run_validation(
+            request,
+            fhir_validator.validate_resource,
             resource=request.resource,
             profile_url=request.profile,
             validate_code_systems=request.validate_code_systems,
             validate_value_sets=request.validate_value_sets,
             use_ph_core=False,  # STANDARD FHIR ONLY
-            strict_ph_core=False
+            strict_ph_core=False,
+            detect_duplicates=request.detect_duplicates,
+            max_issues=request.max_issues,
+            aggregate_issues=request.aggregate_issues,
+            timer=timer
         )
         
-        processing_time = int((time.time() - start_time) * 1000)
+        duration_ns = time.perf_counter_ns() - start_time
+        processing_time = duration_ns // 1_000_000
+        _record_validation("validate", validation_result, duration_ns, timer, request.resource,
+                           profiled=request.include_profile)
         
         response_data = ValidationResponse(
             validation_result=validation_result,
             processed_at=datetime.now().isoformat(),
-            processing_time_ms=processing_time
+            processing_time_ms=processing_time,
+            validation_token=_issue_validation_token(request, validation_result, use_ph_core=False),
+            stage_timings_ns=timer.durations_ns if request.include_timings else None,
+            profile=profile
         )
         
         # Return appropriate HTTP status code based on validation result
         if not validation_result.valid:
             # Validation failed - return 400 Bad Request
-            return JSONResponse(
-                status_code=400,
-                content=response_data.model_dump()
-            )
+            return _json_response(400, response_data)
         elif validation_result.status == ValidationStatus.WARNING:
             # Validation passed with warnings - return 422 Unprocessable Entity
-            return JSONResponse(
-                status_code=422,
-                content=response_data.model_dump()
-            )
+            return _json_response(422, response_data)
         else:
             # Validation successful - return 200 OK
-            return JSONResponse(
-                status_code=200,
-                content=response_data.model_dump()
-            )
+            return _json_response(200, response_data)
         
     except Exception as e:
         logger.error(f"Error validating resource: {e}")
@@ -135,6 +164,7 @@ async def validate_fhir_resource(
     tags=["PH-Core Validation"]
 )
 async def validate_ph_core_fhir_resource(
+    http_request: Request,
     request: ValidationRequest = Body(
         ...,
         examples={
@@ -180,6 +210,8 @@ async def validate_ph_core_fhir_resource(
     Resources that do not meet PH-Core requirements will FAIL validation.
     
     Args:
+        http_request: HTTP request (checked for the admin key when a
+            profile is requested)
         request: Validation request containing the resource
         
     Returns:
@@ -192,46 +224,53 @@ async def validate_ph_core_fhir_resource(
     Raises:
         HTTPException: If validation fails due to server error
     """
-    start_time = time.time()
+    if request.include_profile:
+        require_admin(http_request)
+    
+    start_time = time.perf_counter_ns()
+    timer = StageTimer()
     
     try:
         # STRICT PH-Core validation - MUST comply with PH-Core IG
-        validation_result = fhir_validator.validate_resource(
+        validation_result, profile = _run_validation(
+            request,
+            fhir_validator.validate_resource,
             resource=request.resource,
             profile_url=request.profile,
             validate_code_systems=request.validate_code_systems,
             validate_value_sets=request.validate_value_sets,
             use_ph_core=True,  # PH-CORE REQUIRED
-            strict_ph_core=True  # STRICT MODE - FAILURES ARE ERRORS
+            strict_ph_core=True,  # STRICT MODE - FAILURES ARE ERRORS
+            detect_duplicates=request.detect_duplicates,
+            max_issues=request.max_issues,
+            aggregate_issues=request.aggregate_issues,
+            timer=timer
         )
         
-        processing_time = int((time.time() - start_time) * 1000)
+        duration_ns = time.perf_counter_ns() - start_time
+        processing_time = duration_ns // 1_000_000
+        _record_validation("validate/ph-core", validation_result, duration_ns, timer, request.resource,
+                           profiled=request.include_profile)
         
         response_data = ValidationResponse(
             validation_result=validation_result,
             processed_at=datetime.now().isoformat(),
-            processing_time_ms=processing_time
+            processing_time_ms=processing_time,
+            validation_token=_issue_validation_token(request, validation_result, use_ph_core=True),
+            stage_timings_ns=timer.durations_ns if request.include_timings else None,
+            profile=profile
         )
         
         # Return appropriate HTTP status code based on validation result
         if not validation_result.valid:
             # Validation failed - return 400 Bad Request
-            return JSONResponse(
-                status_code=400,
-                content=response_data.model_dump()
-            )
+            return _json_response(400, response_data)
         elif validation_result.status == ValidationStatus.WARNING:
             # Validation passed with warnings - return 422 Unprocessable Entity
-            return JSONResponse(
-                status_code=422,
-                content=response_data.model_dump()
-            )
+            return _json_response(422, response_data)
         else:
             # Validation successful - return 200 OK
-            return JSONResponse(
-                status_code=200,
-                content=response_data.model_dump()
-            )
+            return _json_response(200, response_data)
         
     except Exception as e:
         logger.error(f"Error validating PH-Core resource: {e}")
@@ -241,6 +280,203 @@ async def validate_ph_core_fhir_resource(
         )
 
 
+def _json_response(status_code: int, content: Union[BaseModel, List[BaseModel]]) -> JSONResponse:
+    """Serialize a response model (or a list of them), traced as 'serialize_response'."""
+    with tracer.span("serialize_response"):
+        if isinstance(content, list):
+            return JSONResponse(status_code=status_code, content=[item.model_dump() for item in content])
+        return JSONResponse(status_code=status_code, content=content.model_dump())
+
+
+def _run_validation(
+    request: ValidationRequest,
+    validate: Callable[..., ValidationResult],
+    **options: Any
+) -> Tuple[ValidationResult, Optional[ValidationProfile]]:
+    """Run a validation, under the profiler if the (admin) client asked for a profile."""
+    if not request.include_profile:
+        return validate(**options), None
+    logger.info(f"Profiling validation of {request.resource.get('resourceType')} resource")
+    return validation_profiler.profile(validate, **options)
+
+
+def _record_validation(
+    endpoint: str,
+    result: ValidationResult,
+    duration_ns: int,
+    timer: Optional[StageTimer] = None,
+    resource: Any = None,
+    profiled: bool = False
+) -> None:
+    """Record a validation in the metrics and, if it was slow, in the slow validation log.
+
+    Profiled validations are not logged as slow, as the profiler inflates their duration.
+    """
+    validation_metrics.observe_validation(endpoint, result, duration_ns, timer)
+    if not profiled:
+        slow_validation_log.record(endpoint, result, duration_ns, timer, resource)
+
+
+def _issue_validation_token(
+    request: ValidationRequest,
+    validation_result: ValidationResult,
+    use_ph_core: bool
+) -> Optional[str]:
+    """Retain a validated resource for delta validation if the client asked for a token."""
+    if not request.issue_validation_token or not isinstance(request.resource, dict):
+        return None
+    options = {
+        "profile_url": request.profile,
+        "validate_code_systems": request.validate_code_systems,
+        "validate_value_sets": request.validate_value_sets,
+        "use_ph_core": use_ph_core,
+        "strict_ph_core": use_ph_core,
+        "detect_duplicates": request.detect_duplicates,
+        "max_issues": request.max_issues,
+        "aggregate_issues": request.aggregate_issues,
+    }
+    return delta_validator.issue_token(request.resource, options, validation_result)
+
+
+@router.post(
+    "/validate/delta",
+    summary="Validate a JSON Patch Against a Validated Resource",
+    description="Apply a JSON Patch to a previously validated resource and re-validate only the elements it touches",
+    tags=["Delta Validation"]
+)
+async def validate_delta(request: DeltaValidationRequest):
+    """Validate an incremental update of a previously validated resource.
+    
+    The resource must have been validated with issue_validation_token set;
+    it is validated again with the same options. The response carries a
+    new token for the patched version (unless it is too large to retain),
+    so updates can be chained.
+    
+    Args:
+        request: Validation token of the prior version and a JSON Patch
+        
+    Returns:
+        Validation response with the same HTTP status codes as /validate
+        
+    Raises:
+        HTTPException: 404 if the token is unknown or expired, 400 if the
+            patch cannot be applied, 500 on server error
+    """
+    start_time = time.perf_counter_ns()
+    
+    try:
+        delta = delta_validator.validate_patch(request.validation_token, request.patch)
+        if delta is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail="Unknown or expired validation token; validate the full resource again"
+            )
+        validation_result, validation_token = delta
+        
+        duration_ns = time.perf_counter_ns() - start_time
+        processing_time = duration_ns // 1_000_000
+        _record_validation("validate/delta", validation_result, duration_ns)
+        
+        response_data = ValidationResponse(
+            validation_result=validation_result,
+            processed_at=datetime.now().isoformat(),
+            processing_time_ms=processing_time,
+            validation_token=validation_token
+        )
+        
+        if not validation_result.valid:
+            status_code = 400
+        elif validation_result.status == ValidationStatus.WARNING:
+            status_code = 422
+        else:
+            status_code = 200
+        
+        return _json_response(status_code, response_data)
+        
+    except HTTPException:
+        raise
+    except JSONPatchError as e:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON Patch: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Error during delta validation: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error during validation: {str(e)}"
+        )
+
+
+@router.post(
+    "/validate/partial",
+    summary="Validate Selected Elements of a Resource",
+    description="Validate only the schema, profile and terminology rules of the given element paths of a resource fragment",
+    tags=["Partial Validation"]
+)
+async def validate_partial(request: PartialValidationRequest):
+    """Validate selected element paths of a resource fragment.
+    
+    Paths start with the resource type and name JSON elements, optionally
+    with an array index (e.g. 'Patient.birthDate', 'Patient.address[0]').
+    Choice elements are selected by their typed name ('Patient.deceasedBoolean',
+    not 'Patient.deceased' or 'Patient.deceased[x]').
+    Only the rules of the selected elements and their descendants run;
+    resource-level rules and other elements are not checked.
+    
+    Args:
+        request: Resource fragment, element paths and validation options
+        
+    Returns:
+        Validation response with the same HTTP status codes as /validate
+        
+    Raises:
+        HTTPException: 400 if a path is invalid or absent from the fragment,
+            500 on server error
+    """
+    start_time = time.perf_counter_ns()
+    
+    try:
+        validation_result = partial_validator.validate(
+            request.resource,
+            request.paths,
+            profile_url=request.profile,
+            validate_code_systems=request.validate_code_systems,
+            use_ph_core=request.use_ph_core
+        )
+        
+        duration_ns = time.perf_counter_ns() - start_time
+        processing_time = duration_ns // 1_000_000
+        _record_validation("validate/partial", validation_result, duration_ns, resource=request.resource)
+        
+        response_data = ValidationResponse(
+            validation_result=validation_result,
+            processed_at=datetime.now().isoformat(),
+            processing_time_ms=processing_time
+        )
+        
+        if not validation_result.valid:
+            status_code = 400
+        elif validation_result.status == ValidationStatus.WARNING:
+            status_code = 422
+        else:
+            status_code = 200
+        
+        return _json_response(status_code, response_data)
+        
+    except PartialPathError as e:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Invalid element path: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Error during partial validation: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error during validation: {str(e)}"
+        )
+
+
 @router.post(
     "/validate/batch",
     summary="Validate Multiple FHIR Resources (Standard FHIR Only)",
@@ -280,12 +516,18 @@ async def validate_batch_resources(
                 ]
             }
         }
+    ),
+    detect_duplicates: bool = Query(
+        False,
+        description="Flag resources that duplicate an earlier one or reuse its PhilHealth/PhilSys/NHFR identifier"
     )
 ):
     """Validate multiple FHIR resources.
     
     Args:
         resources: List of validation requests
+        detect_duplicates: Whether to flag duplicates and identifier collisions
+            across the whole batch
         
     Returns:
         List of validation responses with appropriate HTTP status code:
@@ -307,10 +549,12 @@ async def validate_batch_resources(
     successful_count = 0
     failed_count = 0
     warning_count = 0
+    submission = bundle_validator.submission_index() if detect_duplicates else None
     
     for i, request in enumerate(resources):
         try:
-            start_time = time.time()
+            start_time = time.perf_counter_ns()
+            timer = StageTimer()
             
             validation_result = fhir_validator.validate_resource(
                 resource=request.resource,
@@ -318,15 +562,31 @@ async def validate_batch_resources(
                 validate_code_systems=request.validate_code_systems,
                 validate_value_sets=request.validate_value_sets,
                 use_ph_core=False,  # Batch validation is standard FHIR only
-                strict_ph_core=False
+                strict_ph_core=False,
+                detect_duplicates=request.detect_duplicates,
+                max_issues=request.max_issues,
+                aggregate_issues=request.aggregate_issues,
+                timer=timer
             )
             
-            processing_time = int((time.time() - start_time) * 1000)
+            # Cross-batch duplicate and identifier collision detection
+            if submission is not None:
+                duplicate_issues = submission.add(request.resource, f"resources[{i}]")
+                if duplicate_issues:
+                    validation_result = fhir_validator.build_result(
+                        validation_result.issues + duplicate_issues,
+                        validation_result.resource_type
+                    )
+            
+            duration_ns = time.perf_counter_ns() - start_time
+            processing_time = duration_ns // 1_000_000
+            _record_validation("validate/batch", validation_result, duration_ns, timer, request.resource)
             
             response = ValidationResponse(
                 validation_result=validation_result,
                 processed_at=datetime.now().isoformat(),
-                processing_time_ms=processing_time
+                processing_time_ms=processing_time,
+                stage_timings_ns=timer.durations_ns if request.include_timings else None
             )
             results.append(response)
             
@@ -366,10 +626,109 @@ async def validate_batch_resources(
         # Mixed results - use 207 Multi-Status
         status_code = 207
     
-    return JSONResponse(
-        status_code=status_code,
-        content=[result.model_dump() for result in results]
-    )
+    return _json_response(status_code, results)
+
+
+@router.post(
+    "/validate/bundle/stream",
+    summary="Validate a Large Bundle (Streaming)",
+    description="Validate a FHIR Bundle sent as the raw request body, entry by entry while it is being received",
+    tags=["Bundle Validation"]
+)
+async def validate_bundle_stream(
+    request: Request,
+    validate_code_systems: bool = Query(True, description="Whether to validate coding systems"),
+    validate_value_sets: bool = Query(True, description="Whether to validate value sets"),
+    use_ph_core: bool = Query(True, description="Whether to use PH-Core validation for entry resources"),
+    strict_ph_core: bool = Query(True, description="Whether to enforce strict PH-Core compliance"),
+    detect_duplicates: bool = Query(False, description="Whether to flag duplicate entries and identifier collisions"),
+    max_issues: Optional[int] = Query(None, ge=1, description="Stop validating once this many issues were found"),
+    aggregate_issues: bool = Query(False, description="Report issues repeated across array indexes once, with a count")
+):
+    """Validate a Bundle without materializing it.
+    
+    The body is the Bundle JSON itself (not wrapped in a ValidationRequest).
+    Each entry is validated as soon as it has been parsed and then released,
+    so memory use is bounded by the largest entry rather than the Bundle.
+    
+    Args:
+        request: Incoming request whose body is streamed
+        validate_code_systems: Whether to validate coding systems
+        validate_value_sets: Whether to validate value sets
+        use_ph_core: Whether to use PH-Core validation
+        strict_ph_core: Whether to enforce strict PH-Core compliance
+        detect_duplicates: Whether to flag duplicate entries and identifier
+            collisions between entries
+        max_issues: Stop validating once this many issues were found
+        aggregate_issues: Whether to fold issues repeated across array indexes
+        
+    Returns:
+        Validation response with the same HTTP status codes as /validate
+        
+    Raises:
+        HTTPException: 413 if the body exceeds the stream size limit or an
+            entry exceeds the request size or array-length limit, 400 if it
+            is not valid JSON or is nested too deeply, 500 on server error
+    """
+    start_time = time.perf_counter_ns()
+    
+    try:
+        session = bundle_validator.stream_session(
+            validate_code_systems=validate_code_systems,
+            validate_value_sets=validate_value_sets,
+            use_ph_core=use_ph_core,
+            strict_ph_core=strict_ph_core,
+            detect_duplicates=detect_duplicates,
+            max_issues=max_issues,
+            aggregate_issues=aggregate_issues
+        )
+        # Parsing and entry validation are CPU-bound; keep them off the event loop
+        async for chunk in request.stream():
+            await run_in_threadpool(session.feed, chunk)
+            if session.bytes_read > MAX_STREAM_BODY_BYTES:
+                raise HTTPException(
+                    status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Request body exceeds the limit of {MAX_STREAM_BODY_BYTES} bytes"
+                )
+        validation_result = await run_in_threadpool(session.finish)
+        
+        duration_ns = time.perf_counter_ns() - start_time
+        processing_time = duration_ns // 1_000_000
+        _record_validation("validate/bundle/stream", validation_result, duration_ns)
+        
+        response_data = ValidationResponse(
+            validation_result=validation_result,
+            processed_at=datetime.now().isoformat(),
+            processing_time_ms=processing_time
+        )
+        
+        if not validation_result.valid:
+            status_code = 400
+        elif validation_result.status == ValidationStatus.WARNING:
+            status_code = 422
+        else:
+            status_code = 200
+        
+        return _json_response(status_code, response_data)
+        
+    except HTTPException:
+        raise
+    except JSONLimitError as e:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST if e.limit == "depth" else HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except JSONStreamError as e:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Invalid Bundle JSON: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"Error stream-validating Bundle: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error during validation: {str(e)}"
+        )
 
 
 @router.get(
@@ -431,6 +790,126 @@ async def get_resource_profile(resource_type: str) -> Dict[str, Any]:
         )
 
 
+@router.get(
+    "/ConceptMap/$translate",
+    response_model=TranslationResult,
+    summary="Translate Code",
+    description="Translate a code from one code system to another using the loaded FHIR ConceptMaps",
+    tags=["Terminology"]
+)
+async def translate_code(
+    system: str = Query(..., description="Source code system URI"),
+    code: str = Query(..., description="Source code"),
+    target_system: Optional[str] = Query(None, description="Restrict matches to this target code system"),
+    url: Optional[str] = Query(None, description="Restrict matches to this ConceptMap canonical URL")
+) -> TranslationResult:
+    """Translate a single code.
+    
+    Args:
+        system: Source code system URI
+        code: Source code
+        target_system: Optional target code system URI
+        url: Optional ConceptMap canonical URL
+        
+    Returns:
+        Translation result with all matching target codings
+        
+    Raises:
+        HTTPException: If the requested ConceptMap is not loaded
+    """
+    if url and not concept_map_translator.has_concept_map(url):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f"ConceptMap not found: {url}"
+        )
+    
+    try:
+        matches = concept_map_translator.translate(system, code, target_system, url)
+        return _build_translation_result(system, code, matches)
+    except Exception as e:
+        logger.error(f"Error translating {system}|{code}: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error translating code"
+        )
+
+
+@router.post(
+    "/ConceptMap/$translate/batch",
+    response_model=BatchTranslationResponse,
+    summary="Translate Codes (Batch)",
+    description="Translate a column of codes from the same source code system in one request",
+    tags=["Terminology"]
+)
+async def translate_code_batch(request: BatchTranslationRequest) -> BatchTranslationResponse:
+    """Translate multiple codes from the same source system.
+    
+    Args:
+        request: Batch translation request
+        
+    Returns:
+        Translation results in the same order as the input codes
+        
+    Raises:
+        HTTPException: If the batch is too large or the ConceptMap is not loaded
+    """
+    if len(request.codes) > MAX_TRANSLATE_BATCH_SIZE:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"Batch size cannot exceed {MAX_TRANSLATE_BATCH_SIZE} codes"
+        )
+    
+    if request.concept_map_url and not concept_map_translator.has_concept_map(request.concept_map_url):
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND,
+            detail=f"ConceptMap not found: {request.concept_map_url}"
+        )
+    
+    try:
+        all_matches = concept_map_translator.translate_batch(
+            request.system,
+            request.codes,
+            request.target_system,
+            request.concept_map_url
+        )
+        results = [
+            _build_translation_result(request.system, code, matches)
+            for code, matches in zip(request.codes, all_matches)
+        ]
+        
+        return BatchTranslationResponse(
+            results=results,
+            total=len(results),
+            mapped=sum(1 for result in results if result.result)
+        )
+    except Exception as e:
+        logger.error(f"Error translating batch for {request.system}: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error translating codes"
+        )
+
+
+def _build_translation_result(
+    system: str,
+    code: str,
+    matches: List[Dict[str, Any]]
+) -> TranslationResult:
+    """Build a translation result from raw index matches.
+
+    The result is only positive if a match maps the code to a target, not
+    if every match is 'unmatched' or 'disjoint'.
+    """
+    mapped = is_mapped(matches)
+    return TranslationResult(
+        result=mapped,
+        system=system,
+        code=code,
+        matches=[TranslationMatch(**match) for match in matches],
+        message=None if mapped else f"No mapping found for {system}|{code}"
+    )
+
+
 @router.get(
     "/server-info",
     response_model=ServerInfo,
@@ -450,7 +929,7 @@ async def get_server_info() -> ServerInfo:
         description=SERVER_DESCRIPTION,
         fhir_version="R4",
         supported_formats=[CONTENT_TYPE_FHIR_JSON, "application/json"],
-        supported_operations=["validate-standard", "validate-ph-core", "batch-validate", "resource-info", "fhir-base-resources", "ph-core-resources"]
+        supported_operations=["validate-standard", "validate-ph-core", "batch-validate", "validate-bundle-stream", "validate-delta", "validate-partial", "resource-info", "fhir-base-resources", "ph-core-resources", "concept-map-translate"]
     )
 
 
@@ -495,6 +974,37 @@ async def health_check() -> HealthStatus:
 resource_browser = FHIRResourceBrowser()
 
 
+@router.get(
+    "/admin/memory",
+    response_model=MemoryReport,
+    summary="Memory Usage (Admin)",
+    description="Deep memory size and object count of every loaded definition set, IG resource store, "
+                "resource browser, compiled validator and cache. Requires the X-Admin-Key header.",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)]
+)
+def get_memory_report() -> MemoryReport:
+    """Report where the server's memory goes.
+
+    Defined as a plain function so FastAPI runs the (CPU-bound) measurement
+    in its thread pool instead of blocking the event loop.
+
+    Returns:
+        Memory report
+
+    Raises:
+        HTTPException: 401/403 without admin access, 500 on server error
+    """
+    try:
+        return memory_reporter.report()
+    except Exception as e:
+        logger.error(f"Error building memory report: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error building memory report: {str(e)}"
+        )
+
+
 @router.get(
     "/resources/fhir-base",
     response_model=List[Dict[str, Any]],
@@ -2,16 +2,18 @@
 
 import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Path as PathParam
+from fastapi import APIRouter, HTTPException, Path as PathParam, Query
 from fastapi.responses import JSONResponse
 
 from src.lib.resource_loader import resource_loader
+from src.lib.concept_prefix_index import ConceptPrefixIndex
+from src.lib.system_index import SystemIndex
 from src.constants.fhir_constants import (
     HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR,
-    PROJECT_ROOT
+    PROJECT_ROOT, DEFAULT_LOOKUP_COUNT, MAX_LOOKUP_COUNT
 )
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,11 @@ class PHCoreIGServer:
     def __init__(self):
         """Initialize the IG server."""
         self._ig_resources: Dict[str, Dict[str, Any]] = {}
+        self._concept_indexes: Dict[str, ConceptPrefixIndex] = {}
+        self._system_index = SystemIndex([], [], [])
         self._load_ig_resources()
+        self._build_concept_indexes()
+        self._build_system_index()
     
     def _load_ig_resources(self) -> None:
         """Load all PH-Core IG resources into memory."""
@@ -68,6 +74,28 @@ class PHCoreIGServer:
         except Exception as e:
             logger.error(f"Error loading PH-Core IG resources: {e}")
     
+    def _build_concept_indexes(self) -> None:
+        """Build prefix indexes over the concepts of every loaded CodeSystem."""
+        for codesystem_id, codesystem in self.get_all_resources_by_type("CodeSystem").items():
+            self._concept_indexes[codesystem_id] = ConceptPrefixIndex(codesystem.get("concept", []))
+        
+        total_concepts = sum(len(index) for index in self._concept_indexes.values())
+        logger.info(f"Indexed {total_concepts} concepts from {len(self._concept_indexes)} PH-Core CodeSystems")
+    
+    def _build_system_index(self) -> None:
+        """Build the known identifier/coding system index from NamingSystems and CodeSystems."""
+        self._system_index = SystemIndex(
+            self.get_all_resources_by_type("NamingSystem").values(),
+            self.get_all_resources_by_type("CodeSystem").values(),
+            self.get_all_resources_by_type("StructureDefinition").values()
+        )
+        logger.info(f"Indexed {len(self._system_index)} known PH-Core system URIs")
+    
+    @property
+    def system_index(self) -> SystemIndex:
+        """Get the known identifier/coding system index."""
+        return self._system_index
+    
     def get_resource(self, resource_type: str, resource_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific IG resource by type and ID."""
         return self._ig_resources.get(resource_type, {}).get(resource_id)
@@ -88,6 +116,27 @@ class PHCoreIGServer:
         """Get a CodeSystem by ID."""
         return self.get_resource("CodeSystem", codesystem_id)
     
+    def lookup_concepts(
+        self,
+        codesystem_id: str,
+        prefix: str,
+        limit: int = DEFAULT_LOOKUP_COUNT
+    ) -> Optional[List[Dict[str, str]]]:
+        """Find CodeSystem concepts whose code or display starts with a prefix.
+        
+        Args:
+            codesystem_id: The CodeSystem ID
+            prefix: Code or display prefix
+            limit: Maximum number of concepts to return
+            
+        Returns:
+            Matching concepts, or None if the CodeSystem is not loaded
+        """
+        index = self._concept_indexes.get(codesystem_id)
+        if index is None:
+            return None
+        return index.search(prefix, limit)
+    
     def get_implementation_guide(self) -> Optional[Dict[str, Any]]:
         """Get the main Implementation Guide resource."""
         return self.get_resource("ImplementationGuide", "localhost.fhir.ph.core")
@@ -224,6 +273,58 @@ async def get_code_system(
         )
 
 
+@ig_router.get(
+    "/CodeSystem/{codesystem_id}/$lookup",
+    summary="Look Up PH-Core CodeSystem Concepts",
+    description="Typeahead lookup of PH-Core CodeSystem concepts by code or display prefix",
+    tags=["PH-Core IG"]
+)
+async def lookup_code_system_concepts(
+    codesystem_id: str = PathParam(..., description="CodeSystem ID"),
+    prefix: str = Query("", description="Code or display prefix (case and accent insensitive)"),
+    count: int = Query(DEFAULT_LOOKUP_COUNT, ge=1, le=MAX_LOOKUP_COUNT, description="Maximum number of concepts to return")
+) -> Dict[str, Any]:
+    """Look up PH-Core CodeSystem concepts matching a prefix.
+    
+    Args:
+        codesystem_id: The CodeSystem ID
+        prefix: Code or display prefix
+        count: Maximum number of concepts to return
+        
+    Returns:
+        The matching concepts
+        
+    Raises:
+        HTTPException: If CodeSystem not found
+    """
+    try:
+        concepts = ph_core_ig_server.lookup_concepts(codesystem_id, prefix, count)
+        if concepts is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail=f"CodeSystem '{codesystem_id}' not found in PH-Core IG"
+            )
+        
+        codesystem = ph_core_ig_server.get_code_system(codesystem_id)
+        return {
+            "codesystem": codesystem_id,
+            "url": codesystem.get("url"),
+            "content": codesystem.get("content"),
+            "prefix": prefix,
+            "total": len(concepts),
+            "concept": concepts
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error looking up concepts in CodeSystem {codesystem_id}: {e}")
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error looking up CodeSystem concepts"
+        )
+
+
 @ig_router.get(
     "/ImplementationGuide/{ig_id}",
     summary="Get PH-Core Implementation Guide",
@@ -0,0 +1,105 @@
+"""Prometheus /metrics endpoint and request latency instrumentation."""
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from starlette.routing import Mount
+
+from src.lib.metrics import PROMETHEUS_CONTENT_TYPE, metrics_registry
+from src.utils.validation_metrics import validation_metrics
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+# Create metrics router (served at the root, where Prometheus scrapes by default)
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="Request and validation latency histograms, issue counts, cache statistics, "
+                "Bundle worker load and process memory in the Prometheus text format",
+    tags=["Health"],
+    response_class=Response
+)
+async def get_metrics() -> Response:
+    """Export the server metrics.
+
+    Returns:
+        Metrics in the Prometheus text exposition format
+    """
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def route_template(scope: Message) -> Optional[str]:
+    """Get the route template of a handled request.
+
+    Args:
+        scope: ASGI scope after the application has handled the request
+
+    Returns:
+        Template such as '/api/v1/resources/{category}', or None if no
+        route matched
+    """
+    route = scope.get("route")
+    if route is None:
+        return None
+    if isinstance(route, Mount):
+        return f"{route.path}/{{path}}"
+    # Routes of included routers do not carry the router prefix, so the
+    # template is rebuilt from the request path and the matched parameters
+    segments = scope["path"].split("/")
+    end = len(segments)
+    for name, value in reversed(list((scope.get("path_params") or {}).items())):
+        for index in range(end - 1, -1, -1):
+            if segments[index] == str(value):
+                segments[index] = f"{{{name}}}"
+                end = index
+                break
+    return "/".join(segments)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records the latency of every HTTP request.
+
+    Requests are labelled with the template of the route that handled them
+    (e.g. '/api/v1/resources/{resource_type}'), not the raw path, so the
+    number of label values stays bounded.
+    """
+
+    def __init__(self, app: Callable[[Message, Receive, Send], Awaitable[None]]):
+        """Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Message, receive: Receive, send: Send) -> None:
+        """Time the request and record it once the response has been sent."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            validation_metrics.observe_request(
+                scope["method"], route_template(scope), status, time.perf_counter_ns() - start_time
+            )
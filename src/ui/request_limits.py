@@ -0,0 +1,133 @@
+"""Request body limits enforced before request bodies are parsed."""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.constants.fhir_constants import (
+    HTTP_400_BAD_REQUEST, HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    MAX_REQUEST_BODY_BYTES, MAX_STREAM_BODY_BYTES, MAX_JSON_DEPTH, MAX_JSON_ARRAY_LENGTH
+)
+from src.lib.json_guard import JSONLimitError, check_json_limits
+
+logger = logging.getLogger(__name__)
+
+# Bodies this small are scanned on the event loop; larger ones in a worker thread
+_INLINE_SCAN_BYTES = 64 * 1024
+
+# Endpoints that read their body as a stream and apply the structural limits themselves
+STREAMING_PATHS = ("/api/v1/validate/bundle/stream",)
+
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class RequestLimitsMiddleware:
+    """ASGI middleware that bounds request body size and JSON structure.
+
+    The body is read with a byte limit (a Content-Length over the limit is
+    rejected before anything is read), then checked for nesting depth and
+    array length before FastAPI decodes it and builds the request model.
+    Exceeding the byte or array-length limit gives 413, excessive nesting
+    400. Streaming endpoints are not buffered; they get the larger stream
+    byte limit here (from Content-Length, and enforced by the endpoint),
+    and check depth and array length on each entry as it is parsed.
+    """
+
+    def __init__(
+        self,
+        app: Callable[[Message, Receive, Send], Awaitable[None]],
+        max_body_bytes: int = MAX_REQUEST_BODY_BYTES,
+        max_stream_body_bytes: int = MAX_STREAM_BODY_BYTES,
+        max_depth: Optional[int] = MAX_JSON_DEPTH,
+        max_array_length: Optional[int] = MAX_JSON_ARRAY_LENGTH,
+        streaming_paths: Sequence[str] = STREAMING_PATHS
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            max_body_bytes: Maximum size of a buffered request body
+            max_stream_body_bytes: Maximum size of a streamed request body
+            max_depth: Maximum JSON nesting depth (None for no limit)
+            max_array_length: Maximum number of items in a JSON array (None for no limit)
+            streaming_paths: Paths whose bodies are streamed, not buffered
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.max_stream_body_bytes = max_stream_body_bytes
+        self.max_depth = max_depth
+        self.max_array_length = max_array_length
+        self.streaming_paths = tuple(streaming_paths)
+
+    async def __call__(self, scope: Message, receive: Receive, send: Send) -> None:
+        """Check the request body, then pass the request on."""
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        streaming = scope["path"] in self.streaming_paths
+        max_bytes = self.max_stream_body_bytes if streaming else self.max_body_bytes
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await self._reject(scope, receive, send, JSONLimitError(
+                "bytes", f"Request body of {int(content_length)} bytes exceeds the limit of {max_bytes} bytes"
+            ))
+            return
+        if streaming:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the body up to the limit, then replay it to the application
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away; there is no one to respond to
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_bytes:
+                await self._reject(scope, receive, send, JSONLimitError(
+                    "bytes", f"Request body exceeds the limit of {max_bytes} bytes"
+                ))
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        content_type = headers.get(b"content-type", b"").lower()
+        if b"json" in content_type or not content_type:
+            try:
+                if len(body) <= _INLINE_SCAN_BYTES:
+                    check_json_limits(body, self.max_depth, self.max_array_length)
+                else:
+                    await run_in_threadpool(check_json_limits, body, self.max_depth, self.max_array_length)
+            except JSONLimitError as e:
+                await self._reject(scope, receive, send, e)
+                return
+
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+    @staticmethod
+    async def _reject(scope: Message, receive: Receive, send: Send, error: JSONLimitError) -> None:
+        """Send the error response for an exceeded limit."""
+        status_code = HTTP_400_BAD_REQUEST if error.limit == "depth" else HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        logger.warning(f"Rejected {scope['method']} {scope['path']}: {error}")
+        response = JSONResponse(status_code=status_code, content={"detail": str(error)})
+        await response(scope, receive, send)
@@ -0,0 +1,64 @@
+"""Request tracing middleware."""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from src.lib.tracing import SPAN_KIND_SERVER, parse_traceparent, tracer
+from src.ui.metrics_endpoints import route_template
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+TRACEPARENT_HEADER = b"traceparent"
+
+
+class TracingMiddleware:
+    """ASGI middleware that records every HTTP request as a server span.
+
+    The span continues the trace of an incoming W3C traceparent header, so
+    the validation, stage, resource loading and serialization spans recorded
+    while handling the request appear under the caller's (e.g. the API
+    gateway's) span. Requests are named by route template, e.g.
+    'POST /api/v1/validate'. Nothing is recorded while tracing is disabled.
+    """
+
+    def __init__(self, app: Callable[[Message, Receive, Send], Awaitable[None]]):
+        """Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Message, receive: Receive, send: Send) -> None:
+        """Handle the request inside a server span."""
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == TRACEPARENT_HEADER:
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        with tracer.span(
+            method, {"http.request.method": method}, SPAN_KIND_SERVER, parse_traceparent(traceparent)
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                if route is not None:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,607 @@
+"""Bundle-aware validation: per-entry validation and intra-bundle reference resolution."""
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.constants.fhir_constants import (
+    BUNDLE_PARALLEL_MIN_ENTRIES, BUNDLE_VALIDATION_MAX_WORKERS, MAX_JSON_ARRAY_LENGTH, MAX_JSON_DEPTH,
+    MAX_REQUEST_BODY_BYTES
+)
+from src.lib.issue_collector import IssueCollector
+from src.lib.json_stream import StreamingObjectParser
+from src.lib.json_walker import JSONWalker
+from src.lib.submission_index import SubmissionIndex
+from src.lib.tracing import tracer
+from src.types.fhir_types import ValidationIssue, ValidationResult, ValidationSeverity, ValidationStatus
+from src.ui.ig_endpoints import ph_core_ig_server
+
+logger = logging.getLogger(__name__)
+
+# Relative literal reference: Type/id, optionally versioned (Type/id/_history/vid)
+RELATIVE_REFERENCE_PATTERN = re.compile(
+    r"^([A-Z][A-Za-z]+)/([A-Za-z0-9\-\.]{1,64})(/_history/[A-Za-z0-9\-\.]{1,64})?$"
+)
+
+# Bundle types whose references are expected to resolve inside the Bundle
+SELF_CONTAINED_BUNDLE_TYPES = ("document", "message", "collection")
+
+# Keys whose values are resources with their own reference scope
+_REFERENCE_SCOPE_BOUNDARIES = frozenset(["contained", "resource"])
+
+
+def entry_location(index: int, location: Optional[str] = None) -> str:
+    """Build the location of an issue inside a Bundle entry's resource.
+
+    Args:
+        index: Entry index
+        location: Location of the issue within the entry resource
+
+    Returns:
+        Location relative to the Bundle root
+    """
+    prefix = f"entry[{index}].resource"
+    return f"{prefix}.{location}" if location else prefix
+
+
+class BundleReferenceIndex:
+    """Resolves references against the entries of a Bundle in O(1).
+
+    Entries are indexed by their fullUrl and by 'Type/id'. A relative
+    reference inside an entry whose fullUrl is a RESTful URL is also
+    resolved against that entry's base URL, as the FHIR spec requires.
+    """
+
+    def __init__(self, entries: Optional[List[Any]] = None):
+        """Index Bundle entries.
+
+        Args:
+            entries: Bundle.entry list (entries can also be added one by one)
+        """
+        self.by_full_url: Dict[str, int] = {}
+        self.by_type_id: Dict[str, int] = {}
+        self.duplicate_full_urls: List[Tuple[int, str]] = []
+
+        for index, entry in enumerate(entries or []):
+            self.add(index, entry)
+
+    def add(self, index: int, entry: Any) -> None:
+        """Index one Bundle entry.
+
+        Args:
+            index: Entry index
+            entry: Bundle.entry element
+        """
+        if not isinstance(entry, dict):
+            return
+        full_url = entry.get("fullUrl")
+        if isinstance(full_url, str) and full_url:
+            if full_url in self.by_full_url:
+                self.duplicate_full_urls.append((index, full_url))
+            else:
+                self.by_full_url[full_url] = index
+
+        resource = entry.get("resource")
+        if isinstance(resource, dict):
+            resource_type = resource.get("resourceType")
+            resource_id = resource.get("id")
+            if isinstance(resource_type, str) and isinstance(resource_id, str):
+                self.by_type_id.setdefault(f"{resource_type}/{resource_id}", index)
+
+    def __len__(self) -> int:
+        """Number of indexed entries."""
+        return len(self.by_full_url)
+
+    def resolve(self, reference: str, base_url: Optional[str] = None) -> Optional[int]:
+        """Resolve a literal reference to an entry index.
+
+        Args:
+            reference: Reference.reference value
+            base_url: RESTful base of the referring entry's fullUrl, if any
+
+        Returns:
+            Index of the referenced entry, or None if it is not in the Bundle
+        """
+        index = self.by_full_url.get(reference)
+        if index is not None:
+            return index
+
+        match = RELATIVE_REFERENCE_PATTERN.match(reference)
+        if not match:
+            return None
+        if base_url:
+            index = self.by_full_url.get(f"{base_url}{match.group(1)}/{match.group(2)}")
+            if index is not None:
+                return index
+        return self.by_type_id.get(f"{match.group(1)}/{match.group(2)}")
+
+
+def entry_envelope(entry: Any) -> Any:
+    """Get a Bundle entry without its resource (fullUrl, request, response, search)."""
+    if not isinstance(entry, dict):
+        return entry
+    return {key: value for key, value in entry.items() if key != "resource"}
+
+
+def _restful_base(full_url: Any) -> Optional[str]:
+    """Get the service base of a RESTful fullUrl (http[s]://base/Type/id)."""
+    if not isinstance(full_url, str) or not full_url.startswith(("http://", "https://")):
+        return None
+    parts = full_url.rsplit("/", 2)
+    if len(parts) != 3 or not RELATIVE_REFERENCE_PATTERN.match(f"{parts[1]}/{parts[2]}"):
+        return None
+    return parts[0] + "/"
+
+
+def collect_references(resource: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Collect every literal reference in a resource.
+
+    Args:
+        resource: FHIR resource
+
+    Returns:
+        List of (location, reference) pairs, location relative to the resource
+    """
+    references = []
+    # Contained resources and nested Bundle entries are checked on their own
+    walker = JSONWalker(resource, skip_keys=_REFERENCE_SCOPE_BOUNDARIES)
+    for value in walker:
+        if isinstance(value, dict):
+            reference = value.get("reference")
+            if isinstance(reference, str):
+                references.append((walker.child_path("reference"), reference))
+    references.sort(key=lambda pair: pair[0])
+    return references
+
+
+class BundleValidator:
+    """Validates each entry of a Bundle and the references between entries."""
+
+    def __init__(self, max_workers: int = BUNDLE_VALIDATION_MAX_WORKERS):
+        """Initialize the Bundle validator.
+
+        Args:
+            max_workers: Maximum number of entries validated concurrently
+        """
+        self.max_workers = max_workers
+        # Entries of validate_entries() calls waiting for a worker and being validated
+        self.pending_entries = 0
+        self.active_entries = 0
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def has_entry_resources(bundle: Dict[str, Any]) -> bool:
+        """Check if a Bundle carries any entry resources."""
+        entries = bundle.get("entry")
+        return isinstance(entries, list) and any(
+            isinstance(entry, dict) and "resource" in entry
+            for entry in entries
+        )
+
+    @staticmethod
+    def without_entry_resources(bundle: Dict[str, Any]) -> Dict[str, Any]:
+        """Get a shallow copy of a Bundle with entry resources removed.
+
+        Bundle-level checks run on this copy so that entry resources, which
+        are validated on their own, are not checked twice.
+        """
+        shell = dict(bundle)
+        shell["entry"] = [entry_envelope(entry) for entry in bundle.get("entry", [])]
+        return shell
+
+    @staticmethod
+    def validate_entry_resource(resource: Dict[str, Any], options: Dict[str, Any]) -> ValidationResult:
+        """Validate one entry resource with the validator for its resource type.
+
+        Args:
+            resource: Entry resource
+            options: validate_resource keyword options
+
+        Returns:
+            Validation result of the entry resource
+        """
+        # Import here to avoid circular imports
+        from src.utils.fhir_validator import fhir_validator
+
+        try:
+            return fhir_validator.validate_resource(resource, **options)
+        except Exception as e:
+            # One malformed entry must not abort the rest of the Bundle
+            logger.error(f"Unexpected error validating Bundle entry resource: {e}")
+            return ValidationResult(
+                status=ValidationStatus.FAILED,
+                message=f"Validation error: {str(e)}",
+                issues=[ValidationIssue(
+                    severity=ValidationSeverity.FATAL,
+                    code="validation-exception",
+                    details=str(e)
+                )],
+                valid=False
+            )
+
+    @staticmethod
+    def invalid_entry_resource_issues(index: int, entry: Any) -> List[ValidationIssue]:
+        """Report an entry resource that is present but not a JSON object.
+
+        Entry resources are removed from the Bundle before its own checks, so
+        a string, number or array resource is reported here instead.
+        """
+        if not isinstance(entry, dict) or "resource" not in entry or isinstance(entry["resource"], dict):
+            return []
+        return [ValidationIssue(
+            severity=ValidationSeverity.ERROR,
+            code="invalid-format",
+            details=f"Bundle entry resource must be a JSON object, got {type(entry['resource']).__name__}",
+            location=entry_location(index)
+        )]
+
+    @staticmethod
+    def entry_issues(index: int, result: ValidationResult) -> List[ValidationIssue]:
+        """Relocate an entry resource's issues relative to the Bundle root."""
+        return [
+            issue.model_copy(update={"location": entry_location(index, issue.location)})
+            for issue in result.issues
+        ]
+
+    @staticmethod
+    def submission_index() -> SubmissionIndex:
+        """Create an empty duplicate/identifier-collision index."""
+        return SubmissionIndex(ph_core_ig_server.system_index)
+
+    @staticmethod
+    def duplicate_issues(
+        submission: SubmissionIndex, index: int, resource: Dict[str, Any]
+    ) -> List[ValidationIssue]:
+        """Index an entry resource and report duplicates of earlier entries."""
+        return [
+            issue.model_copy(update={"location": entry_location(index, issue.location)})
+            for issue in submission.add(resource, f"entry[{index}]")
+        ]
+
+    @staticmethod
+    def collect_entry_references(
+        index: int,
+        entry: Dict[str, Any],
+        pending: List[Tuple[int, str, str, Optional[str]]]
+    ) -> List[ValidationIssue]:
+        """Check an entry's contained references and queue the others for resolution.
+
+        Args:
+            index: Entry index
+            entry: Bundle.entry element with a resource
+            pending: Receives (entry index, location, reference, base URL) tuples
+
+        Returns:
+            Issues for '#id' references with no matching contained resource
+        """
+        issues = []
+        resource = entry["resource"]
+        base_url = _restful_base(entry.get("fullUrl"))
+        contained = resource.get("contained")
+        contained_ids = {
+            item.get("id") for item in contained if isinstance(item, dict)
+        } if isinstance(contained, list) else set()
+
+        for location, reference in collect_references(resource):
+            if not reference.startswith("#"):
+                pending.append((index, location, reference, base_url))
+            elif reference != "#" and reference[1:] not in contained_ids:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.ERROR,
+                    code="unresolved-contained-reference",
+                    details=f"Reference '{reference}' does not match any contained resource",
+                    location=entry_location(index, location)
+                ))
+        return issues
+
+    @staticmethod
+    def resolve_references(
+        bundle_type: Any,
+        pending: List[Tuple[int, str, str, Optional[str]]],
+        index: BundleReferenceIndex
+    ) -> List[ValidationIssue]:
+        """Resolve queued references against the Bundle's reference index.
+
+        urn:uuid/urn:oid references must resolve within the Bundle. Relative
+        references that do not resolve may still point at a server resource,
+        so they are only a warning in self-contained Bundle types.
+
+        Args:
+            bundle_type: Bundle.type
+            pending: (entry index, location, reference, base URL) tuples
+            index: Reference index over all entries
+
+        Returns:
+            List of validation issues
+        """
+        issues = []
+        for i, full_url in index.duplicate_full_urls:
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="duplicate-bundle-fullurl",
+                details=f"fullUrl '{full_url}' is used by more than one entry",
+                location=f"entry[{i}].fullUrl"
+            ))
+
+        self_contained = bundle_type in SELF_CONTAINED_BUNDLE_TYPES
+        for i, location, reference, base_url in pending:
+            if index.resolve(reference, base_url) is not None:
+                continue
+
+            if reference.startswith("urn:"):
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.ERROR,
+                    code="unresolved-bundle-reference",
+                    details=f"Reference '{reference}' does not match the fullUrl of any Bundle entry",
+                    location=entry_location(i, location)
+                ))
+            elif RELATIVE_REFERENCE_PATTERN.match(reference):
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING if self_contained else ValidationSeverity.INFORMATION,
+                    code="reference-not-in-bundle",
+                    details=f"Reference '{reference}' does not resolve to an entry in this Bundle",
+                    location=entry_location(i, location)
+                ))
+
+        return issues
+
+    def validate_entries(
+        self,
+        bundle: Dict[str, Any],
+        validate_code_systems: bool = True,
+        validate_value_sets: bool = True,
+        use_ph_core: bool = True,
+        strict_ph_core: bool = True,
+        detect_duplicates: bool = False,
+        max_issues: Optional[int] = None
+    ) -> List[ValidationIssue]:
+        """Validate every entry resource and every intra-bundle reference.
+
+        Args:
+            bundle: Bundle resource
+            validate_code_systems: Whether to validate coding systems
+            validate_value_sets: Whether to validate value sets
+            use_ph_core: Whether to use PH-Core validation for entry resources
+            strict_ph_core: Whether to enforce strict PH-Core compliance
+            detect_duplicates: Whether to flag duplicate entries and identifier
+                collisions between entries
+            max_issues: Stop validating each entry resource once this many
+                issues were found (None for no limit)
+
+        Returns:
+            List of validation issues, located relative to the Bundle root
+        """
+        entries = bundle.get("entry")
+        if not isinstance(entries, list):
+            return []
+
+        options = {
+            "validate_code_systems": validate_code_systems,
+            "validate_value_sets": validate_value_sets,
+            "use_ph_core": use_ph_core,
+            "strict_ph_core": strict_ph_core,
+            "detect_duplicates": detect_duplicates,
+            "max_issues": max_issues,
+        }
+        index = BundleReferenceIndex(entries)
+        resources = [
+            (i, entry["resource"]) for i, entry in enumerate(entries)
+            if isinstance(entry, dict) and isinstance(entry.get("resource"), dict)
+        ]
+
+        started = 0
+
+        def validate_entry(item: Tuple[int, Dict[str, Any]]) -> ValidationResult:
+            nonlocal started
+            with self._load_lock:
+                started += 1
+                self.pending_entries -= 1
+                self.active_entries += 1
+            try:
+                return self.validate_entry_resource(item[1], options)
+            finally:
+                with self._load_lock:
+                    self.active_entries -= 1
+
+        workers = min(self.max_workers, len(resources))
+        with self._load_lock:
+            self.pending_entries += len(resources)
+        try:
+            if workers > 1 and len(resources) >= BUNDLE_PARALLEL_MIN_ENTRIES:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bundle-entry") as executor:
+                    results = list(executor.map(tracer.bind(validate_entry), resources))
+            else:
+                results = [validate_entry(item) for item in resources]
+        finally:
+            # Entries left unstarted after a failure are no longer queued
+            with self._load_lock:
+                self.pending_entries -= len(resources) - started
+
+        submission = self.submission_index() if detect_duplicates else None
+        issues = []
+        for i, entry in enumerate(entries):
+            issues.extend(self.invalid_entry_resource_issues(i, entry))
+        pending: List[Tuple[int, str, str, Optional[str]]] = []
+        for (i, resource), result in zip(resources, results):
+            issues.extend(self.entry_issues(i, result))
+            issues.extend(self.collect_entry_references(i, entries[i], pending))
+            if submission is not None:
+                issues.extend(self.duplicate_issues(submission, i, resource))
+        issues.extend(self.resolve_references(bundle.get("type"), pending, index))
+
+        logger.debug(
+            f"Validated {len(resources)} Bundle entries with {workers} worker(s), "
+            f"{len(issues)} issue(s)"
+        )
+        return issues
+
+    def stream_session(
+        self,
+        validate_code_systems: bool = True,
+        validate_value_sets: bool = True,
+        use_ph_core: bool = True,
+        strict_ph_core: bool = True,
+        detect_duplicates: bool = False,
+        max_issues: Optional[int] = None,
+        aggregate_issues: bool = False
+    ) -> "BundleStreamSession":
+        """Start validating a Bundle that arrives as a stream of JSON bytes.
+
+        Args:
+            validate_code_systems: Whether to validate coding systems
+            validate_value_sets: Whether to validate value sets
+            use_ph_core: Whether to use PH-Core validation
+            strict_ph_core: Whether to enforce strict PH-Core compliance
+            detect_duplicates: Whether to flag duplicate entries and identifier
+                collisions between entries
+            max_issues: Stop validating entries once this many issues were
+                found (None for no limit)
+            aggregate_issues: Report identical issues that differ only in
+                their array indexes once, with a count
+
+        Returns:
+            A session to feed the raw Bundle JSON into
+        """
+        return BundleStreamSession(self, {
+            "validate_code_systems": validate_code_systems,
+            "validate_value_sets": validate_value_sets,
+            "use_ph_core": use_ph_core,
+            "strict_ph_core": strict_ph_core,
+            "detect_duplicates": detect_duplicates,
+            "max_issues": max_issues,
+            "aggregate_issues": aggregate_issues,
+        })
+
+
+class BundleStreamSession:
+    """Validates a Bundle entry by entry while its JSON is still being parsed.
+
+    Each entry is validated as soon as it has been parsed and is then
+    released; only the entry envelopes (fullUrl, request, ...), the
+    reference index, pending references and the issue list are kept, so
+    peak memory follows the largest entry rather than the whole Bundle.
+    References are resolved once the whole Bundle has been read, since
+    they may point forward to later entries.
+    """
+
+    def __init__(self, validator: BundleValidator, options: Dict[str, Any]):
+        """Initialize the session.
+
+        Args:
+            validator: Bundle validator used for the entries
+            options: validate_resource keyword options
+        """
+        self._validator = validator
+        self._options = options
+        # Entry issues are capped and aggregated across the whole Bundle
+        aggregate = options.get("aggregate_issues", False)
+        self._entry_options = dict(
+            options, aggregate_issues=False, max_issues=None if aggregate else options.get("max_issues")
+        )
+        # An entry is held whole while it is parsed, so it gets the buffered request limits
+        self._parser = StreamingObjectParser(
+            array_key="entry",
+            max_value_size=MAX_REQUEST_BODY_BYTES,
+            max_depth=MAX_JSON_DEPTH,
+            max_array_length=MAX_JSON_ARRAY_LENGTH
+        )
+        self._members: Dict[str, Any] = {}
+        self._envelopes: List[Any] = []
+        self._index = BundleReferenceIndex()
+        self._pending: List[Tuple[int, str, str, Optional[str]]] = []
+        self._issues = IssueCollector(options.get("max_issues"), aggregate)
+        self._submission = validator.submission_index() if options.get("detect_duplicates") else None
+
+    @property
+    def entry_count(self) -> int:
+        """Number of entries validated so far."""
+        return len(self._envelopes)
+
+    @property
+    def bytes_read(self) -> int:
+        """Number of bytes fed so far."""
+        return self._parser.bytes_read
+
+    def feed(self, data: bytes) -> None:
+        """Feed the next chunk of the Bundle JSON.
+
+        Args:
+            data: Raw UTF-8 bytes
+
+        Raises:
+            JSONStreamError: If the document is malformed
+            JSONLimitError: If an entry or member exceeds the request size,
+                depth or array-length limit
+        """
+        self._handle(self._parser.feed(data))
+
+    def finish(self) -> ValidationResult:
+        """Finish parsing, resolve references and validate the Bundle envelope.
+
+        Returns:
+            ValidationResult for the whole Bundle
+
+        Raises:
+            JSONStreamError: If the document is incomplete or malformed
+        """
+        # Import here to avoid circular imports
+        from src.utils.fhir_validator import fhir_validator
+
+        self._handle(self._parser.close())
+
+        issues = self._issues
+        issues.extend(self._validator.resolve_references(
+            self._members.get("type"), self._pending, self._index
+        ))
+
+        resource_type = self._members.get("resourceType")
+        if isinstance(resource_type, str) and resource_type != "Bundle":
+            issues.append(ValidationIssue(
+                severity=ValidationSeverity.ERROR,
+                code="invalid-resource-type",
+                details=f"Streaming validation only accepts Bundle resources, got '{resource_type}'",
+                location="resourceType"
+            ))
+
+        envelope = dict(self._members)
+        if "entry" not in envelope and self._envelopes:
+            envelope["entry"] = self._envelopes
+        # The envelope's issues share the entries' cap, aggregation and truncation notice
+        envelope_result = fhir_validator.validate_resource(
+            envelope, **dict(self._options, max_issues=None, aggregate_issues=False)
+        )
+        issues.extend(envelope_result.issues)
+
+        logger.info(
+            f"Stream-validated Bundle with {self.entry_count} entries "
+            f"({self.bytes_read} bytes), {len(issues)} issue(s)"
+        )
+        return fhir_validator.build_result(
+            issues.finalize(),
+            resource_type if isinstance(resource_type, str) else None
+        )
+
+    def _handle(self, events: List[Tuple[str, Any, Any]]) -> None:
+        """Validate parsed entries and record top-level members."""
+        for kind, key, value in events:
+            if kind == "member":
+                self._members[key] = value
+                continue
+
+            self._index.add(key, value)
+            self._envelopes.append(entry_envelope(value))
+            if self._issues.full:
+                continue
+            self._issues.extend(self._validator.invalid_entry_resource_issues(key, value))
+            if isinstance(value, dict) and isinstance(value.get("resource"), dict):
+                result = self._validator.validate_entry_resource(value["resource"], self._entry_options)
+                self._issues.extend(self._validator.entry_issues(key, result))
+                self._issues.extend(self._validator.collect_entry_references(key, value, self._pending))
+                if self._submission is not None:
+                    self._issues.extend(self._validator.duplicate_issues(self._submission, key, value["resource"]))
+
+
+# Global Bundle validator instance
+bundle_validator = BundleValidator()
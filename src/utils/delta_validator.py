@@ -0,0 +1,254 @@
+"""Delta validation: re-validate only the elements a JSON Patch touches."""
+
+import json
+import logging
+import re
+import secrets
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.constants.fhir_constants import (
+    MAX_VALIDATION_TOKEN_BYTES, MAX_VALIDATION_TOKEN_RESOURCE_BYTES, MAX_VALIDATION_TOKENS
+)
+from src.lib.json_patch import apply_patch
+from src.lib.profile_engine import element_in_scope
+from src.types.fhir_types import ValidationIssue, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# First element name of an issue location ('name[0].given' -> 'name')
+_TOP_ELEMENT_RE = re.compile(r"^_?[A-Za-z][A-Za-z0-9]*")
+
+# Top-level keys whose change affects every rule (resource type, profile claims)
+RESOURCE_LEVEL_ELEMENTS = frozenset(["", "resourceType", "meta"])
+
+# Top-level keys whose change affects the checks of other elements, per resource type
+# (a Bundle's type decides which entry and reference rules apply)
+DEPENDENT_ELEMENTS: Dict[str, Dict[str, Set[str]]] = {
+    "Bundle": {"type": {"entry"}},
+}
+
+# Options under which the retained issues are incomplete or folded and cannot be merged
+UNMERGEABLE_OPTIONS = ("max_issues", "aggregate_issues")
+
+
+def issue_key(issue: ValidationIssue) -> Tuple[str, str, Optional[str], str]:
+    """Identity of an issue for merging."""
+    return (issue.severity.value, issue.code, issue.location, issue.details)
+
+
+def json_size(resource: Any) -> int:
+    """Size of a resource's compact JSON in bytes (how retained resources are budgeted)."""
+    return len(json.dumps(resource, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+@dataclass
+class ValidatedResource:
+    """A validated resource retained for later delta validation."""
+    resource: Dict[str, Any]
+    options: Dict[str, Any]
+    issues: List[ValidationIssue]
+    size_bytes: int
+    # Keys of the issues raised with no element in scope (resource-level rules)
+    resource_level: Counter
+
+
+class DeltaValidator:
+    """Keeps recently validated resources and validates patches against them.
+
+    Every rule either belongs to the resource as a whole (resource type,
+    required fields, profile selection, resource-level invariants) or to a
+    single top-level element, and element rules report locations under that
+    element. A patched resource's issues are therefore the resource-level
+    issues of the new version, the element issues of the touched elements
+    re-validated, and the prior element issues of every untouched element.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = MAX_VALIDATION_TOKENS,
+        max_bytes: int = MAX_VALIDATION_TOKEN_BYTES,
+        max_resource_bytes: int = MAX_VALIDATION_TOKEN_RESOURCE_BYTES
+    ):
+        """Initialize the validator.
+
+        Args:
+            max_tokens: Number of validated resources retained (LRU)
+            max_bytes: Total JSON size of the retained resources (LRU)
+            max_resource_bytes: Largest resource that is retained
+        """
+        self._max_tokens = max_tokens
+        self._max_bytes = max_bytes
+        self._max_resource_bytes = min(max_resource_bytes, max_bytes)
+        self._validated: "OrderedDict[str, ValidatedResource]" = OrderedDict()
+        self._retained_bytes = 0
+        self._lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def __len__(self) -> int:
+        """Number of retained validation tokens."""
+        return len(self._validated)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Get validation token statistics (a miss is an unknown or evicted token)."""
+        return {
+            "size": len(self._validated),
+            "max_size": self._max_tokens,
+            "bytes": self._retained_bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+        }
+
+    def issue_token(
+        self,
+        resource: Dict[str, Any],
+        options: Dict[str, Any],
+        result: ValidationResult,
+        resource_level: Optional[Counter] = None
+    ) -> Optional[str]:
+        """Retain a validated resource and return a token for delta validation.
+
+        Args:
+            resource: The validated resource (must not be modified afterwards)
+            options: validate_resource keyword options it was validated with
+            result: Its validation result
+            resource_level: Keys of its resource-level issues, if already known
+
+        Returns:
+            Opaque validation token, or None if the resource is too large to retain
+        """
+        size_bytes = json_size(resource)
+        if size_bytes > self._max_resource_bytes:
+            logger.debug(f"Not retaining a {size_bytes}-byte resource for delta validation")
+            return None
+
+        if resource_level is None:
+            resource_level = self._resource_level(resource, options)
+
+        token = secrets.token_urlsafe(16)
+        validated = ValidatedResource(resource, dict(options), list(result.issues), size_bytes, resource_level)
+        with self._lock:
+            self._validated[token] = validated
+            self._retained_bytes += size_bytes
+            while len(self._validated) > self._max_tokens or self._retained_bytes > self._max_bytes:
+                _, evicted = self._validated.popitem(last=False)
+                self._retained_bytes -= evicted.size_bytes
+        return token
+
+    def get(self, token: str) -> Optional[ValidatedResource]:
+        """Get a retained resource by token, marking it as recently used."""
+        with self._lock:
+            validated = self._validated.get(token)
+            if validated is not None:
+                self._cache_hits += 1
+                self._validated.move_to_end(token)
+            else:
+                self._cache_misses += 1
+            return validated
+
+    def validate_patch(self, token: str, patch: Any) -> Optional[Tuple[ValidationResult, Optional[str]]]:
+        """Apply a JSON Patch to a retained resource and validate the change.
+
+        Args:
+            token: Validation token of the prior version
+            patch: JSON Patch operations
+
+        Returns:
+            Tuple of (validation result, token for the patched version or
+            None if it is too large to retain), or None if the token is
+            unknown or has been evicted
+
+        Raises:
+            JSONPatchError: If the patch cannot be applied
+        """
+        # Import here to avoid circular imports
+        from src.utils.fhir_validator import fhir_validator
+
+        prior = self.get(token)
+        if prior is None:
+            return None
+
+        resource, touched = apply_patch(prior.resource, patch)
+        merged = None
+        if _is_mergeable(prior.options) and isinstance(resource, dict) and not touched & RESOURCE_LEVEL_ELEMENTS:
+            for element, dependents in DEPENDENT_ELEMENTS.get(resource.get("resourceType"), {}).items():
+                if element in touched:
+                    touched = touched | dependents
+            merged = self._merge(fhir_validator, prior, resource, touched)
+
+        if merged is None:
+            logger.debug(f"Delta validation fell back to full validation (touched: {sorted(touched)})")
+            result = fhir_validator.validate_resource(resource, **prior.options)
+            resource_level = None
+        else:
+            issues, resource_level = merged
+            result = fhir_validator.build_result(
+                issues, resource.get("resourceType")
+            )
+        return result, self.issue_token(resource, prior.options, result, resource_level)
+
+    @staticmethod
+    def _resource_level(resource: Dict[str, Any], options: Dict[str, Any]) -> Counter:
+        """Keys of the issues a resource raises with no element in scope."""
+        # Import here to avoid circular imports
+        from src.utils.fhir_validator import fhir_validator
+
+        if not isinstance(resource, dict) or not _is_mergeable(options):
+            return Counter()
+        return Counter(
+            issue_key(issue) for issue in
+            fhir_validator.validate_resource(resource, elements=frozenset(), **options).issues
+        )
+
+    @staticmethod
+    def _merge(
+        fhir_validator: Any,
+        prior: ValidatedResource,
+        resource: Dict[str, Any],
+        touched: Set[str]
+    ) -> Optional[Tuple[List[ValidationIssue], Counter]]:
+        """Combine re-validated touched elements with the prior issues of the rest.
+
+        Returns:
+            Tuple of (merged issues, resource-level issue keys of the patched
+            version), or None if a prior issue cannot be attributed to a
+            top-level element (the caller then validates in full)
+        """
+        prior_resource_level = Counter(prior.resource_level)
+        kept: List[ValidationIssue] = []
+        for issue in prior.issues:
+            key = issue_key(issue)
+            if prior_resource_level[key]:
+                prior_resource_level[key] -= 1
+                continue
+            match = _TOP_ELEMENT_RE.match(issue.location or "")
+            if not match:
+                return None
+            if not element_in_scope(match.group(0), touched):
+                kept.append(issue)
+
+        fresh = fhir_validator.validate_resource(resource, elements=frozenset(touched), **prior.options)
+
+        # Fresh issues located outside the touched elements can only be resource-level;
+        # a resource-level run is needed only to classify the others
+        resource_level: Counter = Counter()
+        for issue in fresh.issues:
+            match = _TOP_ELEMENT_RE.match(issue.location or "")
+            if not match or element_in_scope(match.group(0), touched):
+                resource_level = DeltaValidator._resource_level(resource, prior.options)
+                break
+            resource_level[issue_key(issue)] += 1
+        return fresh.issues + kept, resource_level
+
+
+def _is_mergeable(options: Dict[str, Any]) -> bool:
+    """Whether results validated with these options can be merged."""
+    return not any(options.get(option) for option in UNMERGEABLE_OPTIONS)
+
+
+# Global delta validator instance
+delta_validator = DeltaValidator()
@@ -3,7 +3,8 @@
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional
 from datetime import datetime
 import jsonschema
 from jsonschema import validate, ValidationError, Draft7Validator, RefResolver
@@ -11,18 +12,35 @@ from jsonschema import validate, ValidationError, Draft7Validator, RefResolver
 from src.types.fhir_types import (
     ValidationResult, ValidationIssue, ValidationSeverity, ValidationStatus
 )
+from src.lib.issue_collector import IssueCollector, issue_limit_reached
+from src.lib.json_walker import JSONWalker, format_path
+from src.lib.profile_engine import element_in_scope
+from src.lib.stage_timer import NULL_STAGE_TIMER, StageTimer
+from src.lib.tracing import tracer
 from src.lib.resource_loader import resource_loader
+from src.ui.ig_endpoints import ph_core_ig_server
 from src.constants.fhir_constants import FHIR_RESOURCE_TYPES
 
 logger = logging.getLogger(__name__)
 
 
+def validation_span_attributes(result: ValidationResult) -> Dict[str, Any]:
+    """Describe a validation result as trace span attributes."""
+    return {
+        "fhir.resource_type": result.resource_type if isinstance(result.resource_type, str) else "",
+        "fhir.validation.status": result.status.value,
+        "fhir.validation.issue_count": len(result.issues),
+    }
+
+
 class FHIRValidator:
     """FHIR resource validator."""
     
     def __init__(self):
         """Initialize the FHIR validator."""
         self._resource_schemas: Dict[str, Dict[str, Any]] = {}
+        # $ref resolvers keep a resolution-scope stack, so each thread gets its own
+        self._schema_resolvers = threading.local()
     
     def _validate_resource_type(self, resource: Dict[str, Any]) -> List[ValidationIssue]:
         """Validate the resource type.
@@ -67,94 +85,58 @@ class FHIRValidator:
     
     def _validate_fhir_data_types(self, resource: Dict[str, Any]) -> List[ValidationIssue]:
         """Validate FHIR data types for ANY resource type."""
-        issues = []
-        
-        def validate_boolean_field(obj: Any, field_path: str, field_name: str) -> None:
-            """Validate boolean fields recursively."""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{field_path}.{key}" if field_path else key
-                    
-                    # Check if this is a boolean field (common FHIR boolean fields)
-                    boolean_fields = ['active', 'deceased', 'preferred', 'multipleBirth', 'experimental', 'immutable']
-                    if any(bool_field in key.lower() for bool_field in boolean_fields):
-                        if value is not None and not isinstance(value, bool):
-                            issues.append(ValidationIssue(
-                                severity=ValidationSeverity.ERROR,
-                                code="invalid-boolean-type",
-                                details=f"Field '{key}' must be boolean (true/false), got: {type(value).__name__}",
-                                location=current_path
-                            ))
-                    
-                    # Recursively validate nested objects
-                    validate_boolean_field(value, current_path, key)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    current_path = f"{field_path}[{i}]" if field_path else f"[{i}]"
-                    validate_boolean_field(item, current_path, field_name)
+        boolean_issues: List[ValidationIssue] = []
+        date_issues: List[ValidationIssue] = []
+        coding_issues: List[ValidationIssue] = []
+        boolean_fields = ['active', 'deceased', 'preferred', 'multipleBirth', 'experimental', 'immutable']
         
-        def validate_date_fields(obj: Any, field_path: str) -> None:
-            """Validate date fields recursively."""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    current_path = f"{field_path}.{key}" if field_path else key
-                    
-                    # Check if this is a date field
-                    if 'date' in key.lower() and isinstance(value, str):
-                        if not re.match(r'^\d{4}-\d{2}-\d{2}$', value):
-                            issues.append(ValidationIssue(
-                                severity=ValidationSeverity.ERROR,
-                                code="invalid-date-format",
-                                details=f"Date field '{key}' must be in YYYY-MM-DD format, got: {value}",
-                                location=current_path
-                            ))
-                    
-                    # Recursively validate nested objects
-                    validate_date_fields(value, current_path)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    current_path = f"{field_path}[{i}]" if field_path else f"[{i}]"
-                    validate_date_fields(item, current_path)
-        
-        def validate_coding_fields(obj: Any, field_path: str) -> None:
-            """Validate coding and CodeableConcept fields."""
-            if isinstance(obj, dict):
-                # If this is a coding object
-                if 'system' in obj and 'code' in obj:
-                    if not isinstance(obj.get('system'), str) or not obj.get('system'):
-                        issues.append(ValidationIssue(
+        # A single pass over every value; each check keeps its own issue list so
+        # the issues are reported grouped by check
+        walker = JSONWalker(resource, scalars=True)
+        for value in walker:
+            key = walker.key
+            if isinstance(key, str):
+                lowered = key.lower()
+                
+                # Check if this is a boolean field (common FHIR boolean fields)
+                if any(bool_field in lowered for bool_field in boolean_fields):
+                    if value is not None and not isinstance(value, bool):
+                        boolean_issues.append(ValidationIssue(
                             severity=ValidationSeverity.ERROR,
-                            code="invalid-coding-system",
-                            details="Coding.system must be a non-empty URI string",
-                            location=f"{field_path}.system" if field_path else "system"
+                            code="invalid-boolean-type",
+                            details=f"Field '{key}' must be boolean (true/false), got: {type(value).__name__}",
+                            location=walker.path
                         ))
-                    
-                    if not isinstance(obj.get('code'), str) or not obj.get('code'):
-                        issues.append(ValidationIssue(
+                
+                # Check if this is a date field
+                if 'date' in lowered and isinstance(value, str):
+                    if not re.match(r'^\d{4}-\d{2}-\d{2}$', value):
+                        date_issues.append(ValidationIssue(
                             severity=ValidationSeverity.ERROR,
-                            code="invalid-coding-code",
-                            details="Coding.code must be a non-empty string",
-                            location=f"{field_path}.code" if field_path else "code"
+                            code="invalid-date-format",
+                            details=f"Date field '{key}' must be in YYYY-MM-DD format, got: {value}",
+                            location=walker.path
                         ))
+            
+            # If this is a coding object
+            if isinstance(value, dict) and 'system' in value and 'code' in value:
+                if not isinstance(value.get('system'), str) or not value.get('system'):
+                    coding_issues.append(ValidationIssue(
+                        severity=ValidationSeverity.ERROR,
+                        code="invalid-coding-system",
+                        details="Coding.system must be a non-empty URI string",
+                        location=walker.child_path("system")
+                    ))
                 
-                # Recursively validate nested objects
-                for key, value in obj.items():
-                    current_path = f"{field_path}.{key}" if field_path else key
-                    validate_coding_fields(value, current_path)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    current_path = f"{field_path}[{i}]" if field_path else f"[{i}]"
-                    validate_coding_fields(item, current_path)
-        
-        # Run all generic validations
-        validate_boolean_field(resource, "", "")
-        validate_date_fields(resource, "")
-        validate_coding_fields(resource, "")
+                if not isinstance(value.get('code'), str) or not value.get('code'):
+                    coding_issues.append(ValidationIssue(
+                        severity=ValidationSeverity.ERROR,
+                        code="invalid-coding-code",
+                        details="Coding.code must be a non-empty string",
+                        location=walker.child_path("code")
+                    ))
         
-        return issues
+        return boolean_issues + date_issues + coding_issues
     
     def _validate_required_fields(self, resource: Dict[str, Any]) -> List[ValidationIssue]:
         """Validate required fields and strict FHIR constraints.
@@ -248,9 +230,63 @@ class FHIRValidator:
         
         return issues
     
-    def _validate_json_schema(self, resource: Dict[str, Any]) -> List[ValidationIssue]:
-        """Validate resource against JSON schema if available."""
-        issues = []
+    def _schema_resolver(self, schema: Dict[str, Any]) -> RefResolver:
+        """Get this thread's $ref resolver for the FHIR schema.
+        
+        The resolver caches its index of subschemas, which is expensive to
+        build, so it is reused across validations.
+        """
+        cached = getattr(self._schema_resolvers, "resolver", None)
+        if cached is None or cached[0] is not schema:
+            cached = (schema, RefResolver.from_schema(schema))
+            self._schema_resolvers.resolver = cached
+        return cached[1]
+    
+    def schema_validator(self, subschema: Dict[str, Any]) -> Draft7Validator:
+        """Get a validator for a definition of the loaded FHIR schema.
+        
+        Args:
+            subschema: The FHIR schema or one of its definitions (its $refs
+                are resolved against the whole FHIR schema)
+            
+        Returns:
+            JSON schema validator using this thread's cached $ref resolver
+        """
+        return Draft7Validator(subschema, resolver=self._schema_resolver(resource_loader.schemas))
+    
+    @staticmethod
+    def schema_errors(validator: Draft7Validator, instance: Any) -> Iterator[ValidationError]:
+        """Iterate over the schema errors of a value, one per failed constraint.
+        
+        FHIR primitive definitions carry both a type and a pattern (e.g.
+        boolean: type 'boolean', pattern '^true|false$'). A value of the wrong
+        type that is a string fails both, so its pattern error is skipped in
+        favour of the type error.
+        """
+        for error in validator.iter_errors(instance):
+            if (error.validator == 'pattern' and 'type' in error.schema
+                    and not validator.is_type(error.instance, error.schema['type'])):
+                continue
+            yield error
+    
+    def _validate_json_schema(
+        self,
+        resource: Dict[str, Any],
+        elements: Optional[AbstractSet[str]] = None,
+        issues: Optional[List[ValidationIssue]] = None
+    ) -> List[ValidationIssue]:
+        """Validate resource against JSON schema if available.
+        
+        Args:
+            resource: FHIR resource to validate
+            elements: Top-level JSON keys to check (None for all)
+            issues: List to append the issues to (an IssueCollector stops the
+                validation at its limit)
+            
+        Returns:
+            List of validation issues
+        """
+        issues = [] if issues is None else issues
         schema = resource_loader.schemas
         resource_type = resource.get("resourceType")
 
@@ -261,41 +297,49 @@ class FHIRValidator:
         resource_schema = None
         if resource_type and resource_type in schema.get('definitions', {}):
             resource_schema = schema['definitions'][resource_type]
+        
+        # Scoped validation: check only the selected elements (a projection of
+        # the resource against the same definition reports exactly their errors)
+        if elements is not None and resource_schema:
+            resource = {
+                key: value for key, value in resource.items()
+                if key == 'resourceType' or element_in_scope(key, elements)
+            }
+            resource_schema = dict(resource_schema, required=[
+                name for name in resource_schema.get('required', [])
+                if name == 'resourceType' or element_in_scope(name, elements)
+            ])
 
         try:
             # Use the specific resource schema if found, otherwise fallback to the full schema
             validator_schema = resource_schema or schema
-            # A resolver is needed to handle internal references ($ref) within the schema
-            resolver = RefResolver.from_schema(schema)
-            
-            # Create a validator that will collect ALL errors
-            validator = Draft7Validator(validator_schema, resolver=resolver)
+            # Create a validator that will collect ALL errors (with a resolver
+            # for the internal references ($ref) within the schema)
+            validator = self.schema_validator(validator_schema)
             
-            # Collect all validation errors
-            schema_errors = list(validator.iter_errors(resource))
-            
-            for error in schema_errors:
-                # Determine severity based on the type of validation error
-                severity = ValidationSeverity.ERROR
-                code = "schema-validation-error"
-                
-                # Critical data type and value constraints should be ERRORS
-                error_message = error.message.lower()
-                if any(keyword in error_message for keyword in [
-                    'is not one of', 'is not valid', 'does not match', 
-                    'is not of type', 'invalid', 'required', 'is a required property'
-                ]):
-                    severity = ValidationSeverity.ERROR
-                    code = "fhir-schema-error"
+            # Collect validation errors until the issue limit is reached
+            for error in self.schema_errors(validator, resource):
+                if issue_limit_reached(issues):
+                    break
+                issue = self.schema_issue(error)
                 
-                location = ".".join(str(x) for x in error.path) if error.path else error.schema_path[-1] if error.schema_path else None
+                # Resource-level errors are located at the element they concern
+                if not error.path and error.validator == 'required':
+                    match = re.match(r"^'([^']+)' is a required property$", error.message)
+                    issue.location = match.group(1) if match else issue.location
+                elif not error.path and error.validator == 'additionalProperties' and isinstance(error.instance, dict):
+                    known = error.schema.get('properties', {})
+                    for key in error.instance:
+                        if key not in known:
+                            issues.append(ValidationIssue(
+                                severity=issue.severity,
+                                code=issue.code,
+                                details=f"FHIR schema violation: Additional properties are not allowed ('{key}' was unexpected)",
+                                location=key,
+                            ))
+                    continue
                 
-                issues.append(ValidationIssue(
-                    severity=severity,
-                    code=code,
-                    details=f"FHIR schema violation: {error.message}",
-                    location=location,
-                ))
+                issues.append(issue)
                 
         except Exception as e:
             issues.append(ValidationIssue(
@@ -306,54 +350,165 @@ class FHIRValidator:
 
         return issues
     
-    def _validate_coding_systems(self, resource: Dict[str, Any]) -> List[ValidationIssue]:
+    def schema_issue(self, error: ValidationError, prefix: Optional[List[Any]] = None) -> ValidationIssue:
+        """Convert a JSON schema error into a validation issue.
+        
+        Args:
+            error: Schema validation error
+            prefix: JSON path tokens of the validated value within the resource
+                (None when the resource itself was validated)
+            
+        Returns:
+            Validation issue located at the offending element
+        """
+        # Determine severity based on the type of validation error
+        severity = ValidationSeverity.ERROR
+        code = "schema-validation-error"
+        
+        # Critical data type and value constraints should be ERRORS
+        error_message = error.message.lower()
+        if any(keyword in error_message for keyword in [
+            'is not one of', 'is not valid', 'does not match', 
+            'is not of type', 'invalid', 'required', 'is a required property'
+        ]):
+            severity = ValidationSeverity.ERROR
+            code = "fhir-schema-error"
+        
+        path = list(prefix or []) + list(error.path)
+        location = format_path(path) if path else error.schema_path[-1] if error.schema_path else None
+        
+        return ValidationIssue(
+            severity=severity,
+            code=code,
+            details=f"FHIR schema violation: {error.message}",
+            location=location,
+        )
+    
+    def _validate_coding_systems(
+        self,
+        resource: Dict[str, Any],
+        elements: Optional[AbstractSet[str]] = None,
+        issues: Optional[List[ValidationIssue]] = None
+    ) -> List[ValidationIssue]:
         """Validate coding systems and value sets.
         
         Args:
             resource: FHIR resource to validate
+            elements: Top-level JSON keys to check (None for all)
+            issues: List to append the issues to (an IssueCollector stops the
+                validation at its limit)
             
         Returns:
             List of validation issues
         """
-        issues = []
+        issues = [] if issues is None else issues
+        if elements is None:
+            self.check_codings(resource, "", issues)
+        else:
+            for key, value in resource.items():
+                if element_in_scope(key, elements):
+                    self.check_codings(value, key, issues)
+        return issues
+    
+    def check_codings(self, obj: Any, path: str, issues: List[ValidationIssue]) -> None:
+        """Check the Coding elements of a value and everything nested in it.
         
-        def check_coding(obj: Any, path: str = "") -> None:
-            """Recursively check for coding elements."""
-            if isinstance(obj, dict):
-                # Check if this is a Coding element
-                if 'system' in obj and 'code' in obj:
-                    system = obj.get('system')
-                    code = obj.get('code')
-                    
-                    if not isinstance(system, str) or not system:
-                        issues.append(ValidationIssue(
-                            severity=ValidationSeverity.WARNING,
-                            code="invalid-coding-system",
-                            details="Coding system must be a valid URI",
-                            location=f"{path}.system" if path else "system"
-                        ))
-                    
-                    if not isinstance(code, str) or not code:
-                        issues.append(ValidationIssue(
-                            severity=ValidationSeverity.WARNING,
-                            code="invalid-coding-code",
-                            details="Coding code must be a non-empty string",
-                            location=f"{path}.code" if path else "code"
-                        ))
-                
-                # Recursively check nested objects
-                for key, value in obj.items():
-                    new_path = f"{path}.{key}" if path else key
-                    check_coding(value, new_path)
+        Args:
+            obj: Value to check (resource, element or list of elements)
+            path: Location of the value ('' for the resource root)
+            issues: List the issues are appended to
+        """
+        walker = JSONWalker(obj, path)
+        for node in walker:
+            if issue_limit_reached(issues):
+                return
+            # Check if this is a Coding element
+            if not isinstance(node, dict) or 'system' not in node or 'code' not in node:
+                continue
+            system = node.get('system')
+            code = node.get('code')
+            
+            if not isinstance(system, str) or not system:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="invalid-coding-system",
+                    details="Coding system must be a valid URI",
+                    location=walker.child_path("system")
+                ))
+            
+            if not isinstance(code, str) or not code:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="invalid-coding-code",
+                    details="Coding code must be a non-empty string",
+                    location=walker.child_path("code")
+                ))
             
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    new_path = f"{path}[{i}]" if path else f"[{i}]"
-                    check_coding(item, new_path)
+            # Identifier namespaces (NamingSystems) are not code systems
+            known_system = ph_core_ig_server.system_index.classify(system)
+            if known_system and known_system.kind == "identifier":
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code="identifier-system-in-coding",
+                    details=f"Coding system '{system}' is the {known_system.name} identifier namespace, not a code system",
+                    location=walker.child_path("system")
+                ))
+    
+    def build_result(
+        self, all_issues: List[ValidationIssue], resource_type: Optional[str]
+    ) -> ValidationResult:
+        """Summarize validation issues into an overall validation result.
         
-        check_coding(resource)
-        return issues
+        Args:
+            all_issues: Issues found while validating the resource
+            resource_type: Type of the validated resource
+            
+        Returns:
+            ValidationResult with status, message and validity derived from the
+            issue severities
+        """
+        # Determine overall validation status
+        fatal_issues = [i for i in all_issues if i.severity == ValidationSeverity.FATAL]
+        error_issues = [i for i in all_issues if i.severity == ValidationSeverity.ERROR]
+        warning_issues = [i for i in all_issues if i.severity == ValidationSeverity.WARNING]
+        
+        # Count FHIR vs PH-Core errors for better messaging
+        fhir_errors = [i for i in error_issues if not any(ph_keyword in i.code.lower() for ph_keyword in ['ph-core', 'indigenous', 'philhealth'])]
+        ph_core_errors = [i for i in error_issues if any(ph_keyword in i.code.lower() for ph_keyword in ['ph-core', 'indigenous', 'philhealth'])]
+        
+        if fatal_issues:
+            status = ValidationStatus.FAILED
+            message = f"Validation failed with {len(fatal_issues)} fatal error(s)"
+            valid = False
+        elif error_issues:
+            status = ValidationStatus.FAILED
+            if fhir_errors and ph_core_errors:
+                message = f"Validation failed with {len(fhir_errors)} FHIR error(s) and {len(ph_core_errors)} PH-Core error(s)"
+            elif fhir_errors:
+                message = f"FHIR validation failed with {len(fhir_errors)} error(s)"
+            elif ph_core_errors:
+                message = f"PH-Core validation failed with {len(ph_core_errors)} error(s)"
+            else:
+                message = f"Validation failed with {len(error_issues)} error(s)"
+            valid = False
+        elif warning_issues:
+            status = ValidationStatus.WARNING
+            message = f"Validation passed with {len(warning_issues)} warning(s)"
+            valid = True
+        else:
+            status = ValidationStatus.SUCCESS
+            message = "Validation successful"
+            valid = True
+        
+        return ValidationResult(
+            status=status,
+            message=message,
+            issues=all_issues,
+            resource_type=resource_type,
+            valid=valid
+        )
     
+    @tracer.traced("validate_resource", validation_span_attributes)
     def validate_resource(
         self, 
         resource: Dict[str, Any], 
@@ -361,23 +516,40 @@ class FHIRValidator:
         validate_code_systems: bool = True,
         validate_value_sets: bool = True,
         use_ph_core: bool = True,
-        strict_ph_core: bool = True
+        strict_ph_core: bool = True,
+        detect_duplicates: bool = False,
+        elements: Optional[AbstractSet[str]] = None,
+        max_issues: Optional[int] = None,
+        aggregate_issues: bool = False,
+        timer: StageTimer = NULL_STAGE_TIMER
     ) -> ValidationResult:
         """Validate a FHIR resource.
         
         Args:
             resource: FHIR resource to validate
-            profile_url: Optional profile URL for additional validation
+            profile_url: Optional profile canonical URL to validate against (in
+                addition to meta.profile when PH-Core validation is enabled)
             validate_code_systems: Whether to validate coding systems
             validate_value_sets: Whether to validate value sets
             use_ph_core: Whether to use PH-Core validation
             strict_ph_core: Whether to enforce strict PH-Core compliance
+            detect_duplicates: For Bundles, whether to flag duplicate entries
+                and identifier collisions between entries
+            elements: Restrict element-level rules to these top-level JSON keys
+                (None for all); resource-level rules always run
+            max_issues: Stop validating once this many issues were found
+                (None for no limit)
+            aggregate_issues: Report identical issues that differ only in
+                their array indexes once, with a count
+            timer: Timer the duration of each validation stage is recorded in
             
         Returns:
             ValidationResult with validation outcome
         """
         start_time = datetime.now()
-        all_issues = []
+        all_issues = IssueCollector(max_issues, aggregate_issues)
+        # Aggregated counts must be exact, so only unaggregated stages stop early
+        stage_limit = None if aggregate_issues else max_issues
         
         try:
             # Basic structure validation
@@ -395,7 +567,8 @@ class FHIRValidator:
                 )
             
             # Validate resource type
-            resource_type_issues = self._validate_resource_type(resource)
+            with timer.stage("resource_type"):
+                resource_type_issues = self._validate_resource_type(resource)
             all_issues.extend(resource_type_issues)
             
             resource_type = resource.get('resourceType')
@@ -406,35 +579,61 @@ class FHIRValidator:
                 return ValidationResult(
                     status=ValidationStatus.FAILED,
                     message="Fatal validation errors found",
-                    issues=all_issues,
+                    issues=all_issues.finalize(),
                     resource_type=resource_type,
                     valid=False
                 )
             
+            # Bundle entries are validated one by one (with their own type's
+            # validator); the Bundle-level checks below only see the envelope
+            structure = resource
+            if resource_type == 'Bundle' and element_in_scope('entry', elements):
+                # Import here to avoid circular imports
+                from src.utils.bundle_validator import bundle_validator
+                
+                if bundle_validator.has_entry_resources(resource):
+                    structure = bundle_validator.without_entry_resources(resource)
+                    with timer.stage("bundle_entries"):
+                        entry_issues = bundle_validator.validate_entries(
+                            resource,
+                            validate_code_systems=validate_code_systems,
+                            validate_value_sets=validate_value_sets,
+                            use_ph_core=use_ph_core,
+                            strict_ph_core=strict_ph_core,
+                            detect_duplicates=detect_duplicates,
+                            max_issues=stage_limit
+                        )
+                    all_issues.extend(entry_issues)
+            
             # Validate against JSON schema (uses FHIR base schemas)
-            schema_issues = self._validate_json_schema(resource)
-            all_issues.extend(schema_issues)
+            with timer.stage("json_schema"):
+                self._validate_json_schema(structure, elements, all_issues)
             
             # FHIR schema validation above now handles data types comprehensively
             
             # Validate required fields and specific constraints
-            required_field_issues = self._validate_required_fields(resource)
+            with timer.stage("required_fields"):
+                required_field_issues = self._validate_required_fields(structure)
             all_issues.extend(required_field_issues)
             
             # Validate coding systems if requested
             if validate_code_systems:
-                coding_issues = self._validate_coding_systems(resource)
-                all_issues.extend(coding_issues)
+                with timer.stage("coding_systems"):
+                    self._validate_coding_systems(structure, elements, all_issues)
             
-            # PH-Core validation if requested
-            if use_ph_core:
+            # PH-Core validation if requested (and the issue limit allows)
+            if use_ph_core and not all_issues.full:
                 try:
                     # Import here to avoid circular imports
                     from src.utils.ph_core_validator import ph_core_validator
                     
                     ph_core_result = ph_core_validator.validate_ph_core_resource(
                         resource, 
-                        strict_mode=strict_ph_core
+                        strict_mode=strict_ph_core,
+                        requested_profiles=[profile_url] if profile_url else None,
+                        elements=elements,
+                        max_issues=stage_limit,
+                        timer=timer
                     )
                     
                     # Merge PH-Core validation issues
@@ -457,7 +656,7 @@ class FHIRValidator:
                         return ValidationResult(
                             status=ValidationStatus.FAILED,
                             message=message,
-                            issues=all_issues,
+                            issues=all_issues.finalize(),
                             resource_type=resource_type,
                             valid=False
                         )
@@ -477,49 +676,24 @@ class FHIRValidator:
                         details=f"PH-Core validation failed: {str(e)}"
                     ))
             
-            # Determine overall validation status
-            fatal_issues = [i for i in all_issues if i.severity == ValidationSeverity.FATAL]
-            error_issues = [i for i in all_issues if i.severity == ValidationSeverity.ERROR]
-            warning_issues = [i for i in all_issues if i.severity == ValidationSeverity.WARNING]
-            
-            # Count FHIR vs PH-Core errors for better messaging
-            fhir_errors = [i for i in error_issues if not any(ph_keyword in i.code.lower() for ph_keyword in ['ph-core', 'indigenous', 'philhealth'])]
-            ph_core_errors = [i for i in error_issues if any(ph_keyword in i.code.lower() for ph_keyword in ['ph-core', 'indigenous', 'philhealth'])]
-            
-            if fatal_issues:
-                status = ValidationStatus.FAILED
-                message = f"Validation failed with {len(fatal_issues)} fatal error(s)"
-                valid = False
-            elif error_issues:
-                status = ValidationStatus.FAILED
-                if fhir_errors and ph_core_errors:
-                    message = f"Validation failed with {len(fhir_errors)} FHIR error(s) and {len(ph_core_errors)} PH-Core error(s)"
-                elif fhir_errors:
-                    message = f"FHIR validation failed with {len(fhir_errors)} error(s)"
-                elif ph_core_errors:
-                    message = f"PH-Core validation failed with {len(ph_core_errors)} error(s)"
-                else:
-                    message = f"Validation failed with {len(error_issues)} error(s)"
-                valid = False
-            elif warning_issues:
-                status = ValidationStatus.WARNING
-                message = f"Validation passed with {len(warning_issues)} warning(s)"
-                valid = True
-            else:
-                status = ValidationStatus.SUCCESS
-                message = "Validation successful"
-                valid = True
+            elif profile_url and not all_issues.full:
+                # Explicitly requested profile without the PH-Core pipeline
+                from src.utils.ph_core_validator import ph_core_validator
+                
+                with timer.stage("profile_selection"):
+                    profiles, profile_issues = ph_core_validator.select_profiles(
+                        resource, [profile_url], include_meta_profiles=False
+                    )
+                all_issues.extend(profile_issues)
+                with timer.stage("profiles"):
+                    profile_issues = ph_core_validator.validate_profiles(resource, profiles, elements, stage_limit)
+                all_issues.extend(profile_issues)
             
-            return ValidationResult(
-                status=status,
-                message=message,
-                issues=all_issues,
-                resource_type=resource_type,
-                valid=valid
-            )
+            return self.build_result(all_issues.finalize(), resource_type)
             
         except Exception as e:
             logger.error(f"Unexpected error during validation: {e}")
+            resource_type = resource.get('resourceType') if isinstance(resource, dict) else None
             return ValidationResult(
                 status=ValidationStatus.FAILED,
                 message=f"Validation error: {str(e)}",
@@ -528,7 +702,7 @@ class FHIRValidator:
                     code="validation-exception",
                     details=str(e)
                 )],
-                resource_type=resource.get('resourceType') if isinstance(resource, dict) else None,
+                resource_type=resource_type if isinstance(resource_type, str) else None,
                 valid=False
             )
 
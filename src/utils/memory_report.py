@@ -0,0 +1,151 @@
+"""Memory accounting of the server's loaded structures and caches."""
+
+import gc
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+import psutil
+
+from src.lib.deep_size import deep_size
+from src.types.fhir_types import MemoryReport, MemoryUsage
+
+logger = logging.getLogger(__name__)
+
+# (name, category, attribute getter)
+Structure = Tuple[str, str, Callable[[], Any]]
+
+
+class MemoryReporter:
+    """Measures the deep size of every long-lived structure of the server.
+
+    Structures are measured in a fixed order with one shared set of counted
+    objects, so an object reachable from several structures (e.g. a
+    StructureDefinition held by the IG server and indexed by the profile
+    registry) is attributed to the first one only, and the sizes add up
+    to the accounted total. Attributes are read directly, so measuring
+    never triggers lazy loading.
+    """
+
+    def structures(self) -> List[Structure]:
+        """Get the measured structures in attribution order."""
+        # Import here to avoid circular imports
+        from src.lib.concept_map_translator import concept_map_translator
+        from src.lib.fhirpath import fhirpath_compiler
+        from src.lib.metrics import metrics_registry
+        from src.lib.resource_loader import resource_loader
+        from src.lib.tracing import tracer
+        from src.ui.api_endpoints import resource_browser as api_resource_browser
+        from src.ui.ig_endpoints import ph_core_ig_server
+        from src.ui.web_endpoints import resource_browser as web_resource_browser
+        from src.utils.delta_validator import delta_validator
+        from src.utils.fhir_validator import fhir_validator
+        from src.utils.partial_validator import partial_validator
+        from src.utils.ph_core_validator import ph_core_validator
+        from src.utils.profile_registry import profile_registry
+
+        engine = profile_registry.engine
+        return [
+            ("resource_loader.schemas", "definitions", lambda: resource_loader._schemas),
+            ("resource_loader.profiles", "definitions", lambda: resource_loader._profiles),
+            ("resource_loader.value_sets", "definitions", lambda: resource_loader._value_sets),
+            ("resource_loader.extensions", "definitions", lambda: resource_loader._extensions),
+            ("resource_loader.concept_maps", "definitions", lambda: resource_loader._concept_maps),
+            ("ph_core_ig_server.ig_resources", "definitions", lambda: ph_core_ig_server._ig_resources),
+            ("ph_core_ig_server.concept_indexes", "indexes", lambda: ph_core_ig_server._concept_indexes),
+            ("ph_core_ig_server.system_index", "indexes", lambda: ph_core_ig_server._system_index),
+            ("web_endpoints.resource_browser", "browsers", lambda: web_resource_browser),
+            ("api_endpoints.resource_browser", "browsers", lambda: api_resource_browser),
+            ("profile_registry.structure_definitions", "indexes", lambda: profile_registry._structure_definitions),
+            ("profile_registry.value_sets", "indexes", lambda: profile_registry._value_sets),
+            ("concept_map_translator.index", "indexes", lambda: concept_map_translator._index),
+            ("ph_core_validator.supported_profiles", "indexes", lambda: ph_core_validator._supported_profiles),
+            ("fhir_validator.resource_schemas", "compiled", lambda: fhir_validator._resource_schemas),
+            ("profile_engine.compiled_profiles", "compiled", lambda: engine._compiled),
+            ("fhirpath_compiler.expressions", "compiled", lambda: fhirpath_compiler._cache),
+            ("profile_engine.merged_elements_cache", "caches", lambda: engine._merged_elements_cache),
+            ("profile_engine.allowed_systems_cache", "caches", lambda: engine._allowed_systems_cache),
+            ("fhirpath_compiler.failed_expressions", "caches", lambda: fhirpath_compiler._failed),
+            ("delta_validator.validation_tokens", "caches", lambda: delta_validator._validated),
+            ("partial_validator.path_rules", "caches", lambda: partial_validator._rules),
+            ("tracer.pending_spans", "diagnostics", lambda: tracer._pending),
+            ("metrics_registry", "diagnostics", lambda: metrics_registry),
+        ]
+
+    def boundaries(self) -> Set[int]:
+        """Ids of the singletons that own the structures.
+
+        Compiled profiles refer back to the engine and bound callbacks to
+        their registry; following those would attribute every other
+        structure to whichever is measured first.
+        """
+        # Import here to avoid circular imports
+        from src.lib.concept_map_translator import concept_map_translator
+        from src.lib.fhirpath import fhirpath_compiler
+        from src.lib.resource_loader import resource_loader
+        from src.lib.tracing import tracer
+        from src.ui.ig_endpoints import ph_core_ig_server
+        from src.utils.bundle_validator import bundle_validator
+        from src.utils.delta_validator import delta_validator
+        from src.utils.fhir_validator import fhir_validator
+        from src.utils.partial_validator import partial_validator
+        from src.utils.ph_core_validator import ph_core_validator
+        from src.utils.profile_registry import profile_registry
+
+        return {id(owner) for owner in (
+            resource_loader, ph_core_ig_server, profile_registry, profile_registry.engine,
+            fhir_validator, ph_core_validator, bundle_validator, fhirpath_compiler,
+            concept_map_translator, delta_validator, partial_validator, tracer,
+        )}
+
+    def report(self) -> MemoryReport:
+        """Measure every structure.
+
+        Walking the loaded definitions visits every object they hold, so
+        this takes roughly a second per hundred megabytes measured.
+
+        Returns:
+            Memory report
+        """
+        start_time = time.perf_counter_ns()
+        seen: Set[int] = set()
+        boundaries = self.boundaries()
+        usages = []
+        for name, category, get in self.structures():
+            value = get()
+            size_bytes, objects = deep_size(value, seen, boundaries)
+            usages.append(MemoryUsage(
+                name=name,
+                category=category,
+                size_bytes=size_bytes,
+                objects=objects,
+                entries=self._entries(value)
+            ))
+
+        report = MemoryReport(
+            generated_at=datetime.now().isoformat(),
+            process_rss_bytes=psutil.Process(os.getpid()).memory_info().rss,
+            accounted_bytes=sum(usage.size_bytes for usage in usages),
+            gc_tracked_objects=len(gc.get_objects()),
+            duration_ms=(time.perf_counter_ns() - start_time) // 1_000_000,
+            structures=usages
+        )
+        logger.info(
+            f"Memory report: {report.accounted_bytes} bytes accounted of "
+            f"{report.process_rss_bytes} resident in {report.duration_ms} ms"
+        )
+        return report
+
+    @staticmethod
+    def _entries(value: Any) -> Optional[int]:
+        """Number of entries of a dict, list or other sized structure."""
+        try:
+            return len(value)
+        except TypeError:
+            return None
+
+
+# Global memory reporter instance
+memory_reporter = MemoryReporter()
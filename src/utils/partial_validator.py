@@ -0,0 +1,329 @@
+"""Partial validation: validate selected element paths of a resource fragment."""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.constants.fhir_constants import MAX_PARTIAL_PATH_RULES
+from src.lib.json_walker import format_path
+from src.lib.profile_engine import CompiledProfile
+from src.lib.resource_loader import resource_loader
+from src.types.fhir_types import ValidationIssue, ValidationResult
+from src.utils.fhir_validator import fhir_validator
+
+logger = logging.getLogger(__name__)
+
+# Element path such as 'Patient.address[0].line'
+_PATH_RE = re.compile(r"^([A-Z][A-Za-z]+)((?:\.(?:_?[A-Za-z][A-Za-z0-9]*)(?:\[\d+\])?)+)$")
+_SEGMENT_RE = re.compile(r"\.(_?[A-Za-z][A-Za-z0-9]*)(?:\[(\d+)\])?")
+
+
+class PartialPathError(ValueError):
+    """Raised when an element path is malformed, unknown or absent from the fragment."""
+
+
+@dataclass(frozen=True)
+class PathRules:
+    """The rules that apply to one element path, compiled once.
+
+    Attributes:
+        path: Element path without array indexes (e.g. 'Patient.address.line')
+        resource_type: Resource type the path starts from
+        segments: JSON keys from the resource root with optional array indexes
+        schema: JSON schema of the selected value (None if no schema is loaded)
+        ph_core_checks: Names of the PH-Core element checks that apply
+    """
+    path: str
+    resource_type: str
+    segments: Tuple[Tuple[str, Optional[int]], ...]
+    schema: Optional[Dict[str, Any]]
+    ph_core_checks: Tuple[str, ...]
+
+
+def parse_element_path(path: Any) -> Tuple[str, Tuple[Tuple[str, Optional[int]], ...]]:
+    """Split an element path into its resource type and segments.
+
+    Args:
+        path: Element path such as 'Patient.address[0].line'
+
+    Returns:
+        Tuple of (resource type, ((json key, array index or None), ...))
+
+    Raises:
+        PartialPathError: If the path is malformed
+    """
+    match = _PATH_RE.match(path) if isinstance(path, str) else None
+    if not match:
+        raise PartialPathError(
+            f"Invalid element path: {path!r} (expected e.g. 'Patient.birthDate' or 'Patient.address[0]'; "
+            f"choice elements are named by type, e.g. 'Patient.deceasedBoolean')"
+        )
+    segments = tuple(
+        (name, int(index) if index else None)
+        for name, index in _SEGMENT_RE.findall(match.group(2))
+    )
+    return match.group(1), segments
+
+
+def _issue_in_scope(location: Optional[str], targets: Sequence[str]) -> bool:
+    """Check if an issue location lies at or below one of the target locations."""
+    if not location:
+        return False
+    return any(
+        location == target or location.startswith(target + ".") or location.startswith(target + "[")
+        for target in targets
+    )
+
+
+class PartialValidator:
+    """Validates only the rules of selected element paths.
+
+    Each path (indexes aside) is compiled once into its PathRules: the JSON
+    schema of the selected value and the PH-Core element checks for its
+    top-level element. Profile constraints are taken from the compiled
+    profile tree at the same path, so a request runs the schema, profile and
+    terminology rules of the selected elements and their descendants only.
+    Cardinality of a selected element is checked unless a single array item
+    is selected; rules of ancestors and siblings do not run.
+    """
+
+    def __init__(self, max_rules: int = MAX_PARTIAL_PATH_RULES):
+        """Initialize the validator.
+
+        Args:
+            max_rules: Number of compiled path rules retained (LRU)
+        """
+        self._max_rules = max_rules
+        self._rules: "OrderedDict[Tuple[str, Tuple[Tuple[str, bool], ...]], PathRules]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def __len__(self) -> int:
+        """Number of compiled path rules in the index."""
+        return len(self._rules)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Get compiled path rule cache statistics."""
+        return {
+            "size": len(self._rules),
+            "max_size": self._max_rules,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+        }
+
+    def rules(self, path: str) -> PathRules:
+        """Get the compiled rules of an element path.
+
+        Args:
+            path: Element path such as 'Patient.address[0]'
+
+        Returns:
+            PathRules for the path
+
+        Raises:
+            PartialPathError: If the path is malformed or names an unknown element
+        """
+        resource_type, segments = parse_element_path(path)
+        key = (resource_type, tuple((name, index is not None) for name, index in segments))
+        with self._lock:
+            rules = self._rules.get(key)
+            if rules is not None:
+                self._cache_hits += 1
+                self._rules.move_to_end(key)
+            else:
+                self._cache_misses += 1
+        if rules is None:
+            rules = self._compile(resource_type, segments)
+            with self._lock:
+                self._rules[key] = rules
+                while len(self._rules) > self._max_rules:
+                    self._rules.popitem(last=False)
+        if rules.segments != segments:
+            # Same element, different array indexes
+            rules = PathRules(rules.path, resource_type, segments, rules.schema, rules.ph_core_checks)
+        return rules
+
+    def _compile(self, resource_type: str,
+                 segments: Tuple[Tuple[str, Optional[int]], ...]) -> PathRules:
+        """Resolve the schema and element checks of a path."""
+        path = ".".join([resource_type] + [name for name, _ in segments])
+        schema = resource_loader.schemas
+        subschema = None
+
+        if schema and 'definitions' in schema:
+            definitions = schema['definitions']
+            if resource_type not in definitions:
+                raise PartialPathError(f"Unknown resource type in element path: {resource_type}")
+            subschema = definitions[resource_type]
+            for number, (name, index) in enumerate(segments):
+                subschema = self._resolve_ref(definitions, subschema)
+                properties = subschema.get('properties', {})
+                element = properties.get(name)
+                if element is None:
+                    raise PartialPathError(self._unknown_element_message(path, name, properties))
+                repeats = element.get('type') == 'array'
+                if index is not None and not repeats:
+                    raise PartialPathError(f"Element does not repeat and cannot be indexed: {path}")
+                is_last = number == len(segments) - 1
+                subschema = element['items'] if repeats and (index is not None or not is_last) else element
+
+        # Import here to avoid circular imports
+        from src.utils.ph_core_validator import PHCoreValidator
+
+        top_element = segments[0][0].lstrip("_")
+        checks = (top_element,) if top_element in PHCoreValidator.ELEMENT_CHECKS else ()
+        logger.debug(f"Compiled partial validation rules for {path}")
+        return PathRules(path, resource_type, segments, subschema, checks)
+
+    @staticmethod
+    def _unknown_element_message(path: str, name: str, properties: Dict[str, Any]) -> str:
+        """Describe an unknown element, naming the typed elements of a choice element."""
+        typed = sorted(
+            key for key in properties
+            if key.startswith(name) and key[len(name):len(name) + 1].isupper()
+        )
+        if not typed:
+            return f"Unknown element in element path: {path}"
+        prefix = path[:path.rindex(".") + 1]
+        return (
+            f"Unknown element in element path: {path} (choice elements are named by type: "
+            f"{', '.join(prefix + key for key in typed)})"
+        )
+
+    @staticmethod
+    def _resolve_ref(definitions: Dict[str, Any], subschema: Dict[str, Any]) -> Dict[str, Any]:
+        """Follow '#/definitions/...' references to a definition."""
+        while '$ref' in subschema:
+            ref = subschema['$ref']
+            name = ref[len("#/definitions/"):] if ref.startswith("#/definitions/") else None
+            if name not in definitions:
+                raise PartialPathError(f"Unresolvable schema reference: {ref}")
+            subschema = definitions[name]
+        return subschema
+
+    @staticmethod
+    def _targets(resource: Dict[str, Any],
+                 segments: Sequence[Tuple[str, Optional[int]]]) -> List[Tuple[Any, List[Any]]]:
+        """Find the values a path selects, with their locations as JSON path tokens.
+
+        Raises:
+            PartialPathError: If an indexed item is absent from the fragment
+        """
+        targets: List[Tuple[Any, List[Any]]] = [(resource, [])]
+        for number, (name, index) in enumerate(segments):
+            is_last = number == len(segments) - 1
+            next_targets = []
+            for value, tokens in targets:
+                if not isinstance(value, dict) or name not in value:
+                    if index is not None:
+                        raise PartialPathError(f"Element is not present in the resource: {name}[{index}]")
+                    continue
+                raw = value[name]
+                if index is not None:
+                    if not isinstance(raw, list) or index >= len(raw):
+                        raise PartialPathError(f"Element is not present in the resource: {name}[{index}]")
+                    next_targets.append((raw[index], tokens + [name, index]))
+                elif isinstance(raw, list) and not is_last:
+                    next_targets.extend((item, tokens + [name, i]) for i, item in enumerate(raw))
+                else:
+                    next_targets.append((raw, tokens + [name]))
+            targets = next_targets
+        return targets
+
+    def validate(
+        self,
+        resource: Dict[str, Any],
+        paths: List[str],
+        profile_url: Optional[str] = None,
+        validate_code_systems: bool = True,
+        use_ph_core: bool = True
+    ) -> ValidationResult:
+        """Validate selected element paths of a resource fragment.
+
+        Args:
+            resource: The resource, or a fragment holding its resourceType and
+                the selected elements
+            paths: Element paths to validate (e.g. 'Patient.birthDate')
+            profile_url: Optional profile canonical URL to validate against
+            validate_code_systems: Whether to check Coding elements
+            use_ph_core: Whether to apply PH-Core profiles and element checks
+
+        Returns:
+            ValidationResult for the selected elements
+
+        Raises:
+            PartialPathError: If a path is malformed, unknown, does not start
+                with the fragment's resourceType or selects an absent item
+        """
+        # Import here to avoid circular imports
+        from src.utils.ph_core_validator import ph_core_validator
+
+        if not isinstance(resource, dict):
+            raise PartialPathError("The resource fragment must be a JSON object")
+        resource_type = resource.get("resourceType")
+        if not paths:
+            raise PartialPathError("At least one element path is required")
+        path_rules = [self.rules(path) for path in paths]
+        for rules in path_rules:
+            if rules.resource_type != resource_type:
+                raise PartialPathError(
+                    f"Element path {rules.path} does not apply to resourceType '{resource_type}'"
+                )
+
+        all_issues: List[ValidationIssue] = []
+        profiles: List[CompiledProfile] = []
+        if use_ph_core or profile_url:
+            profiles, selection_issues = ph_core_validator.select_profiles(
+                resource, [profile_url] if profile_url else None, include_meta_profiles=use_ph_core
+            )
+            all_issues.extend(selection_issues)
+            default_url = ph_core_validator.get_profile_url(resource_type) if use_ph_core else None
+            if not profiles and default_url:
+                # Import here to avoid circular imports
+                from src.utils.profile_registry import profile_registry
+
+                default_profile = profile_registry.get_compiled_profile(default_url)
+                profiles = [default_profile] if default_profile else []
+
+        seen = set()
+        for rules in path_rules:
+            targets = self._targets(resource, rules.segments)
+            locations = [format_path(tokens) for _, tokens in targets]
+            issues: List[ValidationIssue] = []
+
+            if rules.schema is not None:
+                validator = fhir_validator.schema_validator(rules.schema)
+                for (value, tokens) in targets:
+                    for error in fhir_validator.schema_errors(validator, value):
+                        issues.append(fhir_validator.schema_issue(error, tokens))
+
+            if validate_code_systems:
+                for (value, _), location in zip(targets, locations):
+                    fhir_validator.check_codings(value, location, issues)
+
+            for profile in profiles:
+                issues.extend(profile.validate_path(resource, rules.segments))
+
+            if profiles and locations:
+                for check in rules.ph_core_checks:
+                    issues.extend(
+                        issue for issue in ph_core_validator.validate_element(resource, check, profiles)
+                        if _issue_in_scope(issue.location, locations)
+                    )
+
+            # Overlapping paths and profiles report some issues more than once
+            for issue in issues:
+                key = (issue.severity, issue.code, issue.location, issue.details)
+                if key not in seen:
+                    seen.add(key)
+                    all_issues.append(issue)
+
+        return fhir_validator.build_result(all_issues, resource_type)
+
+
+# Global partial validator instance
+partial_validator = PartialValidator()
@@ -2,13 +2,19 @@
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Set
+from typing import AbstractSet, Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from src.types.fhir_types import (
     ValidationResult, ValidationIssue, ValidationSeverity, ValidationStatus
 )
+from src.lib.fhirpath import fhirpath_compiler
+from src.lib.profile_engine import CompiledProfile, element_in_scope
+from src.lib.stage_timer import NULL_STAGE_TIMER, StageTimer
+from src.lib.tracing import tracer
 from src.ui.ig_endpoints import ph_core_ig_server
+from src.utils.profile_registry import profile_registry
+from src.utils.fhir_validator import validation_span_attributes
 
 logger = logging.getLogger(__name__)
 
@@ -16,105 +22,165 @@ logger = logging.getLogger(__name__)
 class PHCoreValidator:
     """PH-Core Implementation Guide specific validator."""
     
+    # Top-level elements with PH-Core checks that are not expressed in the profiles
+    ELEMENT_CHECKS = ("identifier", "maritalStatus", "address")
+    
     def __init__(self):
         """Initialize the PH-Core validator."""
         self._supported_profiles = self._load_supported_profiles()
+        self._compile_profiles()
     
-    def _load_supported_profiles(self) -> Dict[str, str]:
-        """Load supported PH-Core profiles mapping."""
-        profile_mapping = {
-            "Patient": "ph-core-patient",
-            "Encounter": "ph-core-encounter", 
-            "Organization": "ph-core-organization",
-            "Practitioner": "ph-core-practitioner",
-            "Observation": "ph-core-observation",
-            "Immunization": "ph-core-immunization",
-            "Medication": "ph-core-medication",
-            "RelatedPerson": "ph-core-relatedperson",
-            "Procedure": "ph-core-procedure",
-            "Location": "ph-core-location",
-            # Resources with PHCore examples but no specific profiles (use base FHIR)
-            "Condition": None,  # Uses base FHIR Condition profile
-            "AllergyIntolerance": None,  # Uses base FHIR AllergyIntolerance profile
-            "Bundle": None  # Uses base FHIR Bundle profile
-        }
+    def _load_supported_profiles(self) -> Dict[str, Optional[str]]:
+        """Load the default PH-Core profile URL for each resource type from the IG."""
+        profile_mapping: Dict[str, Optional[str]] = {}
+        for definition in ph_core_ig_server.get_all_resources_by_type("StructureDefinition").values():
+            if definition.get("kind") == "resource" and definition.get("derivation") == "constraint":
+                profile_mapping[definition["type"]] = definition.get("url")
+        
+        # Resources with PHCore examples but no specific profiles (use base FHIR)
+        for resource_type in ("Condition", "AllergyIntolerance", "Bundle"):
+            profile_mapping.setdefault(resource_type, None)
         
         logger.info(f"Loaded {len(profile_mapping)} PH-Core profile mappings")
         return profile_mapping
     
+    def _compile_profiles(self) -> None:
+        """Compile every loaded StructureDefinition into an element-path tree.
+        
+        Datatype and extension definitions are compiled as well, so every
+        FHIRPath invariant is parsed once at startup.
+        """
+        compiled = profile_registry.compile_all()
+        logger.info(
+            f"Compiled {compiled} StructureDefinitions "
+            f"({len(fhirpath_compiler)} FHIRPath invariants)"
+        )
+    
     def is_ph_core_resource(self, resource_type: str) -> bool:
         """Check if a resource type has a PH-Core profile."""
         return resource_type in self._supported_profiles
     
     def get_profile_url(self, resource_type: str) -> Optional[str]:
         """Get the PH-Core profile URL for a resource type."""
-        if resource_type in self._supported_profiles:
-            profile_id = self._supported_profiles[resource_type]
-            return f"https://wah4pc-validation.echosphere.cfd/StructureDefinition/{profile_id}"
-        return None
+        return self._supported_profiles.get(resource_type)
     
-    def _validate_required_extensions(
-        self, 
-        resource: Dict[str, Any], 
-        profile: Dict[str, Any]
-    ) -> List[ValidationIssue]:
-        """Validate required extensions based on PH-Core profile."""
-        issues = []
+    def select_profiles(
+        self,
+        resource: Dict[str, Any],
+        requested_profiles: Optional[List[str]] = None,
+        include_meta_profiles: bool = True
+    ) -> Tuple[List[CompiledProfile], List[ValidationIssue]]:
+        """Resolve the profiles a resource should be validated against.
         
-        if not profile or "differential" not in profile:
-            return issues
+        Profiles come from the request and from meta.profile; each is compiled
+        on first use through the profile registry.
         
-        extensions = resource.get("extension", [])
-        extension_urls = {ext.get("url") for ext in extensions if isinstance(ext, dict)}
+        Args:
+            resource: FHIR resource to validate
+            requested_profiles: Profile canonical URLs requested by the caller
+            include_meta_profiles: Whether to honor the resource's meta.profile
+            
+        Returns:
+            Tuple of (compiled profiles, issues for unresolvable or mismatched profiles)
+        """
+        candidates: List[Tuple[str, bool]] = [(url, True) for url in requested_profiles or [] if url]
+        if include_meta_profiles:
+            meta = resource.get("meta")
+            claimed = meta.get("profile", []) if isinstance(meta, dict) else []
+            if isinstance(claimed, list):
+                candidates.extend((url, False) for url in claimed if isinstance(url, str))
         
-        # STRICT VALIDATION: Check for specific PH-Core required extensions
+        profiles: List[CompiledProfile] = []
+        issues: List[ValidationIssue] = []
+        seen: Set[str] = set()
         resource_type = resource.get("resourceType")
         
-        if resource_type == "Patient":
-            # Indigenous People extension is REQUIRED for PH-Core Patient (min: 1)
-            indigenous_people_url = "https://wah4pc-validation.echosphere.cfd/StructureDefinition/indigenous-people"
-            if indigenous_people_url not in extension_urls:
+        for url, requested in candidates:
+            profile = profile_registry.get_compiled_profile(url)
+            if profile is None:
                 issues.append(ValidationIssue(
-                    severity=ValidationSeverity.ERROR,
-                    code="missing-required-ph-core-extension",
-                    details=f"PH-Core Patient profile requires 'indigenousPeople' extension: {indigenous_people_url}",
-                    location="extension (indigenousPeople)"
+                    severity=ValidationSeverity.WARNING if requested else ValidationSeverity.INFORMATION,
+                    code="unknown-profile",
+                    details=f"Profile is not loaded and was not checked: {url}",
+                    location="meta.profile" if not requested else None
                 ))
-        
-        # Check for required extensions in the profile differential
-        for element in profile["differential"].get("element", []):
-            element_id = element.get("id", "")
+                continue
+            if profile.url in seen:
+                continue
+            seen.add(profile.url)
             
-            # Look for required extension elements (min > 0)
-            if ":extension" in element_id and element.get("min", 0) > 0:
-                extension_slice_name = element_id.split(":")[-1]
-                
-                # Find the corresponding extension definition
-                for profile_element in profile["differential"].get("element", []):
-                    if (profile_element.get("id", "") == element_id and 
-                        "type" in profile_element):
-                        
-                        extension_profiles = []
-                        for type_def in profile_element["type"]:
-                            if type_def.get("code") == "Extension":
-                                extension_profiles.extend(type_def.get("profile", []))
-                        
-                        # Check if any required extension is missing
-                        for ext_profile in extension_profiles:
-                            if not any(url and ext_profile == url for url in extension_urls):
-                                issues.append(ValidationIssue(
-                                    severity=ValidationSeverity.ERROR,
-                                    code="missing-required-extension",
-                                    details=f"Required PH-Core extension missing: {ext_profile} (slice: {extension_slice_name})",
-                                    location=f"extension ({extension_slice_name})"
-                                ))
+            if profile.resource_type != resource_type:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.ERROR if requested else ValidationSeverity.WARNING,
+                    code="profile-resource-type-mismatch",
+                    details=f"Profile {url} constrains '{profile.resource_type}', not '{resource_type}'",
+                    location="meta.profile" if not requested else None
+                ))
+                continue
+            profiles.append(profile)
+        
+        return profiles, issues
+    
+    def validate_profiles(
+        self,
+        resource: Dict[str, Any],
+        profiles: List[CompiledProfile],
+        elements: Optional[AbstractSet[str]] = None,
+        max_issues: Optional[int] = None
+    ) -> List[ValidationIssue]:
+        """Validate a resource against several compiled profiles.
         
+        Issues reported identically by more than one profile are only kept once.
+        Only the given top-level elements are checked when elements is set, and
+        each profile's traversal stops after max_issues issues when it is set.
+        """
+        issues = []
+        seen = set()
+        for profile in profiles:
+            for issue in self._validate_profile_constraints(resource, profile, elements, max_issues):
+                key = (issue.severity, issue.code, issue.location, issue.details)
+                if key not in seen:
+                    seen.add(key)
+                    issues.append(issue)
         return issues
     
-    def _validate_identifier_constraints(
+    def validate_element(
         self,
         resource: Dict[str, Any],
-        profile: Dict[str, Any]
+        element: str,
+        profiles: List[CompiledProfile]
+    ) -> List[ValidationIssue]:
+        """Run the PH-Core checks of one top-level element that the profiles do not express.
+        
+        Args:
+            resource: FHIR resource to validate
+            element: Top-level element name (one of ELEMENT_CHECKS)
+            profiles: Compiled profiles the resource is validated against
+            
+        Returns:
+            List of validation issues (empty for elements without such checks)
+        """
+        if element == "identifier":
+            return self._validate_identifier_constraints(resource)
+        if element == "maritalStatus":
+            return self._validate_terminology_bindings(resource, profiles[0]) if profiles else []
+        if element == "address":
+            return self._validate_address_profile(resource)
+        return []
+    
+    def _validate_profile_constraints(
+        self,
+        resource: Dict[str, Any],
+        profile: CompiledProfile,
+        elements: Optional[AbstractSet[str]] = None,
+        max_issues: Optional[int] = None
+    ) -> List[ValidationIssue]:
+        """Validate cardinality, types, fixed values, slices and bindings of the compiled profile."""
+        return profile.validate(resource, elements, max_issues)
+    
+    def _validate_identifier_constraints(
+        self,
+        resource: Dict[str, Any]
     ) -> List[ValidationIssue]:
         """Validate PH-Core identifier constraints."""
         issues = []
@@ -123,38 +189,39 @@ class PHCoreValidator:
         if not isinstance(identifiers, list):
             return issues
         
-        # Check for specific PH-Core identifier requirements
-        if resource.get("resourceType") == "Patient":
-            # Check for PhilHealth ID constraints
-            philhealth_identifiers = [
-                ident for ident in identifiers
-                if isinstance(ident, dict) and 
-                "philhealth" in str(ident.get("system", "")).lower()
-            ]
+        system_index = ph_core_ig_server.system_index
+        
+        for i, ident in enumerate(identifiers):
+            if not isinstance(ident, dict):
+                continue
             
-            for ident in philhealth_identifiers:
-                # Validate PhilHealth ID format (should be numeric and proper length)
-                value = ident.get("value", "")
-                if value and not value.replace("-", "").isdigit():
-                    issues.append(ValidationIssue(
-                        severity=ValidationSeverity.WARNING,
-                        code="invalid-philhealth-id-format",
-                        details=f"PhilHealth ID should be numeric: {value}",
-                        location="identifier.value"
-                    ))
+            # Look up the identifier system and its compiled value format
+            known_system = system_index.classify(ident.get("system"))
+            if not known_system or not known_system.value_pattern:
+                continue
+            
+            value = ident.get("value", "")
+            if value and not (isinstance(value, str) and known_system.value_pattern.match(value)):
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    code=f"invalid-{known_system.key}-format",
+                    details=f"{known_system.name} should match format '{known_system.value_mask}' (n = digit): {value}",
+                    location=f"identifier[{i}].value"
+                ))
         
         return issues
     
     def _validate_terminology_bindings(
         self,
         resource: Dict[str, Any],
-        profile: Dict[str, Any]
+        profile: CompiledProfile
     ) -> List[ValidationIssue]:
-        """Validate terminology bindings for PH-Core resources."""
+        """Validate terminology bindings the compiled profile could not resolve."""
         issues = []
         
-        # Validate marital status binding for Patient resources
-        if resource.get("resourceType") == "Patient" and "maritalStatus" in resource:
+        # Validate marital status binding for Patient resources when the ValueSet is not loaded
+        if (resource.get("resourceType") == "Patient" and "maritalStatus" in resource
+                and not profile.is_binding_resolved("maritalStatus")):
             marital_status = resource["maritalStatus"]
             if isinstance(marital_status, dict) and "coding" in marital_status:
                 for coding in marital_status["coding"]:
@@ -205,16 +272,31 @@ class PHCoreValidator:
         
         return issues
     
+    @tracer.traced("validate_ph_core_resource", validation_span_attributes)
     def validate_ph_core_resource(
         self,
         resource: Dict[str, Any],
-        strict_mode: bool = True
+        strict_mode: bool = True,
+        requested_profiles: Optional[List[str]] = None,
+        elements: Optional[AbstractSet[str]] = None,
+        max_issues: Optional[int] = None,
+        timer: StageTimer = NULL_STAGE_TIMER
     ) -> ValidationResult:
         """Validate a FHIR resource against PH-Core profiles.
         
+        The resource is validated against the requested profiles and its
+        meta.profile claims; when none resolve, the default PH-Core profile
+        for its resource type is used.
+        
         Args:
             resource: FHIR resource to validate
             strict_mode: Whether to enforce strict PH-Core compliance
+            requested_profiles: Optional profile canonical URLs requested by the caller
+            elements: Restrict element-level rules to these top-level JSON keys
+                (None for all)
+            max_issues: Stop each profile's traversal after this many issues
+                (None for no limit)
+            timer: Timer the 'ph_core.*' stage durations are recorded in
             
         Returns:
             ValidationResult with PH-Core specific validation
@@ -237,13 +319,18 @@ class PHCoreValidator:
                     valid=False
                 )
             
+            # Profiles requested by the caller or claimed in meta.profile
+            with timer.stage("ph_core.profile_selection"):
+                profiles, selection_issues = self.select_profiles(resource, requested_profiles)
+            all_issues.extend(selection_issues)
+            
             # Check if this resource type has a PH-Core profile
-            if not self.is_ph_core_resource(resource_type):
+            if not profiles and not self.is_ph_core_resource(resource_type):
                 if strict_mode:
                     return ValidationResult(
                         status=ValidationStatus.FAILED,
                         message=f"Resource type '{resource_type}' is not supported by PH-Core profiles",
-                        issues=[ValidationIssue(
+                        issues=all_issues + [ValidationIssue(
                             severity=ValidationSeverity.ERROR,
                             code="unsupported-resource-type",
                             details=f"PH-Core does not define a profile for '{resource_type}'"
@@ -259,31 +346,41 @@ class PHCoreValidator:
                         details=f"No PH-Core profile available for '{resource_type}', using base FHIR validation only"
                     ))
             
-            # Get the PH-Core profile
-            profile_id = self._supported_profiles.get(resource_type)
-            if profile_id:
-                profile = ph_core_ig_server.get_structure_definition(profile_id)
-                
-                if not profile:
+            # Fall back to the default PH-Core profile for the resource type
+            profile_url = self._supported_profiles.get(resource_type)
+            if not profiles and profile_url:
+                profile = profile_registry.get_compiled_profile(profile_url)
+                if profile:
+                    profiles = [profile]
+                else:
                     all_issues.append(ValidationIssue(
                         severity=ValidationSeverity.WARNING,
                         code="profile-not-loaded",
-                        details=f"PH-Core profile '{profile_id}' not found in loaded IG"
+                        details=f"PH-Core profile '{profile_url}' not found in loaded IG"
                     ))
-                else:
-                    # Perform PH-Core specific validations
-                    extension_issues = self._validate_required_extensions(resource, profile)
-                    all_issues.extend(extension_issues)
-                    
-                    identifier_issues = self._validate_identifier_constraints(resource, profile)
+            
+            if profiles:
+                # Perform PH-Core specific validations (profile constraints
+                # include the PH-Core extensions)
+                with timer.stage("ph_core.profiles"):
+                    profile_issues = self.validate_profiles(resource, profiles, elements, max_issues)
+                all_issues.extend(profile_issues)
+                
+                if element_in_scope("identifier", elements):
+                    with timer.stage("ph_core.identifiers"):
+                        identifier_issues = self._validate_identifier_constraints(resource)
                     all_issues.extend(identifier_issues)
-                    
-                    terminology_issues = self._validate_terminology_bindings(resource, profile)
+                
+                if element_in_scope("maritalStatus", elements):
+                    with timer.stage("ph_core.terminology"):
+                        terminology_issues = self._validate_terminology_bindings(resource, profiles[0])
                     all_issues.extend(terminology_issues)
-                    
-                    address_issues = self._validate_address_profile(resource)
+                
+                if element_in_scope("address", elements):
+                    with timer.stage("ph_core.address"):
+                        address_issues = self._validate_address_profile(resource)
                     all_issues.extend(address_issues)
-            elif profile_id is None and self.is_ph_core_resource(resource_type):
+            elif profile_url is None and self.is_ph_core_resource(resource_type):
                 # Resource is supported by PHCore but uses base FHIR profile
                 all_issues.append(ValidationIssue(
                     severity=ValidationSeverity.INFORMATION,
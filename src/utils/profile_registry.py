@@ -0,0 +1,94 @@
+"""Canonical-URL registry of loaded StructureDefinitions and compiled profiles."""
+
+import logging
+from typing import Any, Dict, Optional
+
+from src.constants.fhir_constants import PH_CORE_CANONICAL_BASE, PH_CORE_LEGACY_CANONICAL_BASE
+from src.lib.profile_engine import CompiledProfile, ProfileConstraintEngine
+from src.lib.resource_loader import resource_loader
+from src.ui.ig_endpoints import ph_core_ig_server
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileRegistry:
+    """Resolves profiles by canonical URL and caches their compiled form."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._structure_definitions: Optional[Dict[str, Dict[str, Any]]] = None
+        self._value_sets: Optional[Dict[str, Dict[str, Any]]] = None
+        self.engine = ProfileConstraintEngine(
+            self.resolve_structure_definition,
+            self.resolve_value_set,
+            canonical_aliases={PH_CORE_LEGACY_CANONICAL_BASE: PH_CORE_CANONICAL_BASE}
+        )
+
+    def _structure_definition_index(self) -> Dict[str, Dict[str, Any]]:
+        """Index FHIR base, extension and PH-Core StructureDefinitions by canonical URL."""
+        if self._structure_definitions is None:
+            definitions = []
+            for bundle in (resource_loader.profiles, resource_loader.extensions):
+                definitions.extend(entry.get("resource", {}) for entry in bundle.get("entry", []))
+            definitions.extend(ph_core_ig_server.get_all_resources_by_type("StructureDefinition").values())
+
+            structure_definitions = {}
+            for definition in definitions:
+                if definition.get("resourceType") == "StructureDefinition" and definition.get("url"):
+                    structure_definitions[self.engine.normalize_canonical(definition["url"])] = definition
+            self._structure_definitions = structure_definitions
+
+            logger.info(f"Indexed {len(structure_definitions)} StructureDefinitions by canonical URL")
+        return self._structure_definitions
+
+    def __len__(self) -> int:
+        """Number of indexed StructureDefinitions."""
+        return len(self._structure_definition_index())
+
+    def resolve_structure_definition(self, url: str) -> Optional[Dict[str, Any]]:
+        """Resolve a StructureDefinition by canonical URL (version suffix ignored).
+
+        Args:
+            url: Canonical URL, optionally with '|version'
+
+        Returns:
+            The StructureDefinition, or None if it is not loaded
+        """
+        return self._structure_definition_index().get(self.engine.normalize_canonical(url))
+
+    def resolve_value_set(self, url: str) -> Optional[Dict[str, Any]]:
+        """Resolve a ValueSet by canonical URL from the PH-Core IG or FHIR base."""
+        if self._value_sets is None:
+            self._value_sets = {
+                self.engine.normalize_canonical(value_set["url"]): value_set
+                for value_set in ph_core_ig_server.get_all_resources_by_type("ValueSet").values()
+                if value_set.get("url")
+            }
+        value_set = self._value_sets.get(self.engine.normalize_canonical(url))
+        return value_set or resource_loader.get_value_set(url)
+
+    def get_compiled_profile(self, url: str) -> Optional[CompiledProfile]:
+        """Get the compiled form of a profile, compiling it on first use.
+
+        Args:
+            url: Canonical URL of the profile
+
+        Returns:
+            The compiled profile, or None if the URL cannot be resolved
+        """
+        return self.engine.compile_url(url)
+
+    def compile_all(self) -> int:
+        """Compile every indexed StructureDefinition (parses all invariants once).
+
+        Returns:
+            Number of compiled StructureDefinitions
+        """
+        definitions = list(self._structure_definition_index().values())
+        for definition in definitions:
+            self.engine.compile(definition)
+        return len(definitions)
+
+
+# Global profile registry instance
+profile_registry = ProfileRegistry()
@@ -0,0 +1,146 @@
+"""Log of slow validations with structural payload fingerprints."""
+
+import json
+import logging
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.constants.fhir_constants import (
+    SLOW_VALIDATION_LOG_BACKUPS, SLOW_VALIDATION_LOG_FILE, SLOW_VALIDATION_LOG_MAX_BYTES,
+    SLOW_VALIDATION_MAX_ARRAY_PATHS, SLOW_VALIDATION_THRESHOLD_MS
+)
+from src.lib.payload_fingerprint import fingerprint
+from src.lib.stage_timer import StageTimer
+from src.types.fhir_types import ValidationResult
+from src.utils.validation_metrics import resource_type_label
+
+logger = logging.getLogger(__name__)
+
+
+class SlowValidationLog:
+    """Writes a JSON record for every validation slower than a threshold.
+
+    Records go to a size-rotated local file, one JSON object per line, and
+    carry what is needed to find the input shapes behind latency spikes:
+    the endpoint, resource type, duration, per-stage timings, issue counts
+    and a structural fingerprint of the payload (see payload_fingerprint).
+    Issue details and payload values are never written, as they may hold
+    PHI. The fingerprint is only computed for slow validations, and the
+    file is only created once one is recorded.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_VALIDATION_THRESHOLD_MS,
+        path: Path = SLOW_VALIDATION_LOG_FILE,
+        max_bytes: int = SLOW_VALIDATION_LOG_MAX_BYTES,
+        backups: int = SLOW_VALIDATION_LOG_BACKUPS
+    ):
+        """Initialize the log.
+
+        Args:
+            threshold_ms: Validations taking at least this long are recorded
+                (negative to record none)
+            path: Log file
+            max_bytes: Size at which the file is rotated
+            backups: Number of rotated files kept
+        """
+        self.threshold_ms = threshold_ms
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recorded = 0
+        self._file_logger: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether slow validations are recorded."""
+        return self.threshold_ms >= 0
+
+    def record(
+        self,
+        endpoint: str,
+        result: ValidationResult,
+        duration_ns: int,
+        timer: Optional[StageTimer] = None,
+        resource: Any = None
+    ) -> bool:
+        """Record a validation if it was slow.
+
+        Args:
+            endpoint: Name of the validation endpoint (e.g. 'validate/ph-core')
+            result: Validation result
+            duration_ns: Validation latency in nanoseconds
+            timer: Stage timer of the validation, if it was timed
+            resource: Validated payload to fingerprint, if available
+
+        Returns:
+            True if the validation was recorded
+        """
+        duration_ms = duration_ns / 1e6
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return False
+
+        try:
+            entry = self._entry(endpoint, result, duration_ms, timer, resource)
+            self._get_file_logger().info(json.dumps(entry, separators=(",", ":")))
+            self.recorded += 1
+            return True
+        except Exception as e:
+            # Diagnostics must never fail a validation request
+            logger.error(f"Error recording slow validation: {e}")
+            return False
+
+    def _entry(
+        self,
+        endpoint: str,
+        result: ValidationResult,
+        duration_ms: float,
+        timer: Optional[StageTimer],
+        resource: Any
+    ) -> Dict[str, Any]:
+        """Build the log record of a slow validation."""
+        issues_by_severity: Dict[str, int] = {}
+        for issue in result.issues:
+            severity = issue.severity.value
+            issues_by_severity[severity] = issues_by_severity.get(severity, 0) + 1
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "endpoint": endpoint,
+            "resource_type": resource_type_label(result.resource_type),
+            "duration_ms": round(duration_ms, 3),
+            "threshold_ms": self.threshold_ms,
+            "status": result.status.value,
+            "issue_count": len(result.issues),
+            "issues_by_severity": issues_by_severity,
+            "stage_timings_ms": {
+                stage: round(stage_ns / 1e6, 3) for stage, stage_ns in timer.durations_ns.items()
+            } if timer is not None else None,
+            "fingerprint": fingerprint(
+                resource, SLOW_VALIDATION_MAX_ARRAY_PATHS
+            ) if resource is not None else None,
+        }
+
+    def _get_file_logger(self) -> logging.Logger:
+        """Get the logger writing to the rotating file, creating the file on first use."""
+        if self._file_logger is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            file_logger = logging.getLogger(f"{__name__}.records")
+            file_logger.setLevel(logging.INFO)
+            file_logger.addHandler(handler)
+            # Records go to the file only, not to the server log
+            file_logger.propagate = False
+            self._file_logger = file_logger
+            logger.info(f"Recording validations slower than {self.threshold_ms} ms to {self.path}")
+        return self._file_logger
+
+
+# Global slow validation log instance
+slow_validation_log = SlowValidationLog()
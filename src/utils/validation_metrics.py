@@ -0,0 +1,184 @@
+"""Validation metrics exported in the Prometheus format."""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import psutil
+
+from src.constants.fhir_constants import METRICS_LATENCY_BUCKETS, METRICS_STAGE_BUCKETS
+from src.lib.metrics import (
+    CallbackMetric, Counter, Histogram, LabelValues, MetricsRegistry, metrics_registry
+)
+from src.lib.resource_loader import resource_loader
+from src.lib.stage_timer import StageTimer
+from src.types.fhir_types import ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# Label value of requests that matched no route, and of results without a resource type
+UNMATCHED_ENDPOINT = "unmatched"
+UNKNOWN_RESOURCE_TYPE = "unknown"
+
+
+def resource_type_label(resource_type: Any) -> str:
+    """Get the label value of a result's resource type.
+
+    The resource type comes from the client, so anything other than a FHIR
+    resource type known to the server is reported as 'unknown' to keep the
+    number of label values bounded.
+    """
+    if isinstance(resource_type, str) and resource_loader.is_valid_resource_type(resource_type):
+        return resource_type
+    return UNKNOWN_RESOURCE_TYPE
+
+
+class ValidationMetrics:
+    """Request, validation, cache and process metrics of the server.
+
+    Request latency is observed for every HTTP request by route template.
+    Validation endpoints additionally report their validation latency by
+    resource type, the durations of the validation stages and the issues
+    found. Cache statistics, Bundle worker load and process memory are read
+    when /metrics is scraped.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry):
+        """Register the metric families.
+
+        Args:
+            registry: Registry the metrics are exported from
+        """
+        self.request_duration = registry.register(Histogram(
+            "fhir_http_request_duration_seconds",
+            "HTTP request latency by method, route and status code",
+            ("method", "endpoint", "status"),
+            METRICS_LATENCY_BUCKETS
+        ))
+        self.validation_duration = registry.register(Histogram(
+            "fhir_validation_duration_seconds",
+            "Validation latency by endpoint and resource type",
+            ("endpoint", "resource_type"),
+            METRICS_LATENCY_BUCKETS
+        ))
+        self.stage_duration = registry.register(Histogram(
+            "fhir_validation_stage_duration_seconds",
+            "Duration of each validation stage",
+            ("stage",),
+            METRICS_STAGE_BUCKETS
+        ))
+        self.validations = registry.register(Counter(
+            "fhir_validations_total",
+            "Validation results by endpoint, resource type and status",
+            ("endpoint", "resource_type", "status")
+        ))
+        self.issues = registry.register(Counter(
+            "fhir_validation_issues_total",
+            "Validation issues reported, by severity and code",
+            ("severity", "code")
+        ))
+        registry.register(CallbackMetric(
+            "fhir_cache_requests_total",
+            "Cache lookups by cache and result (hit or miss)",
+            "counter", ("cache", "result"), self._cache_requests
+        ))
+        registry.register(CallbackMetric(
+            "fhir_cache_entries",
+            "Entries held per cache",
+            "gauge", ("cache",), self._cache_entries
+        ))
+        registry.register(CallbackMetric(
+            "fhir_bundle_entries_queued",
+            "Bundle entries waiting for a validation worker",
+            "gauge", (), lambda: {(): self._bundle_validator().pending_entries}
+        ))
+        registry.register(CallbackMetric(
+            "fhir_bundle_entries_active",
+            "Bundle entries being validated",
+            "gauge", (), lambda: {(): self._bundle_validator().active_entries}
+        ))
+        registry.register(CallbackMetric(
+            "process_resident_memory_bytes",
+            "Resident memory size of the server process",
+            "gauge", (), self._resident_memory
+        ))
+        self._process: Optional[psutil.Process] = None
+
+    def observe_request(self, method: str, endpoint: Optional[str], status: int, duration_ns: int) -> None:
+        """Record an HTTP request.
+
+        Args:
+            method: HTTP method
+            endpoint: Route template (e.g. '/api/v1/validate'), None if no route matched
+            status: Response status code
+            duration_ns: Request latency in nanoseconds
+        """
+        self.request_duration.observe(
+            duration_ns / 1e9, method, endpoint or UNMATCHED_ENDPOINT, str(status)
+        )
+
+    def observe_validation(
+        self,
+        endpoint: str,
+        result: ValidationResult,
+        duration_ns: int,
+        timer: Optional[StageTimer] = None
+    ) -> None:
+        """Record a validation result.
+
+        Args:
+            endpoint: Name of the validation endpoint (e.g. 'validate/ph-core')
+            result: Validation result
+            duration_ns: Validation latency in nanoseconds
+            timer: Stage timer of the validation (stage durations are recorded
+                if it was enabled)
+        """
+        resource_type = resource_type_label(result.resource_type)
+        self.validation_duration.observe(duration_ns / 1e9, endpoint, resource_type)
+        self.validations.inc(endpoint, resource_type, result.status.value)
+        for issue in result.issues:
+            self.issues.inc(issue.severity.value, issue.code)
+        if timer is not None:
+            for stage, stage_ns in timer.durations_ns.items():
+                self.stage_duration.observe(stage_ns / 1e9, stage)
+
+    @staticmethod
+    def _bundle_validator():
+        """Get the Bundle validator."""
+        # Import here to avoid circular imports
+        from src.utils.bundle_validator import bundle_validator
+
+        return bundle_validator
+
+    @staticmethod
+    def _caches() -> Dict[str, Dict[str, int]]:
+        """Get the statistics of every cache."""
+        # Import here to avoid circular imports
+        from src.utils.delta_validator import delta_validator
+        from src.utils.partial_validator import partial_validator
+        from src.utils.profile_registry import profile_registry
+
+        return {
+            "compiled_profiles": profile_registry.engine.cache_info(),
+            "partial_path_rules": partial_validator.cache_info(),
+            "validation_tokens": delta_validator.cache_info(),
+        }
+
+    def _cache_requests(self) -> Dict[LabelValues, float]:
+        samples = {}
+        for cache, info in self._caches().items():
+            samples[(cache, "hit")] = info["hits"]
+            samples[(cache, "miss")] = info["misses"]
+        return samples
+
+    def _cache_entries(self) -> Dict[LabelValues, float]:
+        return {(cache,): info["size"] for cache, info in self._caches().items()}
+
+    def _resident_memory(self) -> Dict[LabelValues, float]:
+        if self._process is None:
+            self._process = psutil.Process(os.getpid())
+        return {(): self._process.memory_info().rss}
+
+
+# Global validation metrics instance
+validation_metrics = ValidationMetrics()